@@ -0,0 +1,16 @@
+# -------------------------------
+# Paquet dht : simulateurs de table de hachage distribuée
+# -------------------------------
+#
+# Les deux implémentations s'importent sans lancer de simulation ; matplotlib et numpy ne
+# sont chargés qu'au premier affichage de l'anneau. Les scénarios de démonstration et le banc
+# d'essai se lancent en ligne de commande :
+#   python -m dht run --version v2 --nodes 1000 --headless
+#   python -m dht bench --nodes 10 100
+#   python -m dht net --nodes 8   # processus réels sur 127.0.0.1
+
+from . import v1, v2
+from .v1 import Donnees
+from .v2 import Node, Message, Data, Reply
+
+__all__ = ["v1", "v2", "Node", "Message", "Data", "Reply", "Donnees"]
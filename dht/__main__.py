@@ -0,0 +1,65 @@
+# -------------------------------
+# Point d'entrée en ligne de commande : python -m dht
+# -------------------------------
+
+import argparse
+import random
+
+from .eventlog import logger, DEBUG, INFO, WARNING, OFF
+from .keyspace import VIRTUAL_NODES
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "off": OFF}
+
+
+def run_scenario(args):
+    # Le scénario n'est importé que pour la version demandée
+    if args.version == "v1":
+        from . import scenario_v1 as scenario
+    else:
+        from . import scenario_v2 as scenario
+    scenario.run(args.nodes, args.vnodes, args.headless)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dht", description="Simulation d'une table de hachage distribuée.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="exécuter le scénario de démonstration d'une implémentation")
+    run.add_argument("--version", choices=["v1", "v2"], default="v2")
+    run.add_argument("--nodes", type=int, default=None, help="nombre de nœuds physiques (10 pour v1, 20 pour v2)")
+    run.add_argument("--vnodes", type=int, default=VIRTUAL_NODES, help="nœuds virtuels par nœud physique")
+    run.add_argument("--headless", action="store_true", help="ne pas dessiner l'anneau (matplotlib n'est pas chargé)")
+    run.add_argument("--seed", type=int, help="graine du générateur aléatoire")
+    run.add_argument("--log-level", choices=sorted(LEVELS), default="debug")
+
+    commands.add_parser("bench", add_help=False, help="banc d'essai (voir python -m dht bench --help)")
+    commands.add_parser("sweep", add_help=False, help="balayage multi-processus (voir python -m dht sweep --help)")
+    commands.add_parser("net", add_help=False, help="charge de processus réels sur 127.0.0.1 (voir python -m dht net --help)")
+
+    args, rest = parser.parse_known_args(argv)
+    if args.command == "bench":
+        from . import benchmark
+        benchmark.main(rest)
+        return
+    if args.command == "sweep":
+        from . import sweep
+        sweep.main(rest)
+        return
+    if args.command == "net":
+        from . import transport
+        transport.main(rest)
+        return
+    if rest:
+        parser.error("arguments non reconnus : " + " ".join(rest))
+
+    if args.nodes is None:
+        args.nodes = 10 if args.version == "v1" else 20
+    if args.seed is not None:
+        random.seed(args.seed)
+    logger.configure(level=LEVELS[args.log_level])
+    run_scenario(args)
+    logger.flush()
+
+
+if __name__ == "__main__":
+    main()
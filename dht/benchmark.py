@@ -0,0 +1,814 @@
+# -------------------------------
+# Banc d'essai : comparaison de dht_v1 et dht_v2
+# -------------------------------
+#
+# Exemple :
+#   python -m dht bench --nodes 10 100 1000 --vnodes 1 8 --keys 1000 --ops 1000 --read-ratio 0.5 0.9 --csv resultats.csv
+#   python -m dht bench --nodes 100 --zipf 1.1 --cache-size 0 64   # effet du cache sur des lectures Zipf
+#   python -m dht bench --nodes 100 --load 1 5 10 20 --service-time 0.1   # saturation de dht_v2
+#   python -m dht bench --nodes 100000 --vnodes 1 --bootstrap             # anneau amorcé directement
+#
+# Pour chaque combinaison (version, nombre de nœuds physiques, nœuds virtuels par nœud, nombre
+# de clés, proportion de lectures), le banc construit un anneau, précharge les clés puis exécute
+# un mélange de lectures et d'écritures. Il mesure le temps réel, le temps simulé (env.now), les
+# sauts par lecture, les messages par opération, le pic mémoire et l'équilibre de charge
+# (rapport max/moyenne des clés primaires par nœud physique). Les clés lues et écrites suivent une
+# loi uniforme ou une loi de Zipf ; avec le cache des chemins activé, le banc rapporte aussi la
+# proportion de lectures servies par un cache.
+#
+# Avec --load, le banc soumet à dht_v2 une charge ouverte (arrivées de Poisson au débit donné)
+# à travers le réseau simulé (boîtes de réception, temps de service, latence des liens) et
+# rapporte le débit atteint, l'attente en file et la latence (moyenne, p50, p99) ; avec --timeout,
+# les requêtes qui dépassent ce délai sont abandonnées et comptées à part.
+#
+# Avec --compact, le banc construit l'anneau compact (dht.compact, tableaux NumPy), résout les
+# responsables de toutes les clés en un appel vectorisé et rapporte les temps de construction et
+# de résolution, la mémoire des tableaux et les statistiques de charge et de placement des répliques :
+#   python -m dht bench --compact --nodes 1000000 --keys 1000000
+#
+# Avec --batch, le banc écrit puis relit les clés une par une, puis par lots (put_many,
+# get_many) sur un anneau amorcé identique, et rapporte les gains en temps réel, en sauts et
+# (dht_v2) en temps simulé :
+#   python -m dht bench --batch --nodes 1000 --vnodes 1 --keys 20000 100000
+#
+# Avec --object-size, le banc stocke puis relit des valeurs de la taille donnée (octets) à
+# travers le réseau simulé de dht_v2, découpées en morceaux de --chunk-size octets (0 : valeurs
+# entières), et rapporte la latence moyenne des écritures et des lectures :
+#   python -m dht bench --object-size 8388608 --chunk-size 262144 0 --bandwidth 1048576
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import simpy
+
+from . import v1 as dht_v1
+from . import v2 as dht_v2
+from . import snapshot
+from .eventlog import logger, OFF
+from .metrics import metrics
+from .logstore import LogStore, log_storage
+from .keyspace import virtual_node_id, load_balance
+from .network import Network, LinkModel
+from .chunks import CHUNK_SIZE
+
+FIELDS = ["version", "bootstrap", "nodes", "vnodes", "keys", "ops", "read_ratio", "zipf", "cache_size", "replication", "churn",
+          "read_balancing", "storage", "snapshot", "seed", "build_wall_s", "wall_s", "sim_time", "hops_per_lookup", "messages_per_op", "cache_hit_ratio",
+          "peak_mem_kb", "max_mean_load", "max_mean_served", "max_mean_forwarded", "lost_keys", "migrated_keys",
+          "migration_messages", "disk_written_kb", "disk_read_kb", "compactions"]
+LOAD_FIELDS = ["version", "nodes", "keys", "rate", "duration", "read_ratio", "zipf", "service_time", "concurrency",
+               "read_balancing", "coalesce", "seed", "timeout", "offered", "completed", "timed_out", "coalesced",
+               "max_mean_served", "throughput", "mean_queue_wait", "max_queue", "mean_latency", "p50_latency",
+               "p99_latency"]
+COMPACT_FIELDS = ["version", "nodes", "vnodes", "keys", "replication", "seed", "build_wall_s", "resolve_wall_s",
+                  "keys_per_s", "array_kb", "max_mean_keys", "max_mean_load", "max_mean_stored", "empty_nodes",
+                  "full_spread_ratio"]
+BATCH_FIELDS = ["version", "nodes", "vnodes", "keys", "seed", "single_put_wall_s", "batch_put_wall_s", "put_wall_speedup",
+                "single_get_wall_s", "batch_get_wall_s", "get_wall_speedup", "single_hops", "batch_hops",
+                "hop_speedup", "single_sim_time", "batch_sim_time", "sim_speedup"]
+LARGE_FIELDS = ["version", "nodes", "objects", "object_kb", "chunk_kb", "replication", "bandwidth", "seed",
+                "chunks_per_object", "transfers", "mean_put_latency", "mean_get_latency", "get_mb_per_time"]
+
+
+# -------------------------------
+# Construction des anneaux
+# -------------------------------
+
+def build_ring_v1(env, hosts, virtual_nodes):
+    """ Construit un anneau v1 en faisant rejoindre chaque nœud virtuel via un nœud existant au hasard. """
+    dht_v1.Node.existing_ids.clear()
+    dht_v1.Node.directory.clear()
+    nodes = []
+    for host in hosts:
+        for index in range(virtual_nodes):
+            node = dht_v1.Node(env, virtual_node_id(host, index), host)
+            if nodes:
+                node.send_join_message(random.choice(nodes))
+            nodes.append(node)
+    return nodes
+
+
+def build_ring_v2(env, hosts, virtual_nodes):
+    """ Construit un anneau v2 en adressant chaque demande d'ajout au premier nœud. """
+    first_node = dht_v2.Node(env, virtual_node_id(hosts[0], 0), hosts[0])
+    for host in hosts:
+        for index in range(virtual_nodes):
+            node_id = virtual_node_id(host, index)
+            if node_id == first_node.node_id:
+                continue
+            message = dht_v2.Message(sender=node_id, receiver=first_node.node_id, content="Join Request")
+            first_node.receive_join_request(message, host)
+    nodes = [first_node]
+    current = first_node.right
+    while current is not first_node:
+        nodes.append(current)
+        current = current.right
+    return nodes
+
+
+# -------------------------------
+# Opérations élémentaires
+# -------------------------------
+
+def write_v1(env, client, key):
+    client.store_data(key, f"Value for {key}")
+
+
+def read_v1(env, client, key):
+    client.request_data(key)
+
+
+def write_v2(env, client, key):
+    env.run(until=env.process(client.store_data(dht_v2.Data(key, f"Value for {key}"))))
+
+
+def read_v2(env, client, key):
+    env.run(until=env.process(client.retrieve_data(key)))
+
+
+def put_many_v1(env, client, keys):
+    return client.put_many([(key, f"Value for {key}") for key in keys])
+
+
+def get_many_v1(env, client, keys):
+    return client.get_many(keys)
+
+
+def put_many_v2(env, client, keys):
+    process = env.process(client.put_many([dht_v2.Data(key, f"Value for {key}") for key in keys]))
+    env.run(until=process)
+    return process.value
+
+
+def get_many_v2(env, client, keys):
+    process = env.process(client.get_many(keys))
+    env.run(until=process)
+    return process.value
+
+
+def join_v1(env, ring, host, virtual_nodes):
+    for index in range(virtual_nodes):
+        node = dht_v1.Node(env, virtual_node_id(host, index), host)
+        node.send_join_message(random.choice(ring))
+        ring.append(node)
+
+
+def leave_v1(env, ring, node):
+    node.remove()
+    ring.remove(node)
+
+
+def join_v2(env, ring, host, virtual_nodes):
+    for index in range(virtual_nodes):
+        message = dht_v2.Message(sender=virtual_node_id(host, index), receiver=ring[0].node_id, content="Join Request")
+        node = ring[0].receive_join_request(message, host)
+        if node is not None:
+            ring.append(node)
+
+
+def leave_v2(env, ring, node):
+    env.run(until=env.process(ring[0].remove_node(node)))
+    ring.remove(node)
+
+
+def apply_settings(node_class, **values):
+    """ Donne ces valeurs aux réglages de classe de node_class et renvoie les précédentes.
+
+    Les réglages d'une exécution sont rendus en fin d'exécution par apply_settings(node_class, **précédentes),
+    pour que les exécutions suivantes du même processus n'en héritent pas.
+    """
+    previous = {name: getattr(node_class, name) for name in values}
+    for name, value in values.items():
+        setattr(node_class, name, value)
+    return previous
+
+
+def zipf_weights(count, exponent):
+    """ Poids cumulés d'une loi de Zipf sur count rangs (exposant 0 : loi uniforme). """
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+# Identifiant d'un nœud dans le registre de métriques
+NODE_IDS = {
+    "v1": lambda node: node.identifier,
+    "v2": lambda node: node.node_id,
+}
+
+IMPLEMENTATIONS = {
+    "v1": (dht_v1, build_ring_v1, write_v1, read_v1, join_v1, leave_v1),
+    "v2": (dht_v2, build_ring_v2, write_v2, read_v2, join_v2, leave_v2),
+}
+
+BATCH_OPERATIONS = {
+    "v1": (put_many_v1, get_many_v1),
+    "v2": (put_many_v2, get_many_v2),
+}
+
+
+# -------------------------------
+# Exécution d'un scénario
+# -------------------------------
+
+def run_benchmark(version, nodes, keys, ops, read_ratio, seed=0, track_memory=True, vnodes=1,
+                  zipf=0.0, cache_size=0, cache_ttl=None, bootstrap=False, churn=0.0, replication=3, storage=None,
+                  read_balancing=True, snapshots=None):
+    """ Exécute un scénario et renvoie une ligne de résultats.
+
+    Avec bootstrap, l'anneau et les clés initiales sont posés directement par module.bootstrap
+    au lieu de rejouer chaque ajout de nœud et chaque écriture. churn est la probabilité, avant
+    chaque opération, qu'un nœud physique quitte l'anneau et qu'un nouveau le rejoigne ;
+    lost_keys compte les clés qui ne sont plus stockées nulle part à la fin du scénario, et
+    migrated_keys / migration_messages le coût des transferts de clés provoqués par ces départs
+    et arrivées (copies déplacées et lots envoyés) pendant la phase mesurée. Si le registre de
+    métriques est actif, il est remis à zéro au début de la phase mesurée et max_mean_forwarded
+    donne le déséquilibre des messages relayés par nœud. Avec storage (un répertoire), chaque nœud
+    stocke ses données dans un journal sur disque (logstore.LogStore) créé dans un sous-répertoire
+    temporaire, supprimé à la fin ; disk_written_kb, disk_read_kb et compactions mesurent alors les
+    entrées-sorties de la phase mesurée. read_balancing répartit les lectures entre les détenteurs
+    de chaque clé ; max_mean_served est le rapport max/moyenne des lectures servies par nœud.
+    Avec snapshots (un répertoire), l'anneau construit est enregistré (dht.snapshot) et les
+    exécutions suivantes de même composition le rechargent au lieu de le reconstruire ; la suite
+    est identique et build_wall_s mesure alors le rechargement (snapshot vaut "saved" ou "loaded").
+    """
+    module, build_ring, write, read, join, leave = IMPLEMENTATIONS[version]
+    Node = module.Node
+    run_directory = tempfile.mkdtemp(prefix=f"{version}-", dir=storage) if storage else None
+    stores = log_storage(run_directory) if run_directory else None
+    previous = apply_settings(Node, cache_size=cache_size, cache_ttl=cache_ttl, replication_factor=replication,
+                              read_balancing=read_balancing, storage=stores)
+
+    try:
+        random.seed(seed)
+        hosts = [f"node-{seed}-{i}" for i in range(nodes)]
+        key_set = [f"key-{seed}-{i}" for i in range(keys)]
+        weights = zipf_weights(keys, zipf)
+
+        if track_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        snapshot_path = None
+        snapshot_state = ""
+        if snapshots:
+            name = f"{version}-{nodes}x{vnodes}-{keys}-r{replication}-s{seed}{'-bootstrap' if bootstrap else ''}.snap"
+            snapshot_path = os.path.join(snapshots, name)
+        if snapshot_path and os.path.exists(snapshot_path):
+            env, ring = snapshot.load(snapshot_path, settings=False)
+            snapshot_state = "loaded"
+        elif bootstrap:
+            members = [(virtual_node_id(host, index), host) for host in hosts for index in range(vnodes)]
+            node_ids, owners = zip(*members)
+            env, ring = module.bootstrap(node_ids, owners, {key: f"Value for {key}" for key in key_set})
+        else:
+            env = simpy.Environment()
+            ring = build_ring(env, hosts, vnodes)
+            for key in key_set:
+                write(env, ring[0], key)
+        if snapshot_path and not snapshot_state:
+            os.makedirs(snapshots, exist_ok=True)
+            snapshot.save(snapshot_path, ring)
+            snapshot_state = "saved"
+        build_wall = time.perf_counter() - start
+
+        hops_before = Node.hop_count
+        transfers_before = Node.transfer_count
+        hits_before = Node.cache_hits
+        misses_before = Node.cache_misses
+        if metrics.enabled:
+            metrics.reset()
+        migrated_before = Node.migrated_keys
+        migration_messages_before = Node.migration_messages
+        written_before = LogStore.bytes_written
+        read_before = LogStore.bytes_read
+        compactions_before = LogStore.compactions
+        for node in ring:
+            node.reads_served = 0
+        sim_start = env.now
+        read_hops = 0
+        reads = 0
+
+        members = list(hosts)
+        joined = 0
+        start = time.perf_counter()
+        for _ in range(ops):
+            if churn and random.random() < churn:
+                # Le nœud d'entrée ring[0] reste dans l'anneau : les ajouts v2 lui sont adressés
+                candidates = [host for host in members if host != ring[0].host]
+                if candidates:
+                    host = random.choice(candidates)
+                    for node in [node for node in ring if node.host == host]:
+                        leave(env, ring, node)
+                    members.remove(host)
+                host = f"node-{seed}-{nodes + joined}"
+                joined += 1
+                join(env, ring, host, vnodes)
+                members.append(host)
+            client = random.choice(ring)
+            key = random.choices(key_set, cum_weights=weights)[0]
+            if random.random() < read_ratio:
+                hops = Node.hop_count
+                read(env, client, key)
+                read_hops += Node.hop_count - hops
+                reads += 1
+            else:
+                write(env, client, key)
+        wall = time.perf_counter() - start
+
+        peak = 0
+        if track_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        messages = (Node.hop_count - hops_before) + (Node.transfer_count - transfers_before)
+        hits = Node.cache_hits - hits_before
+        lookups = hits + Node.cache_misses - misses_before
+        load = dict.fromkeys(members, 0)
+        stored = set()
+        for node in ring:
+            load[node.host] += len(node.data_store.primary)
+            stored.update(node.data_store.primary, node.data_store.left_replicas, node.data_store.right_replicas)
+        if metrics.enabled:
+            metrics.sample_storage(ring, NODE_IDS[version])
+        written = LogStore.bytes_written - written_before
+        read_bytes = LogStore.bytes_read - read_before
+        compactions = LogStore.compactions - compactions_before
+        return {
+            "version": version,
+            "bootstrap": bootstrap,
+            "nodes": nodes,
+            "vnodes": vnodes,
+            "keys": keys,
+            "ops": ops,
+            "read_ratio": read_ratio,
+            "zipf": zipf,
+            "cache_size": cache_size,
+            "replication": replication,
+            "churn": churn,
+            "read_balancing": read_balancing,
+            "storage": "log" if storage else "memory",
+            "snapshot": snapshot_state,
+            "seed": seed,
+            "build_wall_s": round(build_wall, 6),
+            "wall_s": round(wall, 6),
+            "sim_time": round(env.now - sim_start, 3),
+            "hops_per_lookup": round(read_hops / reads, 3) if reads else 0.0,
+            "messages_per_op": round(messages / ops, 3) if ops else 0.0,
+            "cache_hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "peak_mem_kb": round(peak / 1024, 1),
+            "max_mean_load": round(load_balance(load), 3),
+            "max_mean_served": round(served_balance(ring), 3),
+            "max_mean_forwarded": round(metrics.imbalance("forwarded"), 3) if metrics.enabled else 0.0,
+            "lost_keys": sum(1 for key in key_set if key not in stored),
+            "migrated_keys": Node.migrated_keys - migrated_before,
+            "migration_messages": Node.migration_messages - migration_messages_before,
+            "disk_written_kb": round(written / 1024, 1),
+            "disk_read_kb": round(read_bytes / 1024, 1),
+            "compactions": compactions,
+        }
+    finally:
+        apply_settings(Node, **previous)
+        if track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if run_directory:
+            # Même en cas d'erreur (descripteurs épuisés, ...), les journaux sont fermés et le répertoire supprimé
+            for store in stores.stores:
+                store.close()
+            shutil.rmtree(run_directory, ignore_errors=True)
+
+
+def served_balance(ring):
+    """ Rapport max/moyenne des lectures servies par nœud de l'anneau. """
+    served = [node.reads_served for node in ring]
+    mean = sum(served) / len(served) if served else 0
+    return max(served) / mean if mean else 0.0
+
+
+def sweep(versions, node_counts, key_counts, read_ratios, ops, seed=0, track_memory=True, vnode_counts=(1,),
+          zipf=0.0, cache_sizes=(0,), cache_ttl=None, bootstrap=False, churn_rates=(0.0,), replications=(3,),
+          metrics_path=None, storage=None, read_balancing=True, snapshots=None):
+    """ Exécute toutes les combinaisons de paramètres et renvoie les lignes de résultats.
+
+    Avec metrics_path, les métriques de chaque exécution sont exportées dans un fichier numéroté
+    (resultats.json devient resultats-1.json, resultats-2.json, ...).
+    """
+    rows = []
+    combinations = itertools.product(versions, node_counts, vnode_counts, key_counts, read_ratios, cache_sizes,
+                                     replications, churn_rates)
+    for version, nodes, vnodes, keys, read_ratio, cache_size, replication, churn in combinations:
+        row = run_benchmark(version, nodes, keys, ops, read_ratio, seed, track_memory, vnodes,
+                            zipf, cache_size, cache_ttl, bootstrap, churn, replication, storage, read_balancing,
+                            snapshots)
+        print(" | ".join(f"{row[field]}" for field in FIELDS))
+        rows.append(row)
+        if metrics_path:
+            stem, extension = os.path.splitext(metrics_path)
+            metrics.write(f"{stem}-{len(rows)}{extension}")
+    return rows
+
+
+# -------------------------------
+# Charge ouverte à travers le réseau simulé
+# -------------------------------
+
+def percentile(values, q):
+    """ Percentile q (0 à 100) par la méthode du rang le plus proche. """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def run_load(nodes, keys, rate, duration, read_ratio=0.9, seed=0, service_time=0.1, concurrency=1,
+             latency=1.0, jitter=0.0, bandwidth=None, zipf=0.0, timeout=None, read_balancing=True, coalesce=True):
+    """ Soumet à un anneau v2 des requêtes arrivant au débit rate pendant duration et renvoie une ligne de résultats.
+
+    Chaque requête est lancée sans attendre les précédentes (Node.get / Node.put) ; avec
+    timeout, celles qui n'ont pas abouti dans ce délai sont comptées dans timed_out. Avec
+    coalesce, les lectures simultanées d'une même clé depuis un nœud sont regroupées (coalesced).
+    """
+    random.seed(seed)
+    hosts = [f"node-{seed}-{i}" for i in range(nodes)]
+    key_set = [f"key-{seed}-{i}" for i in range(keys)]
+    weights = zipf_weights(keys, zipf)
+
+    env = simpy.Environment()
+    previous = apply_settings(dht_v2.Node, read_balancing=read_balancing, coalesce_reads=coalesce)
+    try:
+        ring = build_ring_v2(env, hosts, 1)
+        for key in key_set:
+            write_v2(env, ring[0], key)
+        for node in ring:
+            node.reads_served = 0
+        coalesced_before = dht_v2.Node.coalesced_reads
+
+        network = Network(env, LinkModel(latency, jitter, bandwidth), service_time, concurrency)
+        if metrics.enabled:
+            metrics.reset()
+        latencies = []
+        offered = 0
+        timed_out = 0
+
+        def request(client, key, is_read):
+            nonlocal timed_out
+            if is_read:
+                reply = yield client.get(key, timeout)
+            else:
+                reply = yield client.put(dht_v2.Data(key, f"Value for {key}"), timeout)
+            if reply.timed_out:
+                timed_out += 1
+            else:
+                latencies.append(reply.latency)
+
+        def arrivals():
+            nonlocal offered
+            while True:
+                yield env.timeout(random.expovariate(rate))
+                key = random.choices(key_set, cum_weights=weights)[0]
+                env.process(request(random.choice(ring), key, random.random() < read_ratio))
+                offered += 1
+
+        dht_v2.Node.network = network
+        env.process(arrivals())
+        env.run(until=env.now + duration)
+    finally:
+        dht_v2.Node.network = None
+        apply_settings(dht_v2.Node, **previous)
+    if metrics.enabled:
+        metrics.sample_storage(ring, NODE_IDS["v2"])
+
+    return {
+        "version": "v2",
+        "nodes": nodes,
+        "keys": keys,
+        "rate": rate,
+        "duration": duration,
+        "read_ratio": read_ratio,
+        "zipf": zipf,
+        "service_time": service_time,
+        "concurrency": concurrency,
+        "read_balancing": read_balancing,
+        "coalesce": coalesce,
+        "seed": seed,
+        "timeout": timeout,
+        "offered": offered,
+        "completed": len(latencies),
+        "timed_out": timed_out,
+        "coalesced": dht_v2.Node.coalesced_reads - coalesced_before,
+        "max_mean_served": round(served_balance(ring), 3),
+        "throughput": round(len(latencies) / duration, 3),
+        "mean_queue_wait": round(network.queue_wait / network.messages, 3) if network.messages else 0.0,
+        "max_queue": network.max_queue,
+        "mean_latency": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_latency": round(percentile(latencies, 50), 3),
+        "p99_latency": round(percentile(latencies, 99), 3),
+    }
+
+
+def load_sweep(node_counts, keys, rates, duration, read_ratio, seed=0, metrics_path=None, **options):
+    """ Exécute run_load pour chaque taille d'anneau et chaque débit offert. """
+    rows = []
+    for nodes, rate in itertools.product(node_counts, rates):
+        row = run_load(nodes, keys, rate, duration, read_ratio, seed, **options)
+        print(" | ".join(f"{row[field]}" for field in LOAD_FIELDS))
+        rows.append(row)
+        if metrics_path:
+            stem, extension = os.path.splitext(metrics_path)
+            metrics.write(f"{stem}-{len(rows)}{extension}")
+    return rows
+
+
+def run_compact(nodes, keys, seed=0, vnodes=1, replication=3):
+    """ Construit un anneau compact, y résout keys clés et renvoie une ligne de résultats. """
+    from . import compact  # NumPy n'est nécessaire que pour ce mode
+
+    hosts = [f"node-{seed}-{i}" for i in range(nodes)]
+    key_set = [f"key-{seed}-{i}" for i in range(keys)]
+
+    start = time.perf_counter()
+    ring = compact.CompactRing.from_hosts(hosts, vnodes, replication)
+    build_wall = time.perf_counter() - start
+
+    positions = compact.key_positions(key_set)
+    start = time.perf_counter()
+    ring.store_positions(positions)
+    ring.key_owners()
+    resolve_wall = time.perf_counter() - start
+    stats = ring.statistics()
+
+    return {
+        "version": "compact",
+        "nodes": nodes,
+        "vnodes": vnodes,
+        "keys": keys,
+        "replication": replication,
+        "seed": seed,
+        "build_wall_s": round(build_wall, 4),
+        "resolve_wall_s": round(resolve_wall, 4),
+        "keys_per_s": round(keys / resolve_wall) if resolve_wall else 0,
+        "array_kb": round(ring.nbytes() / 1024, 1),
+        "max_mean_keys": stats["max_mean_keys"],
+        "max_mean_load": stats["max_mean_load"],
+        "max_mean_stored": stats["max_mean_stored"],
+        "empty_nodes": stats["empty_nodes"],
+        "full_spread_ratio": stats["full_spread_ratio"],
+    }
+
+
+def compact_sweep(node_counts, key_counts, seed=0, vnode_counts=(1,), replications=(3,)):
+    """ Exécute run_compact pour chaque combinaison de paramètres. """
+    rows = []
+    for nodes, vnodes, keys, replication in itertools.product(node_counts, vnode_counts, key_counts, replications):
+        row = run_compact(nodes, keys, seed, vnodes, replication)
+        print(" | ".join(f"{row[field]}" for field in COMPACT_FIELDS))
+        rows.append(row)
+    return rows
+
+
+def run_large(nodes, object_size, chunk_size, objects=10, seed=0, replication=3, latency=1.0, jitter=0.0,
+              bandwidth=2 ** 20, service_time=0.0):
+    """ Stocke puis relit objects valeurs de object_size octets dans un anneau v2 et renvoie une ligne de résultats.
+
+    Les valeurs sont découpées en morceaux de chunk_size octets (0 : valeurs entières) ; chaque
+    lecture part d'un nœud qui ne détient pas la valeur, si bien qu'elle traverse le réseau.
+    """
+    random.seed(seed)
+    hosts = [f"node-{seed}-{i}" for i in range(nodes)]
+    keys = [f"object-{seed}-{i}" for i in range(objects)]
+
+    env = simpy.Environment()
+    previous = apply_settings(dht_v2.Node, chunk_size=chunk_size, replication_factor=replication)
+    puts = []
+    gets = []
+    try:
+        ring = build_ring_v2(env, hosts, 1)
+        transfers_before = dht_v2.Node.transfer_count
+        dht_v2.Node.network = Network(env, LinkModel(latency, jitter, bandwidth), service_time)
+        for key in keys:
+            content = random.randbytes(object_size)
+            event = random.choice(ring).put_large(key, content)
+            env.run(until=event)
+            puts.append(event.value.latency)
+            reader = random.choice([node for node in ring if key not in node.data_store] or ring)
+            event = reader.get_large(key)
+            env.run(until=event)
+            if event.value.value != content:
+                raise RuntimeError(f"Valeur relue différente pour {key}")
+            gets.append(event.value.latency)
+    finally:
+        dht_v2.Node.network = None
+        apply_settings(dht_v2.Node, **previous)
+    mean_get = sum(gets) / len(gets) if gets else 0.0
+
+    return {
+        "version": "v2",
+        "nodes": nodes,
+        "objects": objects,
+        "object_kb": round(object_size / 1024, 1),
+        "chunk_kb": round(chunk_size / 1024, 1),
+        "replication": replication,
+        "bandwidth": bandwidth,
+        "seed": seed,
+        "chunks_per_object": math.ceil(object_size / chunk_size) if chunk_size and object_size > chunk_size else 1,
+        "transfers": dht_v2.Node.transfer_count - transfers_before,
+        "mean_put_latency": round(sum(puts) / len(puts), 3) if puts else 0.0,
+        "mean_get_latency": round(mean_get, 3),
+        "get_mb_per_time": round(object_size / 2 ** 20 / mean_get, 3) if mean_get else 0.0,
+    }
+
+
+def large_sweep(node_counts, object_sizes, chunk_sizes, objects=10, seed=0, replications=(3,), **options):
+    """ Exécute run_large pour chaque combinaison de paramètres. """
+    rows = []
+    for nodes, object_size, chunk_size, replication in itertools.product(node_counts, object_sizes, chunk_sizes,
+                                                                         replications):
+        row = run_large(nodes, object_size, chunk_size, objects, seed, replication, **options)
+        print(" | ".join(f"{row[field]}" for field in LARGE_FIELDS))
+        rows.append(row)
+    return rows
+
+
+def run_batch(version, nodes, keys, seed=0, vnodes=1):
+    """ Écrit puis relit keys clés une par une, puis par lots (put_many, get_many), depuis le même nœud
+    de deux anneaux amorcés identiques, et renvoie une ligne de résultats.
+
+    Les gains sont les rapports entre les deux modes : temps réel des écritures et des lectures,
+    sauts de routage et, pour dht_v2, temps simulé (dht_v1 n'avance pas le temps simulé).
+    """
+    module, _, write, read, _, _ = IMPLEMENTATIONS[version]
+    put_many, get_many = BATCH_OPERATIONS[version]
+    hosts = [f"node-{seed}-{i}" for i in range(nodes) for _ in range(vnodes)]
+    node_ids = [virtual_node_id(f"node-{seed}-{i}", index) for i in range(nodes) for index in range(vnodes)]
+    key_set = [f"key-{seed}-{i}" for i in range(keys)]
+
+    measures = {}
+    for mode in ("single", "batch"):
+        random.seed(seed)
+        env, ring = module.bootstrap(node_ids, hosts)
+        client = random.choice(ring)
+        hops_before = module.Node.hop_count
+        start = time.perf_counter()
+        if mode == "single":
+            for key in key_set:
+                write(env, client, key)
+        else:
+            put_many(env, client, key_set)
+        put_wall = time.perf_counter() - start
+        start = time.perf_counter()
+        if mode == "single":
+            for key in key_set:
+                read(env, client, key)
+        else:
+            results = get_many(env, client, key_set)
+        get_wall = time.perf_counter() - start
+        measures[mode] = (put_wall, get_wall, module.Node.hop_count - hops_before, env.now)
+    missing = [key for key in key_set if results[key][:2] != (True, f"Value for {key}")]
+    if missing:
+        raise RuntimeError(f"{len(missing)} clés non relues par get_many, dont {missing[0]}")
+
+    def ratio(single, batch):
+        return round(single / batch, 1) if batch else 0.0
+
+    (single_put, single_get, single_hops, single_sim), (batch_put, batch_get, batch_hops, batch_sim) = \
+        measures["single"], measures["batch"]
+    return {
+        "version": version,
+        "nodes": nodes,
+        "vnodes": vnodes,
+        "keys": keys,
+        "seed": seed,
+        "single_put_wall_s": round(single_put, 4),
+        "batch_put_wall_s": round(batch_put, 4),
+        "put_wall_speedup": ratio(single_put, batch_put),
+        "single_get_wall_s": round(single_get, 4),
+        "batch_get_wall_s": round(batch_get, 4),
+        "get_wall_speedup": ratio(single_get, batch_get),
+        "single_hops": single_hops,
+        "batch_hops": batch_hops,
+        "hop_speedup": ratio(single_hops, batch_hops),
+        "single_sim_time": round(single_sim, 3),
+        "batch_sim_time": round(batch_sim, 3),
+        "sim_speedup": ratio(single_sim, batch_sim),
+    }
+
+
+def batch_sweep(versions, node_counts, key_counts, seed=0, vnode_counts=(1,)):
+    """ Exécute run_batch pour chaque combinaison de paramètres. """
+    rows = []
+    for version, nodes, vnodes, keys in itertools.product(versions, node_counts, vnode_counts, key_counts):
+        row = run_batch(version, nodes, keys, seed, vnodes)
+        print(" | ".join(f"{row[field]}" for field in BATCH_FIELDS))
+        rows.append(row)
+    return rows
+
+
+def write_csv(rows, path, fields=FIELDS):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_json(rows, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des implémentations de la DHT.")
+    parser.add_argument("--versions", nargs="+", default=["v1", "v2"], choices=sorted(IMPLEMENTATIONS))
+    parser.add_argument("--nodes", nargs="+", type=int, default=[10, 100])
+    parser.add_argument("--vnodes", nargs="+", type=int, default=[1, 8], help="nœuds virtuels par nœud physique")
+    parser.add_argument("--keys", nargs="+", type=int, default=[1000])
+    parser.add_argument("--read-ratio", nargs="+", type=float, default=[0.5, 0.9])
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--zipf", type=float, default=0.0, help="exposant de la loi de Zipf des clés (0 : uniforme)")
+    parser.add_argument("--cache-size", nargs="+", type=int, default=[0], help="entrées du cache par nœud (0 : désactivé)")
+    parser.add_argument("--cache-ttl", type=float, help="durée de vie des entrées en temps simulé")
+    parser.add_argument("--replication", nargs="+", type=int, default=[3], help="facteur de réplication (copies par clé)")
+    parser.add_argument("--churn", nargs="+", type=float, default=[0.0], help="probabilité d'un départ et d'une arrivée avant chaque opération")
+    parser.add_argument("--load", nargs="+", type=float, help="débits offerts (requêtes par unité de temps) pour dht_v2")
+    parser.add_argument("--duration", type=float, default=100.0, help="durée simulée de chaque mesure de charge")
+    parser.add_argument("--service-time", type=float, default=0.1, help="temps de service d'un message par un worker")
+    parser.add_argument("--concurrency", type=int, default=1, help="workers par boîte de réception")
+    parser.add_argument("--latency", type=float, default=1.0, help="latence fixe des liens")
+    parser.add_argument("--jitter", type=float, default=0.0, help="gigue uniforme ajoutée à la latence")
+    parser.add_argument("--bandwidth", type=float, help="bande passante des liens (octets par unité de temps)")
+    parser.add_argument("--timeout", type=float, help="délai maximal de chaque requête de --load")
+    parser.add_argument("--batch", action="store_true", help="écritures et lectures une par une puis par lots (put_many, get_many)")
+    parser.add_argument("--compact", action="store_true", help="anneau compact NumPy : résolution vectorisée et statistiques")
+    parser.add_argument("--object-size", nargs="+", type=int, help="tailles des grandes valeurs (octets) stockées puis relues par dht_v2")
+    parser.add_argument("--chunk-size", nargs="+", type=int, default=[CHUNK_SIZE], help="taille des morceaux des grandes valeurs (0 : valeurs entières)")
+    parser.add_argument("--objects", type=int, default=10, help="nombre de grandes valeurs par mesure de --object-size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bootstrap", action="store_true", help="amorcer l'anneau et les clés directement, sans rejouer les ajouts")
+    parser.add_argument("--no-read-balancing", action="store_true", help="le premier détenteur atteint sert chaque lecture")
+    parser.add_argument("--no-coalescing", action="store_true", help="ne pas regrouper les lectures simultanées d'une clé (--load)")
+    parser.add_argument("--storage", help="répertoire des journaux sur disque des nœuds (par défaut : stockage en mémoire)")
+    parser.add_argument("--snapshots", help="répertoire des instantanés des anneaux construits, rechargés aux exécutions suivantes")
+    parser.add_argument("--no-memory", action="store_true", help="ne pas suivre le pic mémoire (tracemalloc ralentit l'exécution)")
+    parser.add_argument("--csv", help="fichier CSV de sortie")
+    parser.add_argument("--json", help="fichier JSON de sortie")
+    parser.add_argument("--metrics", help="active les métriques par nœud et les exporte (.json ou .csv) après chaque exécution")
+    args = parser.parse_args(argv)
+
+    logger.configure(level=OFF)
+    if args.metrics:
+        metrics.configure(enabled=True)
+    if args.load:
+        print(" | ".join(LOAD_FIELDS))
+        rows = load_sweep(args.nodes, args.keys[0], args.load, args.duration, args.read_ratio[0], args.seed,
+                          service_time=args.service_time, concurrency=args.concurrency, latency=args.latency,
+                          jitter=args.jitter, bandwidth=args.bandwidth, zipf=args.zipf, timeout=args.timeout,
+                          read_balancing=not args.no_read_balancing, coalesce=not args.no_coalescing,
+                          metrics_path=args.metrics)
+        if args.csv:
+            write_csv(rows, args.csv, LOAD_FIELDS)
+        if args.json:
+            write_json(rows, args.json)
+        return
+    if args.object_size:
+        print(" | ".join(LARGE_FIELDS))
+        rows = large_sweep(args.nodes, args.object_size, args.chunk_size, args.objects, args.seed, args.replication,
+                           latency=args.latency, jitter=args.jitter, bandwidth=args.bandwidth or 2 ** 20)
+        if args.csv:
+            write_csv(rows, args.csv, LARGE_FIELDS)
+        if args.json:
+            write_json(rows, args.json)
+        return
+    if args.batch:
+        print(" | ".join(BATCH_FIELDS))
+        rows = batch_sweep(args.versions, args.nodes, args.keys, args.seed, args.vnodes)
+        if args.csv:
+            write_csv(rows, args.csv, BATCH_FIELDS)
+        if args.json:
+            write_json(rows, args.json)
+        return
+    if args.compact:
+        print(" | ".join(COMPACT_FIELDS))
+        rows = compact_sweep(args.nodes, args.keys, args.seed, args.vnodes, args.replication)
+        if args.csv:
+            write_csv(rows, args.csv, COMPACT_FIELDS)
+        if args.json:
+            write_json(rows, args.json)
+        return
+
+    print(" | ".join(FIELDS))
+    rows = sweep(args.versions, args.nodes, args.keys, args.read_ratio, args.ops, args.seed,
+                 not args.no_memory, args.vnodes, args.zipf, args.cache_size, args.cache_ttl, args.bootstrap,
+                 args.churn, args.replication, args.metrics, args.storage, not args.no_read_balancing,
+                 args.snapshots)
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.json:
+        write_json(rows, args.json)
+
+
+if __name__ == "__main__":
+    main()
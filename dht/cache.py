@@ -0,0 +1,53 @@
+# -------------------------------
+# Cache des résultats de recherche le long des chemins de routage
+# -------------------------------
+
+from collections import OrderedDict
+
+
+class LookupCache:
+    """ Cache LRU borné clé -> (valeur, nœud détenteur), avec durée de vie optionnelle.
+
+    Les nœuds traversés par une recherche y gardent la réponse : la requête suivante pour
+    la même clé s'arrête au premier nœud du chemin qui la connaît encore. La durée de vie
+    est exprimée en temps simulé (env.now) ; None signifie sans expiration.
+    """
+
+    def __init__(self, capacity, ttl=None):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.entries = OrderedDict()  # clé -> (valeur, détenteur, date d'expiration)
+
+    def get(self, key, now):
+        """ Renvoie (valeur, détenteur) si la clé est en cache et n'a pas expiré, sinon None. """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, holder, expires = entry
+        if expires is not None and now >= expires:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value, holder
+
+    def put(self, key, value, holder, now):
+        """ Met la réponse en cache ; renvoie (clé, détenteur) de l'entrée évincée, s'il y en a une. """
+        expires = None if self.ttl is None else now + self.ttl
+        self.entries[key] = (value, holder, expires)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            evicted_key, (_, evicted_holder, _) = self.entries.popitem(last=False)
+            return evicted_key, evicted_holder
+        return None
+
+    def invalidate(self, key):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,80 @@
+# -------------------------------
+# Grandes valeurs : découpage en morceaux adressés par leur contenu
+# -------------------------------
+#
+# Une valeur plus grande que CHUNK_SIZE est découpée en morceaux ; chaque morceau est stocké
+# sous une ChunkKey (clé de la valeur, empreinte du morceau) et la clé elle-même reçoit un
+# Manifest qui liste les empreintes dans l'ordre. Une ChunkKey est placée sur l'anneau à la
+# position de la clé de sa valeur : les morceaux sont stockés, répliqués, migrés et réparés
+# avec le manifeste, par les mêmes détenteurs.
+
+import hashlib
+
+# Taille des morceaux (octets) ; les valeurs qui tiennent dans un morceau restent entières
+CHUNK_SIZE = 256 * 1024
+
+
+def chunk_digest(chunk):
+    return hashlib.sha1(chunk).hexdigest()
+
+
+class ChunkKey:
+    """ Clé d'un morceau : la clé de la valeur (anchor), qui fixe sa position, et l'empreinte du morceau. """
+
+    __slots__ = ("anchor", "digest")
+
+    def __init__(self, anchor, digest):
+        self.anchor = anchor
+        self.digest = digest
+
+    def __eq__(self, other):
+        return isinstance(other, ChunkKey) and other.anchor == self.anchor and other.digest == self.digest
+
+    def __hash__(self):
+        return hash((self.anchor, self.digest))
+
+    def __repr__(self):
+        return f"ChunkKey({self.anchor!r}, {self.digest[:12]})"
+
+
+class Manifest:
+    """ Description d'une valeur découpée : taille totale et empreintes des morceaux dans l'ordre. """
+
+    __slots__ = ("size", "digests")
+
+    def __init__(self, size, digests):
+        self.size = size
+        self.digests = digests
+
+    def chunk_keys(self, key):
+        """ Clés des morceaux distincts de la valeur, dans l'ordre de première apparition. """
+        return [ChunkKey(key, digest) for digest in dict.fromkeys(self.digests)]
+
+    def __eq__(self, other):
+        return isinstance(other, Manifest) and other.size == self.size and other.digests == self.digests
+
+    def __repr__(self):
+        return f"Manifest({self.size} octets, {len(self.digests)} morceaux)"
+
+
+def split(key, content, chunk_size=CHUNK_SIZE):
+    """ Découpe content (octets) et renvoie son manifeste et la liste des morceaux distincts [(ChunkKey, octets)]. """
+    digests = []
+    chunks = {}
+    for offset in range(0, len(content), chunk_size):
+        chunk = bytes(content[offset:offset + chunk_size])
+        digest = chunk_digest(chunk)
+        digests.append(digest)
+        chunks.setdefault(digest, chunk)
+    return Manifest(len(content), digests), [(ChunkKey(key, digest), chunk) for digest, chunk in chunks.items()]
+
+
+def assemble(manifest, chunks):
+    """ Reconstitue la valeur à partir des morceaux {empreinte: octets} ; une empreinte fausse lève ValueError. """
+    for digest, chunk in chunks.items():
+        if chunk_digest(chunk) != digest:
+            raise ValueError(f"Morceau corrompu : {digest}")
+    content = b"".join(chunks[digest] for digest in manifest.digests)
+    if len(content) != manifest.size:
+        raise ValueError(f"Taille reconstituée {len(content)} au lieu de {manifest.size}")
+    return content
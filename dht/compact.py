@@ -0,0 +1,228 @@
+# -------------------------------
+# Anneau compact : structure de tableaux NumPy
+# -------------------------------
+#
+# Variante de l'anneau pour les très grandes tailles (un million de nœuds et plus) : au lieu
+# d'un objet Python par nœud, les identifiants, les voisins, les nœuds physiques et les
+# positions des clés sont rangés dans des tableaux NumPy. La résolution du responsable d'un
+# lot de clés se fait en un appel à np.searchsorted, et les statistiques de l'anneau (charge,
+# placement des répliques) sont calculées sans boucle Python. Ce module n'est pas importé par
+# dht.v1 ni dht.v2 : NumPy n'est chargé que si l'anneau compact est utilisé.
+
+import numpy as np
+
+from .keyspace import REPLICATION_FACTOR, hash_key, replica_span, virtual_node_id
+
+
+def key_positions(keys):
+    """ Positions d'une liste de clés sur l'anneau (tableau uint64). """
+    return np.fromiter((hash_key(key) for key in keys), dtype=np.uint64, count=len(keys))
+
+
+def host_labels(node_ids, hosts):
+    """ Noms des nœuds physiques (par défaut, chaque nœud est son propre nœud physique). """
+    if hosts is None:
+        hosts = [int(node_id) for node_id in node_ids]
+    return np.array([str(host) for host in hosts], dtype=object)
+
+
+class NodeView:
+    """ Vue d'un nœud de l'anneau compact, créée à la demande (identifiant, nœud physique, voisins). """
+
+    __slots__ = ("ring", "index")
+
+    def __init__(self, ring, index):
+        self.ring = ring
+        self.index = index
+
+    @property
+    def identifier(self):
+        return int(self.ring.ids[self.index])
+
+    @property
+    def host(self):
+        return self.ring.host_names[self.ring.hosts[self.index]]
+
+    @property
+    def left(self):
+        return NodeView(self.ring, int(self.ring.left[self.index]))
+
+    @property
+    def right(self):
+        return NodeView(self.ring, int(self.ring.right[self.index]))
+
+    def __eq__(self, other):
+        return isinstance(other, NodeView) and other.ring is self.ring and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.ring), self.index))
+
+    def __repr__(self):
+        return f"NodeView({self.identifier})"
+
+
+class CompactRing:
+    """ Anneau stocké en colonnes : un nœud est un indice dans des tableaux triés par identifiant.
+
+    ids (uint64) contient les identifiants triés, left et right les indices des voisins,
+    hosts l'indice du nœud physique de chaque nœud virtuel (dans host_names). Les positions des
+    clés stockées sont gardées dans key_positions ; les nombres de clés par nœud en sont déduits
+    et recalculés après un changement de composition de l'anneau. Comme dans dht.v1 et dht.v2,
+    le responsable d'une position est le nœud le plus proche (égalité : le prédécesseur) et ses
+    répliques sont ses voisins, alternativement à gauche et à droite.
+    """
+
+    __slots__ = ("ids", "left", "right", "hosts", "host_names", "replication_factor", "key_positions",
+                 "_owners")
+
+    def __init__(self, node_ids, hosts=None, replication_factor=REPLICATION_FACTOR):
+        self.replication_factor = replication_factor
+        self.key_positions = np.empty(0, dtype=np.uint64)
+        self._arrange(np.asarray(node_ids, dtype=np.uint64), host_labels(node_ids, hosts))
+
+    @classmethod
+    def from_hosts(cls, hosts, virtual_nodes=1, replication_factor=REPLICATION_FACTOR):
+        """ Anneau de nœuds physiques nommés, chacun placé en virtual_nodes positions. """
+        node_ids = [virtual_node_id(host, index) for host in hosts for index in range(virtual_nodes)]
+        owners = [host for host in hosts for _ in range(virtual_nodes)]
+        return cls(node_ids, owners, replication_factor)
+
+    def _arrange(self, ids, names):
+        """ Trie les nœuds par identifiant, numérote les nœuds physiques et relie les voisins. """
+        order = np.argsort(ids, kind="stable")
+        ids = ids[order]
+        if len(ids) > 1 and (ids[1:] == ids[:-1]).any():
+            raise ValueError("Identifiants de nœuds en double")
+        self.ids = ids
+        self.host_names, host_index = np.unique(names[order], return_inverse=True)
+        self.hosts = host_index.astype(np.int32)
+        indices = np.arange(len(ids), dtype=np.int64)
+        self.left = np.roll(indices, 1)
+        self.right = np.roll(indices, -1)
+        self._owners = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def node(self, index):
+        return NodeView(self, index)
+
+    # -------------------------------
+    # Composition de l'anneau
+    # -------------------------------
+
+    def add(self, node_ids, hosts=None):
+        """ Ajoute un lot de nœuds ; les clés dont le responsable change sont réattribuées. """
+        ids = np.concatenate((self.ids, np.asarray(node_ids, dtype=np.uint64)))
+        names = np.concatenate((self.host_names[self.hosts], host_labels(node_ids, hosts)))
+        self._arrange(ids, names)
+
+    def remove(self, node_ids):
+        """ Retire un lot de nœuds ; leurs clés reviennent à leurs nouveaux responsables. """
+        keep = ~np.isin(self.ids, np.asarray(node_ids, dtype=np.uint64))
+        self._arrange(self.ids[keep], self.host_names[self.hosts[keep]])
+
+    # -------------------------------
+    # Résolution des responsables
+    # -------------------------------
+
+    def owners(self, positions):
+        """ Indices des nœuds responsables d'un tableau de positions, en un appel vectorisé. """
+        positions = np.asarray(positions, dtype=np.uint64)
+        count = len(self.ids)
+        successor = np.searchsorted(self.ids, positions, side="left") % count
+        predecessor = (successor - 1) % count
+        # Les soustractions uint64 débordent modulo 2^64, comme les distances sur l'anneau
+        to_predecessor = positions - self.ids[predecessor]
+        to_successor = self.ids[successor] - positions
+        exact = to_successor == 0
+        return np.where(~exact & (to_predecessor <= to_successor), predecessor, successor)
+
+    def find_responsible_node(self, key):
+        return self.node(int(self.owners(np.array([hash_key(key)], dtype=np.uint64))[0]))
+
+    def replicas(self, owners):
+        """ Matrice (clés × copies) des indices des détenteurs : le responsable puis ses voisins alternés. """
+        count = len(self.ids)
+        copies = min(self.replication_factor, count)
+        left_count, right_count = replica_span(copies)
+        offsets = [0]
+        for distance in range(1, max(left_count, right_count) + 1):
+            if distance <= left_count:
+                offsets.append(-distance)
+            if distance <= right_count:
+                offsets.append(distance)
+        return (np.asarray(owners)[:, None] + np.array(offsets)) % count
+
+    # -------------------------------
+    # Clés et statistiques
+    # -------------------------------
+
+    def store(self, keys):
+        """ Enregistre un lot de clés (seules leurs positions sont gardées). """
+        self.store_positions(key_positions(keys))
+
+    def store_positions(self, positions):
+        self.key_positions = np.concatenate((self.key_positions, np.asarray(positions, dtype=np.uint64)))
+        self._owners = None
+
+    def key_owners(self):
+        if self._owners is None or len(self._owners) != len(self.key_positions):
+            self._owners = self.owners(self.key_positions)
+        return self._owners
+
+    def key_counts(self):
+        """ Nombre de clés primaires par nœud. """
+        return np.bincount(self.key_owners(), minlength=len(self.ids))
+
+    def stored_counts(self):
+        """ Nombre d'entrées (primaires et répliques) par nœud. """
+        return np.bincount(self.replicas(self.key_owners()).ravel(), minlength=len(self.ids))
+
+    def host_loads(self):
+        """ Nombre de clés primaires par nœud physique. """
+        return np.bincount(self.hosts, weights=self.key_counts(), minlength=len(self.host_names))
+
+    def arc_fractions(self):
+        """ Part de l'anneau dont chaque nœud est responsable (de mi-chemin à mi-chemin de ses voisins). """
+        count = len(self.ids)
+        if count == 1:
+            return np.ones(1)
+        gaps = (self.ids[self.right] - self.ids).astype(np.float64)  # écart jusqu'au voisin droit
+        gaps[-1] = float((int(self.ids[0]) - int(self.ids[-1])) % 2 ** 64)
+        return (gaps + gaps[self.left]) / 2 / 2.0 ** 64
+
+    def distinct_hosts(self):
+        """ Nombre de nœuds physiques distincts parmi les détenteurs de chaque clé. """
+        holders = np.sort(self.hosts[self.replicas(self.key_owners())], axis=1)
+        return 1 + (holders[:, 1:] != holders[:, :-1]).sum(axis=1)
+
+    def statistics(self):
+        """ Statistiques de l'anneau : répartition de la charge et placement des répliques. """
+        keys = self.key_counts()
+        loads = self.host_loads()
+        stored = self.stored_counts()
+        distinct = self.distinct_hosts() if len(self.key_positions) else np.zeros(0)
+        copies = min(self.replication_factor, len(self.ids))
+
+        def max_mean(values):
+            mean = values.mean() if len(values) else 0.0
+            return float(values.max() / mean) if mean else 0.0
+
+        return {
+            "nodes": len(self.ids),
+            "hosts": len(self.host_names),
+            "keys": len(self.key_positions),
+            "max_mean_keys": round(max_mean(keys), 3),
+            "max_mean_load": round(max_mean(loads), 3),
+            "max_mean_stored": round(max_mean(stored), 3),
+            "p99_keys": float(np.percentile(keys, 99)) if len(keys) else 0.0,
+            "empty_nodes": int((keys == 0).sum()),
+            "max_arc_fraction": float(self.arc_fractions().max()),
+            "full_spread_ratio": round(float((distinct == copies).mean()), 3) if len(distinct) else 0.0,
+        }
+
+    def nbytes(self):
+        """ Mémoire occupée par les tableaux de l'anneau, en octets. """
+        arrays = (self.ids, self.left, self.right, self.hosts, self.key_positions)
+        return sum(array.nbytes for array in arrays) + (self._owners.nbytes if self._owners is not None else 0)
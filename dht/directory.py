@@ -0,0 +1,93 @@
+# -------------------------------
+# Annuaire trié des nœuds de l'anneau
+# -------------------------------
+
+import bisect
+
+from .keyspace import ID_SPACE, replica_span
+from .storage import PRIMARY, LEFT_REPLICA, RIGHT_REPLICA
+
+
+class RingDirectory:
+    """ Index trié des identifiants présents sur l'anneau, tenu à jour à côté des pointeurs left/right.
+
+    Le point d'insertion d'un nouveau nœud et le successeur ou le prédécesseur d'une position
+    se trouvent par dichotomie en O(log N), sans parcourir l'anneau.
+    """
+
+    def __init__(self):
+        self.ids = []  # Identifiants triés
+        self.nodes = {}  # identifiant -> nœud
+
+    def add(self, node_id, node):
+        if node_id in self.nodes:
+            raise ValueError(f"Nœud avec l'identifiant {node_id} existe déjà!")
+        bisect.insort(self.ids, node_id)
+        self.nodes[node_id] = node
+
+    def remove(self, node_id):
+        del self.ids[bisect.bisect_left(self.ids, node_id)]
+        del self.nodes[node_id]
+
+    def successor(self, position):
+        """ Premier nœud dont l'identifiant est supérieur ou égal à la position (circulairement). """
+        index = bisect.bisect_left(self.ids, position % ID_SPACE)
+        return self.nodes[self.ids[index % len(self.ids)]]
+
+    def predecessor(self, position):
+        """ Dernier nœud dont l'identifiant est strictement inférieur à la position : position ∈ ]n, n.right]. """
+        index = bisect.bisect_left(self.ids, position % ID_SPACE) - 1
+        return self.nodes[self.ids[index]]
+
+    def floor(self, position):
+        """ Dernier nœud dont l'identifiant est inférieur ou égal à la position (circulairement). """
+        index = bisect.bisect_right(self.ids, position % ID_SPACE) - 1
+        return self.nodes[self.ids[index]]
+
+    def owner(self, position):
+        """ Nœud le plus proche de la position (distance circulaire ; égalité : le prédécesseur l'emporte). """
+        return self.nodes[self.ids[self.owner_index(position)]]
+
+    def owner_index(self, position):
+        """ Rang dans ids du responsable de la position (voir owner). """
+        position %= ID_SPACE
+        index = bisect.bisect_left(self.ids, position)
+        successor = self.ids[index % len(self.ids)]
+        predecessor = self.ids[index - 1]
+        if successor == position or (successor - position) % ID_SPACE < (position - predecessor) % ID_SPACE:
+            return index % len(self.ids)
+        return (index - 1) % len(self.ids)
+
+    def replicas(self, position, replication_factor):
+        """ Détenteurs de la position avec leur rôle : le responsable, puis ses voisins du plus proche au
+        plus éloigné, alternativement à gauche et à droite, jusqu'à replication_factor nœuds distincts.
+
+        Même placement que Node.replica_nodes (dht.v1, dht.v2), lu dans l'annuaire plutôt qu'en
+        suivant les pointeurs left/right.
+        """
+        ids = self.ids
+        index = self.owner_index(position)
+        left_count, right_count = replica_span(replication_factor)
+        holders = [(self.nodes[ids[index]], PRIMARY)]
+        seen = {index}
+        for distance in range(1, max(left_count, right_count) + 1):
+            for count, step, role in ((left_count, -distance, LEFT_REPLICA), (right_count, distance, RIGHT_REPLICA)):
+                neighbour = (index + step) % len(ids)
+                if distance <= count and neighbour not in seen:
+                    holders.append((self.nodes[ids[neighbour]], role))
+                    seen.add(neighbour)
+        return holders
+
+    def clear(self):
+        self.ids.clear()
+        self.nodes.clear()
+
+    def __contains__(self, node_id):
+        return node_id in self.nodes
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        # Nœuds dans l'ordre croissant des identifiants
+        return (self.nodes[node_id] for node_id in list(self.ids))
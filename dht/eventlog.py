@@ -0,0 +1,94 @@
+# -------------------------------
+# Journal d'événements de la simulation
+# -------------------------------
+
+import atexit
+import json
+
+# Niveaux de journalisation (OFF désactive toute sortie)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING"}
+
+
+class EventLogger:
+    """ Journal d'événements filtré par niveau.
+
+    Chaque événement est un gabarit et ses champs : le texte n'est formaté que si le niveau
+    est actif, si bien qu'un journal désactivé ne coûte qu'une comparaison d'entiers.
+    Les événements peuvent être affichés sur la console et/ou écrits dans un fichier
+    JSON Lines via un tampon vidé par blocs.
+    """
+
+    def __init__(self, level=DEBUG, console=True, path=None, buffer_size=1000):
+        self.level = level
+        self.console = console
+        self.stream = None  # None : sortie standard courante
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.file = None
+        if path is not None:
+            self.file = open(path, "a", encoding="utf-8")
+
+    def configure(self, level=None, console=None, path=None, buffer_size=None):
+        """ Modifie le niveau et les sorties du journal en cours de route. """
+        if level is not None:
+            self.level = level
+        if console is not None:
+            self.console = console
+        if buffer_size is not None:
+            self.buffer_size = buffer_size
+        if path is not None:
+            self.close()
+            self.file = open(path, "a", encoding="utf-8")
+
+    def enabled(self, level):
+        """ Vrai si un événement de ce niveau serait émis ; à tester avant un calcul coûteux. """
+        return level >= self.level
+
+    def log(self, level, event, template, **fields):
+        if level < self.level:
+            return
+        text = template.format(**fields)
+        if self.console:
+            print(text, file=self.stream)
+        if self.file is not None:
+            record = {"level": LEVEL_NAMES.get(level, level), "event": event}
+            record.update(fields)
+            record["message"] = text
+            self.buffer.append(json.dumps(record, ensure_ascii=False, default=str))
+            if len(self.buffer) >= self.buffer_size:
+                self.flush()
+
+    def debug(self, event, template, **fields):
+        if DEBUG >= self.level:
+            self.log(DEBUG, event, template, **fields)
+
+    def info(self, event, template, **fields):
+        if INFO >= self.level:
+            self.log(INFO, event, template, **fields)
+
+    def warning(self, event, template, **fields):
+        if WARNING >= self.level:
+            self.log(WARNING, event, template, **fields)
+
+    def flush(self):
+        """ Écrit le tampon JSON Lines dans le fichier. """
+        if self.file is not None and self.buffer:
+            self.file.write("\n".join(self.buffer) + "\n")
+            self.file.flush()
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+# Journal partagé par les deux implémentations
+logger = EventLogger()
+atexit.register(logger.close)
@@ -0,0 +1,101 @@
+# -------------------------------
+# Espace des identifiants et hachage cohérent
+# -------------------------------
+
+import bisect
+import hashlib
+
+from operator import itemgetter
+
+# Les nœuds et les clés sont placés sur un anneau de 2^ID_BITS positions
+ID_BITS = 64
+ID_SPACE = 2 ** ID_BITS
+
+# Nombre de nœuds virtuels par nœud physique (valeur par défaut des scénarios)
+VIRTUAL_NODES = 1
+
+# Longueur par défaut des listes de successeurs et de prédécesseurs de chaque nœud
+NEIGHBOUR_LIST_SIZE = 4
+
+# Facteur de réplication par défaut : le responsable d'une clé et ses deux voisins immédiats
+REPLICATION_FACTOR = 3
+
+
+def hash_key(key):
+    """ Position d'une clé (chaîne, octets ou autre) sur l'anneau, par SHA-1 tronqué à ID_BITS bits.
+
+    Une clé qui porte un attribut anchor (chunks.ChunkKey) est placée à la position de anchor.
+    """
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    elif not isinstance(key, (bytes, bytearray)):
+        anchor = getattr(key, "anchor", None)
+        if anchor is not None:
+            return hash_key(anchor)
+        key = str(key).encode("utf-8")
+    digest = hashlib.sha1(key).digest()
+    return int.from_bytes(digest, "big") >> (160 - ID_BITS)
+
+
+def virtual_node_id(host, index):
+    """ Position du index-ième nœud virtuel du nœud physique host. """
+    return hash_key(f"{host}#{index}")
+
+
+def replica_span(factor):
+    """ Nombres de répliques à gauche et à droite du responsable pour un facteur de réplication donné. """
+    left = (factor - 1) // 2
+    return left, factor - 1 - left
+
+
+def in_interval(value, start, end):
+    """ Vérifie si value appartient à l'intervalle circulaire ]start, end]. """
+    if start == end:
+        return True
+    return 0 < (value - start) % ID_SPACE <= (end - start) % ID_SPACE
+
+
+def in_open_interval(value, start, end):
+    """ Vérifie si value appartient à l'intervalle circulaire ]start, end[. """
+    if start == end:
+        return value != start
+    return 0 < (value - start) % ID_SPACE < (end - start) % ID_SPACE
+
+
+def midpoint(start, end):
+    """ Dernière position de l'arc ]start, end[ plus proche de start que de end (égalité : start). """
+    return (start + ((end - start) % ID_SPACE) // 2) % ID_SPACE
+
+
+def sort_from(origin, keys):
+    """ Trie les clés par distance croissante depuis origin dans le sens de l'anneau ; renvoie (distances, clés). """
+    pairs = sorted((((hash_key(key) - origin) % ID_SPACE, key) for key in keys), key=itemgetter(0))
+    return [offset for offset, _ in pairs], [key for _, key in pairs]
+
+
+def slice_end(offsets, start, origin, node_id, right_id):
+    """ Fin (exclue) de la tranche des clés de offsets (distances triées depuis origin) qui
+    reviennent, à partir de start, au nœud node_id de voisin droit right_id ; la clé start lui
+    revient. Une recherche dichotomique remplace un test de responsabilité par clé.
+    """
+    if right_id == node_id:
+        return len(offsets)
+    last = (midpoint(node_id, right_id) - origin) % ID_SPACE
+    if last < offsets[start]:
+        # L'arc du nœud contient origin : les clés restantes, jusqu'à la fin du tour, lui reviennent
+        return len(offsets)
+    return bisect.bisect_right(offsets, last, start)
+
+
+def circular_distance(a, b):
+    """ Distance absolue entre deux positions sur l'anneau. """
+    distance = (a - b) % ID_SPACE
+    return min(distance, ID_SPACE - distance)
+
+
+def load_balance(hosts):
+    """ Rapport max/moyenne du nombre de clés primaires par nœud physique ({hôte: nombre de clés}). """
+    if not hosts:
+        return 0.0
+    mean = sum(hosts.values()) / len(hosts)
+    return max(hosts.values()) / mean if mean else 0.0
@@ -0,0 +1,426 @@
+# -------------------------------
+# Stockage sur disque : journal en ajout seul et lectures par mmap
+# -------------------------------
+#
+# Chaque nœud écrit ses entrées à la fin d'un journal découpé en segments (segment-000001.log,
+# ...). Un index en mémoire associe chaque clé à l'emplacement de sa dernière valeur ; les
+# lectures désérialisent directement la tranche du segment projeté en mémoire (mmap), sans
+# copie intermédiaire. Les valeurs remplacées et les clés supprimées laissent des octets morts,
+# récupérés par compaction. À la fermeture, l'index est enregistré dans un instantané qui permet
+# de rouvrir le journal sans le relire en entier.
+#
+# Les écrivains des segments actifs et les projections ne sont ouverts qu'au premier besoin et
+# leur nombre est borné pour tous les journaux du processus (open_files) : au-delà, les moins
+# récemment utilisés sont fermés et seront rouverts à la demande. Un anneau de milliers de nœuds
+# tient ainsi sous la limite de descripteurs du système.
+
+import mmap
+import os
+import pickle
+import struct
+import zlib
+
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from .storage import KeyOrder, PRIMARY, LEFT_REPLICA, RIGHT_REPLICA
+
+# En-tête d'un enregistrement : opération, rôle, longueur de la clé, longueur de la valeur, CRC32
+HEADER = struct.Struct(">BBIII")
+PUT = 1
+DELETE = 2
+ROLES = (PRIMARY, LEFT_REPLICA, RIGHT_REPLICA)
+
+SEGMENT_SIZE = 4 * 1024 * 1024
+# Compaction dès que les octets morts dépassent cette part du journal (et au moins un segment)
+COMPACTION_RATIO = 0.5
+SNAPSHOT = "index.snapshot"
+# Descripteurs (écrivains et projections) ouverts au plus, tous journaux confondus
+MAX_OPEN_FILES = 256
+WRITER = "writer"
+MAPPING = "mapping"
+
+
+def segment_name(number):
+    return f"segment-{number:06d}.log"
+
+
+def checksum(op, role, key_bytes, value_bytes):
+    return zlib.crc32(value_bytes, zlib.crc32(key_bytes, zlib.crc32(bytes((op, role)))))
+
+
+class OpenFiles:
+    """ Descripteurs ouverts par les journaux, du moins au plus récemment utilisé.
+
+    Au-delà de limit, le plus ancien est rendu à son journal (LogStore.release), qui le ferme.
+    """
+
+    def __init__(self, limit=MAX_OPEN_FILES):
+        self.limit = limit
+        self.handles = OrderedDict()  # {(journal, genre, numéro de segment): None}
+
+    def use(self, store, kind, number):
+        """ Note l'usage d'un descripteur, ouvert ou sur le point de l'être, et ferme les plus anciens au-delà de la limite. """
+        handle = (store, kind, number)
+        if handle in self.handles:
+            self.handles.move_to_end(handle)
+            return
+        self.handles[handle] = None
+        while len(self.handles) > self.limit:
+            (old_store, old_kind, old_number), _ = self.handles.popitem(last=False)
+            old_store.release(old_kind, old_number)
+
+    def forget(self, store, kind, number):
+        self.handles.pop((store, kind, number), None)
+
+
+open_files = OpenFiles()
+
+
+class RoleTable(Mapping):
+    """ Vue en lecture seule des entrées d'un rôle : {clé: donnée}, les données étant lues sur le disque. """
+
+    def __init__(self, store, role):
+        self.store = store
+        self.role = role
+
+    def __getitem__(self, key):
+        return self.store.read(self.store.locations[self.role][key])
+
+    def __iter__(self):
+        return iter(list(self.store.locations[self.role]))
+
+    def __len__(self):
+        return len(self.store.locations[self.role])
+
+    def __contains__(self, key):
+        return key in self.store.locations[self.role]
+
+
+class LogStore:
+    """ Stockage d'un nœud dans un journal de segments en ajout seul, avec la même interface que DataStore.
+
+    locations[rôle] associe chaque clé à l'emplacement (segment, position, longueur de la valeur,
+    taille de l'enregistrement) de sa valeur. Seul l'index est en mémoire : primary,
+    left_replicas et right_replicas sont des vues qui lisent les données sur le disque. Comme
+    dans DataStore, order garde les clés dans l'ordre de l'anneau pour les lectures de plages.
+    """
+
+    # Trafic disque cumulé de tous les journaux
+    bytes_written = 0
+    bytes_read = 0
+    reads = 0
+    compactions = 0
+
+    def __init__(self, path, segment_size=SEGMENT_SIZE, compaction_ratio=COMPACTION_RATIO):
+        self.path = path
+        self.segment_size = segment_size
+        self.compaction_ratio = compaction_ratio
+        os.makedirs(path, exist_ok=True)
+        self.locations = ({}, {}, {})
+        self.segments = {}   # {numéro: taille en octets}
+        self.maps = {}       # {numéro: mmap du segment}
+        self.dead_bytes = 0
+        self.order = KeyOrder()
+        self.version = 0     # Incrémenté à chaque modification, comme DataStore.version
+        self.active = None
+        self.writer = None   # Écrivain du segment actif, ouvert au premier ajout
+        self.dirty = False
+        self.closed = False
+        self.primary = RoleTable(self, 0)
+        self.left_replicas = RoleTable(self, 1)
+        self.right_replicas = RoleTable(self, 2)
+        self.open()
+
+    # -------------------------------
+    # Ouverture et fermeture
+    # -------------------------------
+
+    def open(self):
+        """ Reconstruit l'index depuis l'instantané, puis relit les enregistrements écrits après lui. """
+        numbers = sorted(int(name[8:14]) for name in os.listdir(self.path)
+                         if name.startswith("segment-") and name.endswith(".log"))
+        for number in numbers:
+            self.segments[number] = os.path.getsize(self.segment_path(number))
+        replay_from = self.load_snapshot()
+        if replay_from is None:
+            self.locations = ({}, {}, {})
+            self.dead_bytes = 0
+            replay_from = {number: 0 for number in numbers}
+        for number in numbers:
+            if number in replay_from:
+                self.replay(number, replay_from[number])
+        self.order = KeyOrder([key for table in self.locations for key in table])
+        self.active = numbers[-1] if numbers else 1
+        self.segments.setdefault(self.active, 0)
+
+    def load_snapshot(self):
+        """ Charge l'instantané de l'index s'il correspond aux segments présents.
+
+        Renvoie, pour chaque segment à relire, la position à partir de laquelle le relire, ou None
+        si l'instantané est absent ou périmé.
+        """
+        try:
+            with open(os.path.join(self.path, SNAPSHOT), "rb") as f:
+                snapshot = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        sizes = snapshot["segments"]
+        last = max(sizes, default=0)
+        for number, size in sizes.items():
+            # Un segment vide n'a pas encore de fichier : son écrivain n'est ouvert qu'au premier ajout
+            if size and self.segments.get(number, -1) < size:
+                return None
+        if any(number not in sizes and number < last for number in self.segments):
+            return None
+        self.locations = snapshot["locations"]
+        self.dead_bytes = snapshot["dead_bytes"]
+        return {number: sizes.get(number, 0) for number in self.segments if number >= last}
+
+    def close(self):
+        """ Écrit les données en attente et l'instantané de l'index, puis libère les fichiers. """
+        if self.closed:
+            return
+        self.closed = True
+        self.release(WRITER, self.active)
+        for number in list(self.maps):
+            self.release(MAPPING, number)
+        temporary = os.path.join(self.path, SNAPSHOT + ".tmp")
+        with open(temporary, "wb") as f:
+            pickle.dump({"segments": self.segments, "locations": self.locations, "dead_bytes": self.dead_bytes},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, os.path.join(self.path, SNAPSHOT))
+
+    def segment_path(self, number):
+        return os.path.join(self.path, segment_name(number))
+
+    def release(self, kind, number):
+        """ Ferme l'écrivain du segment actif ou la projection d'un segment (rouverts au besoin). """
+        open_files.forget(self, kind, number)
+        if kind == WRITER:
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+                self.dirty = False
+        else:
+            mapping = self.maps.pop(number, None)
+            if mapping is not None:
+                mapping.close()
+
+    def replay(self, number, offset):
+        """ Relit les enregistrements d'un segment à partir de offset ; un enregistrement incomplet en fin de segment est tronqué. """
+        with open(self.segment_path(number), "rb") as f:
+            f.seek(offset)
+            while True:
+                header = f.read(HEADER.size)
+                if not header:
+                    break
+                if len(header) == HEADER.size:
+                    op, role, key_length, value_length, crc = HEADER.unpack(header)
+                    key_bytes = f.read(key_length)
+                    value_bytes = f.read(value_length)
+                    if (len(key_bytes) == key_length and len(value_bytes) == value_length
+                            and checksum(op, role, key_bytes, value_bytes) == crc):
+                        size = HEADER.size + key_length + value_length
+                        self.apply(op, role, pickle.loads(key_bytes),
+                                   (number, offset + HEADER.size + key_length, value_length, size))
+                        offset += size
+                        continue
+                # Écriture interrompue : la fin du segment est abandonnée
+                break
+        if offset < self.segments[number]:
+            os.truncate(self.segment_path(number), offset)
+            self.segments[number] = offset
+
+    def apply(self, op, role, key, location):
+        self.forget(key)
+        if op == PUT:
+            self.locations[role][key] = location
+        else:
+            self.dead_bytes += location[3]
+
+    def clear(self):
+        """ Supprime toutes les entrées : les segments et l'instantané de l'index sont effacés. """
+        self.release(WRITER, self.active)
+        for number in list(self.maps):
+            self.release(MAPPING, number)
+        for name in os.listdir(self.path):
+            if name.startswith("segment-") or name.startswith(SNAPSHOT):
+                os.remove(os.path.join(self.path, name))
+        self.locations = ({}, {}, {})
+        self.segments = {1: 0}
+        self.active = 1
+        self.dead_bytes = 0
+        self.order = KeyOrder()
+        self.version += 1
+
+    # -------------------------------
+    # Lectures et écritures
+    # -------------------------------
+
+    def mapping(self, number, end):
+        """ Projection en mémoire d'un segment, refaite si le segment a grandi au-delà de end. """
+        if self.dirty and number == self.active:
+            self.writer.flush()
+            self.dirty = False
+        mapping = self.maps.get(number)
+        if mapping is None or len(mapping) < end:
+            if mapping is not None:
+                mapping.close()
+            # Réservée avant l'ouverture : une projection fermée pour faire de la place n'est jamais celle-ci
+            open_files.use(self, MAPPING, number)
+            with open(self.segment_path(number), "rb") as f:
+                mapping = self.maps[number] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            open_files.use(self, MAPPING, number)
+        return mapping
+
+    def open_writer(self):
+        """ Écrivain du segment actif, ouvert au premier ajout ou après avoir été fermé pour faire de la place. """
+        open_files.use(self, WRITER, self.active)
+        if self.writer is None:
+            self.writer = open(self.segment_path(self.active), "ab")
+        return self.writer
+
+    def read(self, location):
+        """ Désérialise la valeur située à location, lue directement dans le segment projeté en mémoire. """
+        number, offset, length, _ = location
+        mapping = self.mapping(number, offset + length)
+        LogStore.reads += 1
+        LogStore.bytes_read += length
+        with memoryview(mapping) as view, view[offset:offset + length] as value:
+            return pickle.loads(value)
+
+    def append(self, op, role, key, value_bytes=b""):
+        """ Ajoute un enregistrement au segment actif et renvoie l'emplacement de sa valeur. """
+        if self.segments[self.active] >= self.segment_size:
+            self.roll()
+        key_bytes = pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL)
+        writer = self.open_writer()
+        writer.write(HEADER.pack(op, role, len(key_bytes), len(value_bytes),
+                                 checksum(op, role, key_bytes, value_bytes)))
+        writer.write(key_bytes)
+        writer.write(value_bytes)
+        self.dirty = True
+        offset = self.segments[self.active]
+        size = HEADER.size + len(key_bytes) + len(value_bytes)
+        self.segments[self.active] += size
+        LogStore.bytes_written += size
+        return (self.active, offset + HEADER.size + len(key_bytes), len(value_bytes), size)
+
+    def roll(self):
+        """ Ferme le segment actif ; le suivant est créé par le prochain ajout. """
+        self.release(WRITER, self.active)
+        self.active += 1
+        self.segments[self.active] = 0
+
+    def forget(self, key):
+        """ Retire la clé de l'index ; son ancienne valeur devient des octets morts. Renvoie son emplacement. """
+        for table in self.locations:
+            location = table.pop(key, None)
+            if location is not None:
+                self.dead_bytes += location[3]
+                return location
+        return None
+
+    def put(self, data, role=PRIMARY):
+        """ Ajoute ou remplace l'entrée de la clé avec le rôle donné. """
+        code = ROLES.index(role)
+        # Une réplique ne retire jamais le rôle primaire d'une clé
+        if code != 0 and data.key in self.locations[0]:
+            code = 0
+        value_bytes = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.forget(data.key) is None:
+            self.order.add(data.key)
+        self.locations[code][data.key] = self.append(PUT, code, data.key, value_bytes)
+        self.version += 1
+        self.maybe_compact()
+
+    def put_all(self, entries, role=PRIMARY):
+        """ Range un lot {clé: donnée} avec le même rôle (un enregistrement par donnée). """
+        for data in entries.values():
+            self.put(data, role)
+
+    def get(self, key):
+        """ Renvoie la donnée associée à la clé, ou None. """
+        for table in self.locations:
+            location = table.get(key)
+            if location is not None:
+                return self.read(location)
+        return None
+
+    def delete(self, key):
+        """ Supprime la clé (enregistrement de suppression) et renvoie la donnée retirée, ou None. """
+        data = self.get(key)
+        if data is None:
+            return None
+        self.forget(key)
+        self.order.discard(key)
+        self.version += 1
+        self.dead_bytes += self.append(DELETE, 0, key)[3]
+        self.maybe_compact()
+        return data
+
+    def range(self, start, end):
+        """ Données (primaires et répliques) dont la position est dans [start, end], dans l'ordre de l'anneau. """
+        return [self.get(key) for key in self.order.range(start, end)]
+
+    def role(self, key):
+        """ Renvoie le rôle du nœud pour cette clé, ou None s'il ne la stocke pas. """
+        for code, table in enumerate(self.locations):
+            if key in table:
+                return ROLES[code]
+        return None
+
+    def __contains__(self, key):
+        return any(key in table for table in self.locations)
+
+    def __iter__(self):
+        for table in self.locations:
+            for location in list(table.values()):
+                yield self.read(location)
+
+    def __len__(self):
+        return sum(len(table) for table in self.locations)
+
+    # -------------------------------
+    # Compaction
+    # -------------------------------
+
+    def size(self):
+        """ Taille totale du journal en octets. """
+        return sum(self.segments.values())
+
+    def maybe_compact(self):
+        total = self.size()
+        if total > self.segment_size and self.dead_bytes > self.compaction_ratio * total:
+            self.compact()
+
+    def compact(self):
+        """ Recopie les entrées vivantes dans de nouveaux segments et supprime les anciens. """
+        old = list(self.segments)
+        self.roll()
+        for code, table in enumerate(self.locations):
+            for key, location in list(table.items()):
+                number, offset, length, _ = location
+                value_bytes = self.mapping(number, offset + length)[offset:offset + length]
+                table[key] = self.append(PUT, code, key, value_bytes)
+        for number in old:
+            self.release(MAPPING, number)
+            os.remove(self.segment_path(number))
+            del self.segments[number]
+        self.dead_bytes = 0
+        LogStore.compactions += 1
+
+
+def log_storage(root, **options):
+    """ Fabrique de stockages pour Node.storage : un journal par nœud, dans root/node-<identifiant>.
+
+    factory.stores garde les journaux créés, pour les fermer tous en fin d'exécution.
+    """
+    def factory(node_id):
+        store = LogStore(os.path.join(root, f"node-{node_id}"), **options)
+        factory.stores.append(store)
+        return store
+    factory.stores = []
+    return factory
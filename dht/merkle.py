@@ -0,0 +1,175 @@
+# -------------------------------
+# Arbres de Merkle pour la réparation des répliques (anti-entropie)
+# -------------------------------
+
+import hashlib
+
+from .keyspace import ID_SPACE, hash_key
+from .storage import PRIMARY
+
+# Nombre visé de clés par feuille : la profondeur de l'arbre suit la taille de la plage
+LEAF_SIZE = 4
+MAX_DEPTH = 20
+
+
+def digest(key, value):
+    """ Empreinte d'une entrée (clé et valeur) sur 64 bits. """
+    return hash_key(repr((key, value)))
+
+
+def depth_for(count):
+    """ Profondeur de l'arbre pour une plage de count clés. """
+    return max(1, min(MAX_DEPTH, (count // LEAF_SIZE).bit_length()))
+
+
+class MerkleTree:
+    """ Arbre de Merkle d'une plage de l'anneau découpée en 2^depth feuilles de même largeur.
+
+    Chaque feuille résume les empreintes des clés dont la position tombe dans sa tranche ;
+    chaque nœud interne résume ses deux enfants. Deux arbres de la même plage et de la même
+    profondeur se comparent de la racine vers les feuilles, en n'échangeant que les hachés des
+    sous-arbres qui diffèrent. Après la première construction, add ne marque que la feuille
+    touchée : seuls ses ancêtres sont recalculés à la comparaison suivante.
+    """
+
+    def __init__(self, start, width, depth):
+        self.start = start
+        self.width = width
+        self.depth = depth
+        self.leaves = {}  # {indice de feuille: {clé: empreinte}}
+        self.levels = None
+        self.dirty = set()  # Feuilles modifiées depuis la dernière construction
+
+    def leaf_index(self, position):
+        return ((position - self.start) % ID_SPACE) * (2 ** self.depth) // self.width
+
+    def add(self, key, value):
+        index = self.leaf_index(hash_key(key))
+        self.leaves.setdefault(index, {})[key] = digest(key, value)
+        self.dirty.add(index)
+
+    def leaf(self, index):
+        """ Empreintes {clé: empreinte} de la feuille index. """
+        return self.leaves.get(index, {})
+
+    def leaf_hash(self, index):
+        payload = b"".join(value.to_bytes(8, "big") for value in sorted(self.leaves[index].values()))
+        return hashlib.sha1(payload).digest()
+
+    def build(self):
+        # levels[d] contient les hachés des nœuds non vides de profondeur d
+        level = {index: self.leaf_hash(index) for index in self.leaves}
+        levels = [level]
+        for _ in range(self.depth):
+            parents = {}
+            for index in {index // 2 for index in level}:
+                parents[index] = hashlib.sha1(level.get(2 * index, b"") + b"|" + level.get(2 * index + 1, b"")).digest()
+            level = parents
+            levels.append(level)
+        levels.reverse()
+        self.levels = levels
+        self.dirty = set()
+
+    def refresh(self):
+        """ Recalcule les feuilles modifiées depuis la dernière construction et leurs seuls ancêtres. """
+        changed = self.dirty
+        self.dirty = set()
+        for index in changed:
+            self.levels[self.depth][index] = self.leaf_hash(index)
+        for level in range(self.depth - 1, -1, -1):
+            changed = {index // 2 for index in changed}
+            children = self.levels[level + 1]
+            for index in changed:
+                self.levels[level][index] = hashlib.sha1(children.get(2 * index, b"") + b"|" +
+                                                         children.get(2 * index + 1, b"")).digest()
+
+    def node_hash(self, level, index):
+        if self.levels is None:
+            self.build()
+        elif self.dirty:
+            self.refresh()
+        return self.levels[level].get(index)
+
+    def diff(self, other):
+        """ Compare deux arbres de même plage et de même profondeur.
+
+        Renvoie les indices des feuilles qui diffèrent, le nombre de hachés échangés et le
+        nombre d'allers-retours (un par niveau descendu).
+        """
+        hashes = 1
+        rounds = 1
+        if self.node_hash(0, 0) == other.node_hash(0, 0):
+            return [], hashes, rounds
+        frontier = [0]
+        for level in range(1, self.depth + 1):
+            children = [2 * index + side for index in frontier for side in (0, 1)]
+            hashes += len(children)
+            rounds += 1
+            frontier = [index for index in children if self.node_hash(level, index) != other.node_hash(level, index)]
+        return frontier, hashes, rounds
+
+
+def cached_tree(trees, holder, start, width, depth, entries, value_attribute):
+    """ Arbre de la plage pour les données entries() de holder, repris de trees si son stockage n'a pas changé. """
+    store = holder.data_store
+    stamp = (store, store.version, start, width, depth)
+    cached = trees.get(holder)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    tree = MerkleTree(start, width, depth)
+    for data in entries():
+        tree.add(data.key, getattr(data, value_attribute))
+    trees[holder] = (stamp, tree)
+    return tree
+
+
+def synchronize(owner, replica, role, start, width, value_attribute):
+    """ Anti-entropie entre owner, responsable de la plage (start, start + width], et une de ses répliques.
+
+    Les arbres sont gardés dans owner.merkle_trees avec la version du stockage dont ils sont
+    issus : tant qu'aucun des deux stockages n'a changé, la comparaison se limite aux racines.
+    Les clés absentes ou différentes chez la réplique lui sont renvoyées ; celles que owner a
+    perdues sont reprises de la réplique. Renvoie (entrées recopiées, feuilles divergentes,
+    hachés échangés, messages).
+    """
+    trees = owner.merkle_trees
+    holders = [holder for holder, _ in owner.replica_nodes()]
+    if any(holder not in holders for holder in trees):
+        # Ne garde que les arbres des détenteurs actuels
+        owner.merkle_trees = trees = {holder: trees[holder] for holder in holders if holder in trees}
+    primary = owner.data_store.primary
+    depth = depth_for(len(primary))
+    mine = cached_tree(trees, owner, start, width, depth, primary.values, value_attribute)
+    theirs = cached_tree(trees, replica, start, width, depth,
+                         lambda: (data for data in replica.data_store if owner.is_responsible_for(hash_key(data.key))),
+                         value_attribute)
+
+    leaves, hashes, messages = mine.diff(theirs)
+    if not leaves:
+        return 0, leaves, hashes, messages
+    # La réplique envoie les empreintes de ses feuilles divergentes en un message
+    to_replica = []
+    to_owner = []
+    for index in leaves:
+        ours = mine.leaf(index)
+        others = theirs.leaf(index)
+        hashes += len(others)
+        to_replica.extend(key for key, value in ours.items() if others.get(key) != value)
+        to_owner.extend(key for key in others if key not in ours)
+    messages += 1
+    for key in to_replica:
+        data = primary[key]
+        replica.data_store.put(data, role)
+        owner.invalidate_cached(key)
+        theirs.add(key, getattr(data, value_attribute))
+    for key in to_owner:
+        data = replica.data_store.get(key)
+        owner.data_store.put(data, PRIMARY)
+        mine.add(key, getattr(data, value_attribute))
+    # Un lot vers la réplique, une demande et sa réponse pour les clés perdues par owner
+    messages += (1 if to_replica else 0) + (2 if to_owner else 0)
+    # Les deux arbres suivent les réparations : ils restent valables pour la version actuelle des stockages
+    for holder, tree in ((owner, mine), (replica, theirs)):
+        store = holder.data_store
+        trees[holder] = ((store, store.version, start, width, depth), tree)
+    return len(to_replica) + len(to_owner), leaves, hashes, messages
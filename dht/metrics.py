@@ -0,0 +1,161 @@
+# -------------------------------
+# Métriques de la simulation : compteurs et histogrammes par nœud
+# -------------------------------
+
+import bisect
+import csv
+import json
+
+# Bornes supérieures des classes d'histogramme par défaut : entiers de 0 à 64 (sauts),
+# puis puissances de deux pour les durées et les tailles
+DEFAULT_BOUNDS = list(range(65)) + [2 ** exponent for exponent in range(7, 21)]
+
+
+class Histogram:
+    """ Histogramme à classes fixes : effectif par classe, nombre, somme, minimum et maximum.
+
+    Une valeur est rangée dans la première classe dont la borne supérieure est au moins égale ;
+    les valeurs au-delà de la dernière borne tombent dans une classe de débordement.
+    """
+
+    def __init__(self, bounds=None):
+        self.bounds = DEFAULT_BOUNDS if bounds is None else sorted(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """ Borne supérieure de la classe qui contient le quantile q (0 à 1). """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def buckets(self):
+        """ Couples (borne supérieure, effectif) des classes non vides ; None pour le débordement. """
+        return [(self.bounds[index] if index < len(self.bounds) else None, count)
+                for index, count in enumerate(self.counts) if count]
+
+    def summary(self):
+        return {"count": self.count, "mean": round(self.mean(), 6), "min": self.min, "max": self.max,
+                "p50": self.quantile(0.5), "p99": self.quantile(0.99), "buckets": self.buckets()}
+
+
+class MetricsRegistry:
+    """ Registre de métriques : compteurs et maxima par nœud, histogrammes globaux.
+
+    Désactivé par défaut : le code instrumenté teste metrics.enabled avant tout appel, si bien
+    qu'une simulation sans métriques ne paie qu'une lecture d'attribut par point de mesure.
+    Les nœuds sont désignés par leur identifiant.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.bounds = {}
+        self.reset()
+
+    def configure(self, enabled=None, bounds=None):
+        """ Active ou désactive le registre ; bounds fixe les classes de certains histogrammes ({nom: bornes}). """
+        if enabled is not None:
+            self.enabled = enabled
+        if bounds is not None:
+            self.bounds.update(bounds)
+
+    def reset(self):
+        self.counters = {}    # {nom: {nœud: valeur}}
+        self.gauges = {}      # {nom: {nœud: valeur}}
+        self.histograms = {}  # {nom: Histogram}
+
+    def count(self, node, name, amount=1):
+        """ Ajoute amount au compteur name du nœud. """
+        counter = self.counters.setdefault(name, {})
+        counter[node] = counter.get(node, 0) + amount
+
+    def gauge(self, node, name, value):
+        """ Fixe la valeur courante de name pour le nœud. """
+        self.gauges.setdefault(name, {})[node] = value
+
+    def gauge_max(self, node, name, value):
+        """ Garde la plus grande valeur de name observée pour le nœud. """
+        gauge = self.gauges.setdefault(name, {})
+        if value > gauge.get(node, value - 1):
+            gauge[node] = value
+
+    def observe(self, name, value):
+        """ Ajoute une observation à l'histogramme name. """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(self.bounds.get(name))
+        histogram.observe(value)
+
+    def sample_storage(self, nodes, id_of):
+        """ Relève le nombre d'entrées stockées par chaque nœud (jauge stored_items). """
+        for node in nodes:
+            self.gauge(id_of(node), "stored_items", len(node.data_store))
+
+    def snapshot(self):
+        """ État courant du registre sous forme de dictionnaires sérialisables. """
+        per_node = {}
+        for kind, table in (("counters", self.counters), ("gauges", self.gauges)):
+            for name, values in table.items():
+                for node, value in values.items():
+                    per_node.setdefault(node, {})[name] = value
+        return {
+            "nodes": {str(node): values for node, values in per_node.items()},
+            "histograms": {name: histogram.summary() for name, histogram in self.histograms.items()},
+        }
+
+    def imbalance(self, name):
+        """ Rapport max/moyenne d'un compteur ou d'une jauge entre les nœuds qui l'ont relevé. """
+        values = self.counters.get(name) or self.gauges.get(name) or {}
+        if not values:
+            return 0.0
+        mean = sum(values.values()) / len(values)
+        return max(values.values()) / mean if mean else 0.0
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def write_csv(self, path):
+        """ Une ligne par (type, nom, nœud ou borne de classe, valeur). """
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["kind", "name", "node", "bucket", "value"])
+            for kind, table in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, values in table.items():
+                    for node, value in values.items():
+                        writer.writerow([kind, name, node, "", value])
+            for name, histogram in self.histograms.items():
+                for bound, count in histogram.buckets():
+                    writer.writerow(["histogram", name, "", "inf" if bound is None else bound, count])
+
+    def write(self, path):
+        """ Exporte un instantané en JSON ou en CSV selon l'extension du fichier. """
+        if path.endswith(".csv"):
+            self.write_csv(path)
+        else:
+            self.write_json(path)
+
+
+# Registre partagé par les deux implémentations et le réseau simulé
+metrics = MetricsRegistry()
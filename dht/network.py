@@ -0,0 +1,112 @@
+# -------------------------------
+# Moteur d'échange de messages : boîtes de réception, files d'attente et liens
+# -------------------------------
+
+import random
+
+import simpy
+
+from .metrics import metrics
+
+# Taille fixe (en octets) de l'en-tête ajouté à chaque message
+HEADER_SIZE = 64
+
+
+class LinkModel:
+    """ Modèle de lien : latence fixe, gigue uniforme et bande passante optionnelle (octets par unité de temps).
+
+    Tout objet qui fournit delay(sender, receiver, size) peut le remplacer. S'il fournit aussi
+    propagation(sender, receiver) et serialization(size), les messages d'un même lien se
+    partagent sa bande passante : chacun attend que le précédent ait fini d'être émis.
+    """
+
+    def __init__(self, latency=1.0, jitter=1.0, bandwidth=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+
+    def propagation(self, sender, receiver):
+        delay = self.latency
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        return delay
+
+    def serialization(self, size):
+        """ Temps d'émission d'un message de size octets sur le lien. """
+        return (HEADER_SIZE + size) / self.bandwidth if self.bandwidth else 0.0
+
+    def delay(self, sender, receiver, size):
+        return self.propagation(sender, receiver) + self.serialization(size)
+
+
+class Network:
+    """ Réseau simulé : chaque nœud reçoit une boîte (simpy.Store) servie par un ou plusieurs workers.
+
+    Un message traverse le lien (delay du modèle de lien), attend dans la boîte du destinataire
+    qu'un worker se libère, puis occupe ce worker pendant le temps de service. La boîte et les
+    workers d'un nœud ne sont créés qu'à son premier message : un nœud sans trafic ne coûte rien
+    au simulateur.
+    """
+
+    def __init__(self, env, link=None, service_time=0.0, concurrency=1):
+        self.env = env
+        self.link = LinkModel() if link is None else link
+        self.service_time = service_time  # durée fixe ou fonction (message) -> durée
+        self.concurrency = concurrency
+        self.links = {}  # {(émetteur, destinataire): simpy.Resource} des liens à bande passante partagée
+        # Statistiques cumulées
+        self.messages = 0
+        self.queue_wait = 0.0
+        self.max_queue = 0
+
+    def attach(self, node):
+        """ Crée la boîte de réception du nœud et démarre ses workers. """
+        node.inbox = simpy.Store(self.env)
+        node.busy = 0  # Workers occupés à traiter un message
+        for _ in range(self.concurrency):
+            self.env.process(self.worker(node))
+
+    def worker(self, node):
+        while True:
+            message, queued_at, done = yield node.inbox.get()
+            self.queue_wait += self.env.now - queued_at
+            if metrics.enabled:
+                metrics.observe("queue_wait", self.env.now - queued_at)
+            service_time = self.service_time(message) if callable(self.service_time) else self.service_time
+            node.busy += 1
+            if service_time:
+                yield self.env.timeout(service_time)
+            node.busy -= 1
+            done.succeed()
+
+    def load(self, node):
+        """ Messages en attente dans la boîte du nœud ou en cours de traitement. """
+        if getattr(node, "inbox", None) is None:
+            return 0
+        return len(node.inbox.items) + node.busy
+
+    def transmit(self, sender, receiver, message, size=0):
+        """ Achemine un message jusqu'au destinataire et attend qu'il ait été traité (à utiliser avec yield from). """
+        if getattr(receiver, "inbox", None) is None:
+            self.attach(receiver)
+        serialization = getattr(self.link, "serialization", None)
+        emission = serialization(size) if serialization is not None else 0.0
+        if emission:
+            # Le lien émet un message à la fois : les messages suivants attendent leur tour
+            link = self.links.get((sender, receiver))
+            if link is None:
+                link = self.links[(sender, receiver)] = simpy.Resource(self.env)
+            with link.request() as turn:
+                yield turn
+                yield self.env.timeout(emission)
+            yield self.env.timeout(self.link.propagation(sender, receiver))
+        else:
+            yield self.env.timeout(self.link.delay(sender, receiver, size))
+        done = self.env.event()
+        self.messages += 1
+        yield receiver.inbox.put((message, self.env.now, done))
+        self.max_queue = max(self.max_queue, len(receiver.inbox.items))
+        if metrics.enabled:
+            metrics.count(receiver.node_id, "received")
+            metrics.gauge_max(receiver.node_id, "max_queue_depth", len(receiver.inbox.items))
+        yield done
@@ -0,0 +1,90 @@
+import bisect
+import random
+
+import simpy
+
+from .v1 import Node
+from .eventlog import logger
+from .keyspace import VIRTUAL_NODES, virtual_node_id
+from .scheduler import TimerWheel
+
+
+# Ajout initial de nœuds
+def add_initial_nodes(env, nodes, count, virtual_nodes=VIRTUAL_NODES):
+    for index in range(count):
+        yield env.process(add_node(env, nodes, f"nœud-{index + 1}", virtual_nodes))
+
+def add_node(env, nodes, host, virtual_nodes=VIRTUAL_NODES):
+    yield env.timeout(random.randint(1, 5))
+    # Un nœud physique rejoint l'anneau sous la forme de virtual_nodes nœuds virtuels
+    for index in range(virtual_nodes):
+        new_node = Node(env, virtual_node_id(host, index), host)
+        if nodes:
+            random_node = random.choice(nodes)
+            logger.info("join", "[{now}] Nouveau nœud {node} ({host}) tente de rejoindre l'anneau.",
+                        now=env.now, node=new_node.identifier, host=host)
+            new_node.send_join_message(random_node)
+        bisect.insort(nodes, new_node, key=lambda node: node.identifier)
+
+def remove_node(env, nodes):
+    yield env.timeout(1)  # Attendre un peu avant de supprimer un nœud
+    if nodes:
+        index = random.randint(0, len(nodes) - 1)
+        node_to_remove = nodes[index]
+        next_node = node_to_remove.remove()
+        nodes.remove(node_to_remove)
+        if next_node:
+            next_node.display_ring()
+
+def send_message(env, nodes):
+    yield env.timeout(1)  # Attendre un peu avant d'envoyer un message
+    if nodes:
+        sender = nodes[0]
+        receiver = nodes[-1].identifier
+        sender.send(receiver, "Hello, this is a test message!")
+
+def store_data(env, nodes):
+    yield env.timeout(1)  # Attendre un peu avant de stocker des données
+    if nodes:
+        key = random.randint(1, 100)
+        value = f"Value for {key}"
+        responsible_node = nodes[0].find_responsible_node(key)
+        responsible_node.store_data(key, value)
+
+def get_data(env, nodes):
+    yield env.timeout(1)  # Attendre un peu avant de récupérer des données
+    if nodes:
+        requester = nodes[0]
+        key = random.randint(1, 100)  # Choisir une clé aléatoire
+        requester.request_data(key)
+
+# Fonction principale pour orchestrer les opérations
+def main(env, nodes, count, virtual_nodes=VIRTUAL_NODES, headless=False):
+    yield env.process(add_initial_nodes(env, nodes, count, virtual_nodes))
+    yield env.process(remove_node(env, nodes))
+    yield env.process(send_message(env, nodes))
+    logger.info("separator", "")
+    yield env.process(store_data(env, nodes))
+    yield env.process(store_data(env, nodes))
+    yield env.process(store_data(env, nodes))
+    logger.info("separator", "")
+    yield env.process(get_data(env, nodes))  # Ajout de la récupération de données
+    if not headless:
+        nodes[0].draw_ring()  # Dessiner l'anneau après les opérations
+    yield env.process(remove_node(env, nodes))
+    if not headless:
+        nodes[0].draw_ring()  # Dessiner l'anneau après les opérations
+
+# Exécuter la simulation jusqu'à la fin du scénario et renvoyer les nœuds restants
+def run(count=10, virtual_nodes=VIRTUAL_NODES, headless=False):
+    env = simpy.Environment()
+    nodes = []
+    Node.existing_ids.clear()
+    Node.directory.clear()
+    # Une seule roue temporelle déclenche la maintenance périodique de tous les nœuds
+    Node.wheel = TimerWheel(env)
+    try:
+        env.run(until=env.process(main(env, nodes, count, virtual_nodes, headless)))
+    finally:
+        Node.wheel = None
+    return nodes
@@ -0,0 +1,80 @@
+import random
+
+import simpy
+
+from .v2 import Node, Message, Data
+from .eventlog import logger
+from .keyspace import VIRTUAL_NODES, virtual_node_id
+from .scheduler import TimerWheel
+
+# -------------------------------
+# Fonctions de simulation
+# -------------------------------
+
+def add_nodes(env, first_node, count=20, virtual_nodes=VIRTUAL_NODES):
+    """ Fonction pour ajouter des nœuds progressivement après le lancement de la simulation. """
+    hosts = [f"nœud-{i}" for i in range(1, count + 1)]  # Nœuds physiques, placés sur l'anneau par hachage
+    for host in hosts:
+        # Générer un délai aléatoire pour chaque nœud avant de l'ajouter
+        delay = random.uniform(1, 2)
+        yield env.timeout(delay)  # Ajout après un délai aléatoire
+        for index in range(virtual_nodes):
+            node_id = virtual_node_id(host, index)
+            logger.info("join", "{now:.2f} ➡️ Demande d'ajout de nœud {node} ({host}) envoyée.",
+                        now=env.now, node=node_id, host=host)
+            message = Message(sender=node_id, receiver=first_node.node_id, content="Join Request")
+            first_node.receive_join_request(message, host)
+
+def send_sample_messages(env, first_node, first_node_receiver):
+    """ Envoie des messages à travers l'anneau après un certain délai. """
+    yield env.timeout(10)  # Attendre un certain temps avant d'envoyer le message
+    first_node.send_message(first_node, first_node_receiver, content="Bonjour 1")  # Exemple d'envoi
+
+def main(env, first_node, count=20, virtual_nodes=VIRTUAL_NODES, headless=False):
+    """ Enchaîne les étapes du scénario : ajouts, suppression, messages, stockage puis lecture. """
+    # Planifier l'ajout des nœuds progressivement
+    yield env.process(add_nodes(env, first_node, count, virtual_nodes))
+    yield env.timeout(10)
+
+    # Afficher l'anneau avec matplotlib une fois les nœuds ajoutés
+    if not headless:
+        first_node.display_ring()
+
+    # Exemple de suppression d'un nœud
+    node_to_remove = first_node.right  # Exemple, retirer le deuxième nœud
+    if node_to_remove is not first_node:
+        yield env.process(first_node.remove_node(node_to_remove))
+
+    # Envoi d'un message vers un nœud situé quelques sauts plus loin
+    first_node_receiver = first_node
+    for _ in range(6):
+        first_node_receiver = first_node_receiver.right
+    yield env.process(send_sample_messages(env, first_node, first_node_receiver))
+    yield env.timeout(10)
+
+    # Stocker des données
+    yield env.all_of([
+        env.process(first_node.store_data(Data(7, "Donnée :D"))),
+        env.process(first_node.store_data(Data(25, "Donnée 2 :D"))),
+        env.process(first_node.store_data(Data(79, "Donnée 3 :D"))),
+    ])
+
+    # Récupérer des données
+    yield env.process(first_node.retrieve_data(7))
+
+    # Afficher l'anneau mis à jour
+    if not headless:
+        first_node.display_ring()
+
+def run(count=20, virtual_nodes=VIRTUAL_NODES, headless=False):
+    """ Exécute le scénario jusqu'à son terme et renvoie le premier nœud de l'anneau. """
+    env = simpy.Environment()
+    # Une seule roue temporelle déclenche la maintenance périodique de tous les nœuds
+    Node.wheel = TimerWheel(env)
+    try:
+        # Le premier nœud est la racine de l'anneau ; sa position est le hachage de son nom.
+        first_node = Node(env, virtual_node_id("nœud-0", 0), "nœud-0")
+        env.run(until=env.process(main(env, first_node, count, virtual_nodes, headless)))
+    finally:
+        Node.wheel = None
+    return first_node
@@ -0,0 +1,105 @@
+# -------------------------------
+# Roue temporelle : planificateur central des tâches périodiques
+# -------------------------------
+
+import math
+
+
+class Timer:
+    """ Tâche planifiée dans une roue ; cancel() l'empêche de s'exécuter et de se replanifier. """
+
+    def __init__(self, callback, interval=None):
+        self.callback = callback
+        self.interval = interval  # None : tâche ponctuelle
+        self.rounds = 0  # Tours complets de la roue à attendre avant l'échéance
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """ Roue temporelle : un seul processus SimPy exécute toutes les tâches planifiées.
+
+    Le temps est découpé en tics de durée tick. Une tâche due dans d tics est rangée dans la
+    case (courante + d) % slots et attend (d - 1) // slots tours complets. Le processus se
+    réveille une fois par tic quel que soit le nombre de tâches, et s'endort tant que la roue
+    est vide : le nombre d'événements SimPy ne dépend plus du nombre de nœuds.
+    """
+
+    def __init__(self, env, tick=1.0, slots=256):
+        self.env = env
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.current = 0
+        self.pending = 0
+        self.wakeup = None
+        self.next_tick = None  # Date du prochain tic ; None tant que la roue dort
+        self.resume_at = None  # Date imposée au premier tic d'une roue restaurée (restore)
+        self.env.process(self.run())
+
+    def schedule(self, delay, callback):
+        """ Exécute callback() une fois, après delay. """
+        timer = Timer(callback)
+        self.insert(timer, delay)
+        return timer
+
+    def every(self, interval, callback, offset=None):
+        """ Exécute callback() toutes les interval unités de temps, la première fois après offset (par défaut interval). """
+        timer = Timer(callback, interval)
+        self.insert(timer, interval if offset is None else offset)
+        return timer
+
+    def insert(self, timer, delay):
+        ticks = max(1, math.ceil(delay / self.tick))
+        timer.rounds = (ticks - 1) // len(self.slots)
+        self.slots[(self.current + ticks) % len(self.slots)].append(timer)
+        self.pending += 1
+        if self.wakeup is not None and not self.wakeup.triggered:
+            self.wakeup.succeed()
+
+    def entries(self):
+        """ Tâches en attente, (tâche, case, tours restants), dans l'ordre où la roue les exécuterait à échéance égale. """
+        for slot, bucket in enumerate(self.slots):
+            for timer in bucket:
+                yield timer, slot, timer.rounds
+
+    def restore(self, current, next_tick, entries):
+        """ Reprend l'état d'une roue enregistrée : case courante, date du prochain tic et tâches
+        (tâche, case, tours restants) données dans l'ordre de entries(). À appeler sur une roue vide. """
+        self.current = current
+        self.resume_at = next_tick
+        for timer, slot, rounds in entries:
+            timer.rounds = rounds
+            self.slots[slot].append(timer)
+            self.pending += 1
+        if self.pending and self.wakeup is not None and not self.wakeup.triggered:
+            self.wakeup.succeed()
+
+    def run(self):
+        while True:
+            if not self.pending:
+                # Roue vide : aucun événement tant qu'aucune tâche n'est planifiée
+                self.next_tick = None
+                self.wakeup = self.env.event()
+                yield self.wakeup
+                self.wakeup = None
+            delay = self.tick
+            if self.resume_at is not None:
+                delay, self.resume_at = self.resume_at - self.env.now, None
+            self.next_tick = self.env.now + delay
+            yield self.env.timeout(delay)
+            self.current = (self.current + 1) % len(self.slots)
+            bucket = self.slots[self.current]
+            self.slots[self.current] = []
+            for timer in bucket:
+                if timer.cancelled:
+                    self.pending -= 1
+                elif timer.rounds:
+                    timer.rounds -= 1
+                    self.slots[self.current].append(timer)
+                else:
+                    self.pending -= 1
+                    timer.callback()
+                    if timer.interval is not None and not timer.cancelled:
+                        self.insert(timer, timer.interval)
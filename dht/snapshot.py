@@ -0,0 +1,368 @@
+# -------------------------------
+# Instantanés d'un anneau : enregistrement binaire et rechargement rapide
+# -------------------------------
+#
+# Un instantané fige un anneau v1 ou v2 complet : composition (identifiants et nœuds
+# physiques), pointeurs left/right, listes de voisins, tables des doigts, contenu des
+# stockages, réglages numériques de la classe Node, temps simulé et état du générateur
+# aléatoire. Le rechargement reconstruit l'anneau dans un nouvel environnement SimPy sans
+# rejouer les ajouts ni les écritures ; la suite de la simulation est alors identique à celle
+# qui aurait suivi l'enregistrement.
+#
+# Le fichier commence par un en-tête et une table des sections, puis chaque section est un
+# tableau d'entiers (alignés sur 8 octets, ordre des octets little-endian) lisible
+# directement par mmap (memoryview.cast, numpy.frombuffer) : les nœuds y sont désignés par
+# leur rang dans la liste enregistrée. Les clés, les valeurs et les métadonnées sont
+# sérialisées par pickle, chacune en un seul bloc.
+#
+# Si Node.wheel est la roue temporelle de l'anneau, sa case courante, la date de son prochain tic
+# et les tâches de maintenance en attente (case, tours restants, ordre dans la case) sont
+# enregistrées : l'anneau rechargé reprend une roue équivalente, où chaque nœud exécute sa
+# maintenance aux mêmes dates et dans le même ordre qu'avant l'enregistrement.
+#
+# Les caches des recherches et les lectures en cours ne sont pas enregistrés : l'anneau
+# rechargé part de caches vides. Les tâches de la roue qui ne sont pas la maintenance d'un nœud
+# (rappels posés par un scénario) ne peuvent pas l'être : elles sont rechargées annulées, et
+# gardent seulement leur place dans la roue.
+
+import array
+import gc
+import mmap
+import os
+import pickle
+import random
+import struct
+import sys
+
+import simpy
+
+from . import v1, v2
+from .keyspace import ID_BITS
+from .scheduler import Timer, TimerWheel
+from .storage import DataStore, KeyOrder, PRIMARY, LEFT_REPLICA, RIGHT_REPLICA
+
+MAGIC = b"DHTSNAP\x00"
+FORMAT_VERSION = 1
+# En-tête : signature, version du format, nombre de sections
+HEADER = struct.Struct("<8sII")
+# Entrée de la table des sections : nom, type des éléments (code du module array), position, nombre d'éléments
+SECTION = struct.Struct("<24s4sQQ")
+ALIGNMENT = 8
+ROLES = (PRIMARY, LEFT_REPLICA, RIGHT_REPLICA)
+# Rang de nœud d'une tâche de la roue qui n'est pas une maintenance en cours
+NO_NODE = 2 ** 32 - 1
+
+# Pour chaque implémentation : module, attribut de l'identifiant d'un nœud, classe des données et attribut de la valeur
+IMPLEMENTATIONS = {
+    "v1": (v1, "identifier", v1.Donnees, "value"),
+    "v2": (v2, "node_id", v2.Data, "content"),
+}
+
+
+def implementation_of(node):
+    return "v1" if isinstance(node, v1.Node) else "v2"
+
+
+# Attributs de la classe Node propres à l'exécution en cours (réseau, fabrique de stockage, roue
+# temporelle) : jamais enregistrés, même lorsqu'ils valent None
+RUNTIME_ATTRIBUTES = ("network", "storage", "wheel")
+
+
+def class_settings(node_class):
+    """ Réglages (réplication, cache, ...) et compteurs globaux de la classe Node : attributs numériques ou
+    None (cache_ttl=None, ...), pour qu'un réglage désactivé le soit aussi après le rechargement. """
+    return {name: value for name, value in vars(node_class).items()
+            if not name.startswith("_") and name not in RUNTIME_ATTRIBUTES
+            and (value is None or type(value) in (int, float, bool))}
+
+
+# -------------------------------
+# Enregistrement
+# -------------------------------
+
+def save(path, ring):
+    """ Enregistre l'anneau formé par les nœuds de ring (v1 ou v2) dans path.
+
+    load rend les nœuds dans l'ordre de ring, si bien qu'un tirage au hasard dans la liste
+    rechargée désigne les mêmes nœuds qu'avant l'enregistrement. Le fichier est écrit à côté puis renommé : un instantané existant n'est jamais laissé à moitié écrit.
+    """
+    ring = list(ring)
+    version = implementation_of(ring[0])
+    module, id_attribute, _, value_attribute = IMPLEMENTATIONS[version]
+    rank = {node: index for index, node in enumerate(ring)}
+
+    successor_counts, successors = array.array("I"), array.array("I")
+    predecessor_counts, predecessors = array.array("I"), array.array("I")
+    fingers, back_fingers = array.array("I"), array.array("I")
+    role_counts, entries = array.array("I"), array.array("I")
+    order_positions, order_items = array.array("Q"), array.array("I")
+    keys, values = [], []
+    items = {}  # {id(donnée): indice} : une donnée partagée par plusieurs détenteurs n'est écrite qu'une fois
+    held = []   # garde les données lues sur disque en vie, pour que leurs id ne soient pas réutilisés
+
+    for node in ring:
+        successor_counts.append(len(node.successors))
+        successors.extend(rank[neighbour] for neighbour in node.successors)
+        predecessor_counts.append(len(node.predecessors))
+        predecessors.extend(rank[neighbour] for neighbour in node.predecessors)
+        fingers.extend(rank[finger] for finger in node.fingers)
+        back_fingers.extend(rank[finger] for finger in node.back_fingers)
+        store = node.data_store
+        indices = {}
+        for table in (store.primary, store.left_replicas, store.right_replicas):
+            role_counts.append(len(table))
+            for key, data in table.items():
+                index = items.get(id(data))
+                if index is None:
+                    index = items[id(data)] = len(keys)
+                    keys.append(key)
+                    values.append(getattr(data, value_attribute))
+                    held.append(data)
+                indices[key] = index
+                entries.append(index)
+        store.order.sort()
+        order_positions.extend(store.order.positions)
+        order_items.extend(indices[key] for key in store.order.keys)
+
+    wheel = module.Node.wheel
+    wheel_state = None
+    timer_slots, timer_rounds, timer_nodes = array.array("I"), array.array("Q"), array.array("I")
+    timer_intervals = array.array("d")
+    if wheel is not None and wheel.env is ring[0].env:
+        wheel_state = {"tick": wheel.tick, "slots": len(wheel.slots), "current": wheel.current,
+                       "next_tick": wheel.next_tick}
+        owners = {node.maintenance: index for node, index in rank.items() if node.maintenance is not None}
+        for timer, slot, rounds in wheel.entries():
+            timer_slots.append(slot)
+            timer_rounds.append(rounds)
+            timer_nodes.append(NO_NODE if timer.cancelled else owners.get(timer, NO_NODE))
+            timer_intervals.append(timer.interval or 0.0)
+
+    meta = {
+        "version": version,
+        "now": ring[0].env.now,
+        "random_state": random.getstate(),
+        "settings": class_settings(module.Node),
+        "hosts": [node.host for node in ring],
+        "wheel": wheel_state,
+    }
+    sections = [
+        ("meta", blob(meta)),
+        ("ids", array.array("Q", (getattr(node, id_attribute) for node in ring))),
+        ("left", array.array("I", (rank[node.left] for node in ring))),
+        ("right", array.array("I", (rank[node.right] for node in ring))),
+        ("next_finger", array.array("I", (node.next_finger for node in ring))),
+        ("reads_served", array.array("Q", (node.reads_served for node in ring))),
+        ("successor_counts", successor_counts),
+        ("successors", successors),
+        ("predecessor_counts", predecessor_counts),
+        ("predecessors", predecessors),
+        ("fingers", fingers),
+        ("back_fingers", back_fingers),
+        ("role_counts", role_counts),
+        ("entries", entries),
+        ("order_positions", order_positions),
+        ("order_items", order_items),
+        ("timer_slots", timer_slots),
+        ("timer_rounds", timer_rounds),
+        ("timer_nodes", timer_nodes),
+        ("timer_intervals", timer_intervals),
+        ("keys", blob(keys)),
+        ("values", blob(values)),
+    ]
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        write_sections(f, sections)
+    os.replace(temporary, path)
+
+
+def blob(value):
+    return array.array("B", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def write_sections(f, sections):
+    offset = HEADER.size + SECTION.size * len(sections)
+    table = []
+    for name, values in sections:
+        offset += -offset % ALIGNMENT
+        table.append(SECTION.pack(name.encode(), values.typecode.encode(), offset, len(values)))
+        offset += len(values) * values.itemsize
+    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+    f.write(b"".join(table))
+    for name, values in sections:
+        f.write(b"\0" * (-f.tell() % ALIGNMENT))
+        if sys.byteorder != "little":
+            values = array.array(values.typecode, values)
+            values.byteswap()
+        values.tofile(f)
+
+
+# -------------------------------
+# Rechargement
+# -------------------------------
+
+def read_sections(mapping):
+    """ Vues sans copie des sections du fichier projeté en mémoire : {nom: (type des éléments, octets)}. """
+    magic, version, count = HEADER.unpack_from(mapping, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Fichier d'instantané invalide ou d'une version inconnue")
+    view = memoryview(mapping)
+    sections = {}
+    for index in range(count):
+        name, typecode, offset, length = SECTION.unpack_from(mapping, HEADER.size + index * SECTION.size)
+        typecode = typecode.rstrip(b"\0").decode()
+        size = array.array(typecode).itemsize
+        sections[name.rstrip(b"\0").decode()] = (typecode, view[offset:offset + length * size])
+    view.release()
+    return sections
+
+
+def column(sections, name):
+    """ Copie d'une section dans un array.array (copie d'octets, sans créer d'objet par élément). """
+    typecode, data = sections[name]
+    values = array.array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def load(path, env=None, settings=True):
+    """ Recharge l'anneau enregistré dans path et renvoie (env, nœuds dans l'ordre de l'enregistrement).
+
+    env est créé au temps simulé de l'enregistrement s'il n'est pas fourni. Avec settings, les
+    réglages et compteurs numériques de la classe Node sont remis à leurs valeurs enregistrées ;
+    l'état du générateur aléatoire l'est toujours, après la construction des nœuds. Un anneau
+    v1 remplace l'anneau courant (Node.existing_ids et Node.directory sont vidés). Un anneau
+    enregistré avec sa roue temporelle est rechargé avec une roue liée à env dans le même état
+    (Node.wheel), quelle que soit la roue courante. Sinon, si Node.wheel est une roue d'un autre
+    environnement, elle est remplacée par une roue de même réglage liée à env, où la maintenance
+    des nœuds rechargés est planifiée à nouveau. Avec un stockage sur disque
+    (Node.storage), le stockage de chaque nœud est vidé avant d'être rempli.
+
+    Le ramasse-miettes cyclique est suspendu pendant la reconstruction : les millions d'objets
+    créés n'ont pas à être parcourus à chaque seuil d'allocation.
+    """
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        return restore(path, env, settings)
+    finally:
+        if collecting:
+            gc.enable()
+
+
+def restore(path, env, settings):
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    sections = {}
+    try:
+        sections = read_sections(mapping)
+        meta = pickle.loads(sections["meta"][1])
+        keys = pickle.loads(sections["keys"][1])
+        values = pickle.loads(sections["values"][1])
+        columns = {name: column(sections, name) for name in sections if name not in ("meta", "keys", "values")}
+    finally:
+        # Les vues doivent être libérées avant de fermer la projection
+        for _, view in sections.values():
+            view.release()
+        mapping.close()
+
+    module, _, data_class, _ = IMPLEMENTATIONS[meta["version"]]
+    Node = module.Node
+    if settings:
+        for name, value in meta["settings"].items():
+            setattr(Node, name, value)
+    env = simpy.Environment(initial_time=meta["now"]) if env is None else env
+    wheel_state = meta.get("wheel")
+    if wheel_state is not None:
+        # Les tâches de maintenance sont replacées telles qu'enregistrées, pas planifiées à la construction
+        Node.wheel = None
+    ring = build_nodes(module, env, columns["ids"], meta["hosts"])
+    if wheel_state is not None:
+        Node.wheel = restore_wheel(env, wheel_state, ring, columns)
+    link_nodes(ring, columns)
+    fill_stores(ring, columns, keys, list(map(data_class, keys, values)))
+    random.setstate(meta["random_state"])
+    return env, ring
+
+
+def build_nodes(module, env, node_ids, hosts):
+    wheel = module.Node.wheel
+    if wheel is not None and wheel.env is not env:
+        module.Node.wheel = TimerWheel(env, wheel.tick, len(wheel.slots))
+    if module is v1:
+        v1.Node.existing_ids.clear()
+        v1.Node.directory.clear()
+        return [v1.Node(env, node_id, host) for node_id, host in zip(node_ids, hosts)]
+    ring = []
+    directory = None
+    for node_id, host in zip(node_ids, hosts):
+        ring.append(v2.Node(env, node_id, host, directory))
+        directory = ring[0].directory
+    return ring
+
+
+def restore_wheel(env, state, ring, columns):
+    """ Roue liée à env dans l'état enregistré ; la maintenance de chaque nœud y reprend sa place. """
+    wheel = TimerWheel(env, state["tick"], state["slots"])
+    entries = []
+    for slot, rounds, index, interval in zip(columns["timer_slots"], columns["timer_rounds"], columns["timer_nodes"],
+                                             columns["timer_intervals"]):
+        if index == NO_NODE:
+            timer = Timer(None)
+            timer.cancel()
+        else:
+            node = ring[index]
+            timer = node.maintenance = Timer(node.maintain, interval)
+        entries.append((timer, slot, rounds))
+    wheel.restore(state["current"], state["next_tick"], entries)
+    return wheel
+
+
+def link_nodes(ring, columns):
+    """ Rétablit les pointeurs, les listes de voisins et les tables des doigts. """
+    node_at = ring.__getitem__
+    successors, predecessors = columns["successors"], columns["predecessors"]
+    fingers, back_fingers = columns["fingers"], columns["back_fingers"]
+    next_successor = next_predecessor = 0
+    for index, node in enumerate(ring):
+        node.left = ring[columns["left"][index]]
+        node.right = ring[columns["right"][index]]
+        node.next_finger = columns["next_finger"][index]
+        node.reads_served = columns["reads_served"][index]
+        count = columns["successor_counts"][index]
+        node.successors = list(map(node_at, successors[next_successor:next_successor + count]))
+        next_successor += count
+        count = columns["predecessor_counts"][index]
+        node.predecessors = list(map(node_at, predecessors[next_predecessor:next_predecessor + count]))
+        next_predecessor += count
+        node.fingers = list(map(node_at, fingers[index * ID_BITS:(index + 1) * ID_BITS]))
+        node.back_fingers = list(map(node_at, back_fingers[index * ID_BITS:(index + 1) * ID_BITS]))
+
+
+def fill_stores(ring, columns, keys, items):
+    """ Remplit les stockages ; un DataStore est rempli d'un bloc, les autres stockages entrée par entrée. """
+    pairs = list(zip(keys, items))
+    entries, role_counts = columns["entries"], columns["role_counts"]
+    positions, order_items = columns["order_positions"], columns["order_items"]
+    start = 0
+    for index, node in enumerate(ring):
+        counts = role_counts[3 * index:3 * index + 3]
+        end = start + sum(counts)
+        tables = []
+        first = start
+        for count in counts:
+            selected = entries[first:first + count]
+            tables.append(dict(map(pairs.__getitem__, selected)))
+            first += count
+        store = node.data_store
+        if type(store) is DataStore:
+            order = KeyOrder.presorted(positions[start:end], list(map(keys.__getitem__, order_items[start:end])))
+            store.restore(tables[0], tables[1], tables[2], order)
+        else:
+            # Un journal rouvert dans un répertoire existant y retrouverait ses anciennes entrées
+            store.clear()
+            for role, table in zip(ROLES, tables):
+                store.put_all(table, role)
+        start = end
@@ -0,0 +1,202 @@
+# -------------------------------
+# Stockage des données d'un nœud
+# -------------------------------
+
+import bisect
+
+from operator import itemgetter
+
+from .keyspace import hash_key
+
+# Rôle d'une entrée dans le stockage d'un nœud
+PRIMARY = "primaire"
+LEFT_REPLICA = "réplique gauche"    # Le nœud est le voisin gauche du responsable
+RIGHT_REPLICA = "réplique droite"   # Le nœud est le voisin droit du responsable
+
+
+class KeyOrder:
+    """ Clés d'un nœud triées par position sur l'anneau, pour lire une plage sans parcourir tout le stockage.
+
+    Les ajouts et les retraits sont seulement notés (O(1), sans hacher la clé) et intégrés à
+    l'ordre trié par la lecture de plage suivante : une écriture ne coûte rien de plus qu'une
+    entrée de dictionnaire, et une lecture de plage après m écritures paie O(n + m log m).
+    add n'est appelé que pour une clé absente de l'ordre, discard que pour une clé présente.
+    """
+
+    def __init__(self, keys=()):
+        self.positions = []
+        self.keys = []
+        self.added = dict.fromkeys(keys)  # Clés ajoutées depuis le dernier tri (ensemble ordonné)
+        self.removed = set()              # Clés des listes triées retirées depuis le dernier tri
+
+    @classmethod
+    def presorted(cls, positions, keys):
+        """ Ordre construit à partir de positions déjà triées (liste ou array.array("Q")) et de leurs clés, sans les hacher de nouveau. """
+        order = cls()
+        order.positions = positions
+        order.keys = keys
+        return order
+
+    def add(self, key):
+        if key in self.removed:
+            # La clé est encore dans les listes triées
+            self.removed.discard(key)
+        else:
+            self.added[key] = None
+
+    def update(self, keys):
+        """ add pour un ensemble de clés absentes de l'ordre. """
+        restored = self.removed & keys
+        self.removed -= restored
+        self.added.update(dict.fromkeys(keys - restored if restored else keys))
+
+    def discard(self, key):
+        if key in self.added:
+            del self.added[key]
+        else:
+            self.removed.add(key)
+
+    def sort(self):
+        """ Intègre aux listes triées les ajouts et les retraits notés depuis le dernier tri. """
+        if not self.added and not self.removed:
+            return
+        removed = self.removed
+        pairs = [(position, key) for position, key in zip(self.positions, self.keys) if key not in removed]
+        pairs.extend((hash_key(key), key) for key in self.added)
+        # Deux suites déjà triées : le tri (stable, sur la seule position) les fusionne en temps linéaire
+        pairs.sort(key=itemgetter(0))
+        self.positions = [position for position, _ in pairs]
+        self.keys = [key for _, key in pairs]
+        self.added = {}
+        self.removed = set()
+
+    def range(self, start, end):
+        """ Clés dont la position appartient à l'intervalle circulaire [start, end], dans l'ordre de l'anneau depuis start. """
+        self.sort()
+        first = bisect.bisect_left(self.positions, start)
+        last = bisect.bisect_right(self.positions, end)
+        if start <= end:
+            return self.keys[first:last]
+        return self.keys[first:] + self.keys[:last]
+
+    def __len__(self):
+        return len(self.keys) + len(self.added) - len(self.removed)
+
+
+class DataStore:
+    """ Stockage indexé par clé : lecture, écriture et suppression en O(1).
+
+    Les entrées primaires et les répliques sont rangées dans des tables séparées,
+    ce qui permet de connaître le rôle d'un nœud pour une clé sans interroger ses voisins.
+    L'ordre des clés sur l'anneau est tenu à jour à côté (KeyOrder) pour les lectures de plages.
+    """
+
+    def __init__(self):
+        self.primary = {}
+        self.left_replicas = {}
+        self.right_replicas = {}
+        self.order = KeyOrder()
+        self.version = 0  # Incrémenté à chaque modification : invalide les arbres de Merkle en cache
+
+    def _tables(self):
+        return (self.primary, self.left_replicas, self.right_replicas)
+
+    def _table_for(self, role):
+        if role == PRIMARY:
+            return self.primary
+        if role == LEFT_REPLICA:
+            return self.left_replicas
+        if role == RIGHT_REPLICA:
+            return self.right_replicas
+        raise ValueError(f"Rôle de stockage inconnu : {role}")
+
+    def put(self, data, role=PRIMARY):
+        """ Ajoute ou remplace l'entrée de la clé avec le rôle donné. """
+        table = self._table_for(role)
+        # Une réplique ne retire jamais le rôle primaire d'une clé
+        if role != PRIMARY and data.key in self.primary:
+            table = self.primary
+        if data.key not in self:
+            self.order.add(data.key)
+        for other in self._tables():
+            if other is not table:
+                other.pop(data.key, None)
+        table[data.key] = data
+        self.version += 1
+
+    def put_all(self, entries, role=PRIMARY):
+        """ Range un lot {clé: donnée} avec le même rôle : même effet qu'un put par donnée, en opérations d'ensembles. """
+        entries = dict(entries)
+        keys = entries.keys()
+        if role != PRIMARY:
+            for key in keys & self.primary.keys():
+                self.primary[key] = entries.pop(key)
+        table = self._table_for(role)
+        others = [other for other in self._tables() if other is not table and other]
+        new = keys - table.keys()
+        for other in others:
+            moved = keys & other.keys()
+            new -= moved
+            for key in moved:
+                del other[key]
+        self.order.update(new)
+        table.update(entries)
+        self.version += 1
+
+    def get(self, key):
+        """ Renvoie la donnée associée à la clé, ou None. """
+        for table in self._tables():
+            data = table.get(key)
+            if data is not None:
+                return data
+        return None
+
+    def delete(self, key):
+        """ Supprime la clé et renvoie la donnée retirée, ou None. """
+        for table in self._tables():
+            data = table.pop(key, None)
+            if data is not None:
+                self.order.discard(key)
+                self.version += 1
+                return data
+        return None
+
+    def range(self, start, end):
+        """ Données (primaires et répliques) dont la position est dans [start, end], dans l'ordre de l'anneau. """
+        return [self.get(key) for key in self.order.range(start, end)]
+
+    def role(self, key):
+        """ Renvoie le rôle du nœud pour cette clé, ou None s'il ne la stocke pas. """
+        if key in self.primary:
+            return PRIMARY
+        if key in self.left_replicas:
+            return LEFT_REPLICA
+        if key in self.right_replicas:
+            return RIGHT_REPLICA
+        return None
+
+    def __contains__(self, key):
+        return key in self.primary or key in self.left_replicas or key in self.right_replicas
+
+    def __iter__(self):
+        for table in self._tables():
+            yield from list(table.values())
+
+    def __len__(self):
+        return len(self.primary) + len(self.left_replicas) + len(self.right_replicas)
+
+    def clear(self):
+        """ Supprime toutes les entrées. """
+        self.restore({}, {}, {}, KeyOrder())
+
+    def restore(self, primary, left_replicas, right_replicas, order):
+        """ Remplace tout le contenu du stockage (tables {clé: donnée} et KeyOrder déjà construits). """
+        self.primary = primary
+        self.left_replicas = left_replicas
+        self.right_replicas = right_replicas
+        self.order = order
+        self.version += 1
+
+    def close(self):
+        # Rien à libérer : les données ne sont qu'en mémoire
+        pass
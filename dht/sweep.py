@@ -0,0 +1,190 @@
+# -------------------------------
+# Balayage de paramètres sur plusieurs processus
+# -------------------------------
+#
+# Exemple :
+#   python -m dht sweep --versions v1 v2 --nodes 100 1000 --replication 1 3 5 --churn 0 0.01 0.05 --runs 16 --summary resume.csv
+#   python -m dht sweep --kind load --nodes 50 --load 5 10 20 --runs 8 --csv essais.csv
+#
+# Chaque simulation est un processus SimPy mono-thread qui utilise le module random global :
+# le balayage répartit donc des simulations indépendantes sur un ProcessPoolExecutor. Chaque
+# combinaison de paramètres est répétée avec les graines seed, seed + 1, ..., seed + runs - 1,
+# si bien qu'un essai donne le même résultat quel que soit le worker qui l'exécute et que les
+# combinaisons sont comparées sur les mêmes graines. Les lignes de chaque essai sont renvoyées
+# au fil de l'eau, puis agrégées par combinaison (moyenne et demi-largeur de l'intervalle de
+# confiance à 95 %, loi de Student).
+
+import argparse
+import csv
+import itertools
+import math
+import os
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import benchmark
+from .eventlog import logger, OFF
+
+# Paramètres balayés et mesures agrégées pour chaque type de simulation
+KINDS = {
+    "benchmark": (benchmark.run_benchmark,
+                  ["version", "nodes", "vnodes", "keys", "ops", "read_ratio", "zipf", "cache_size", "replication",
+                   "churn"],
+                  ["build_wall_s", "wall_s", "sim_time", "hops_per_lookup", "messages_per_op", "cache_hit_ratio",
+                   "max_mean_load", "max_mean_served", "lost_keys", "migrated_keys", "migration_messages"]),
+    "load": (benchmark.run_load,
+             ["nodes", "keys", "rate", "duration", "read_ratio", "service_time", "concurrency", "timeout"],
+             ["timed_out", "coalesced", "max_mean_served", "throughput", "mean_queue_wait", "max_queue", "mean_latency",
+              "p50_latency", "p99_latency"]),
+}
+
+# Quantiles à 97,5 % de la loi de Student selon le nombre de degrés de liberté
+T_975 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+         2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+         2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+
+def t_quantile(degrees):
+    """ Quantile à 97,5 % de la loi de Student ; la loi normale au-delà de 30 degrés de liberté. """
+    if degrees <= len(T_975):
+        return T_975[degrees - 1]
+    return 1.96
+
+
+def parameter_grid(grid):
+    """ Produit cartésien d'un dictionnaire {paramètre: [valeurs]} sous forme de dictionnaires. """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def init_worker():
+    # Les simulations d'un worker n'écrivent rien dans le journal
+    logger.configure(level=OFF)
+
+
+def run_task(kind, params, seed):
+    """ Exécute un essai dans un worker et renvoie sa ligne de résultats. """
+    function = KINDS[kind][0]
+    return function(seed=seed, **params)
+
+
+def run_sweep(kind, grid, runs=1, seed=0, workers=None, fixed=None):
+    """ Exécute runs essais de chaque combinaison de grid et renvoie les lignes au fil de leur arrivée.
+
+    fixed contient les arguments communs à tous les essais. Avec workers=1, les essais sont
+    exécutés dans le processus courant, dans l'ordre.
+    """
+    tasks = [(kind, dict(fixed or {}, **params), seed + run)
+             for params in parameter_grid(grid) for run in range(runs)]
+    if workers == 1:
+        init_worker()
+        for task in tasks:
+            yield run_task(*task)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        futures = [executor.submit(run_task, *task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize(rows, keys, metrics):
+    """ Agrège les essais par combinaison de keys : moyenne et intervalle de confiance de chaque mesure. """
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row[key] for key in keys), []).append(row)
+    summary = []
+    # Les paramètres absents (None) sont rangés avant les valeurs renseignées
+    for group_key in sorted(groups, key=lambda values: [(value is not None, value) for value in values]):
+        group = groups[group_key]
+        line = dict(zip(keys, group_key))
+        line["runs"] = len(group)
+        for metric in metrics:
+            values = [row[metric] for row in group]
+            mean = statistics.fmean(values)
+            half_width = 0.0
+            if len(values) > 1:
+                half_width = t_quantile(len(values) - 1) * statistics.stdev(values) / math.sqrt(len(values))
+            line[f"{metric}_mean"] = round(mean, 6)
+            line[f"{metric}_ci95"] = round(half_width, 6)
+        summary.append(line)
+    return summary
+
+
+def summary_fields(keys, metrics):
+    return keys + ["runs"] + [f"{metric}_{suffix}" for metric in metrics for suffix in ("mean", "ci95")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dht sweep",
+                                     description="Balayage de paramètres de la DHT sur plusieurs processus.")
+    parser.add_argument("--kind", choices=sorted(KINDS), default="benchmark")
+    parser.add_argument("--versions", nargs="+", default=["v1", "v2"], choices=sorted(benchmark.IMPLEMENTATIONS))
+    parser.add_argument("--nodes", nargs="+", type=int, default=[10, 100])
+    parser.add_argument("--vnodes", nargs="+", type=int, default=[1])
+    parser.add_argument("--keys", nargs="+", type=int, default=[1000])
+    parser.add_argument("--read-ratio", nargs="+", type=float, default=[0.9])
+    parser.add_argument("--ops", nargs="+", type=int, default=[1000])
+    parser.add_argument("--zipf", nargs="+", type=float, default=[0.0])
+    parser.add_argument("--cache-size", nargs="+", type=int, default=[0])
+    parser.add_argument("--replication", nargs="+", type=int, default=[3])
+    parser.add_argument("--churn", nargs="+", type=float, default=[0.0])
+    parser.add_argument("--bootstrap", action="store_true", help="amorcer l'anneau et les clés directement")
+    parser.add_argument("--storage", help="répertoire des journaux sur disque des nœuds (par défaut : en mémoire)")
+    parser.add_argument("--snapshots", help="répertoire des instantanés des anneaux construits, partagés par les essais")
+    parser.add_argument("--load", nargs="+", type=float, default=[5.0], help="débits offerts (--kind load)")
+    parser.add_argument("--duration", nargs="+", type=float, default=[100.0])
+    parser.add_argument("--service-time", nargs="+", type=float, default=[0.1])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1])
+    parser.add_argument("--timeout", nargs="+", type=float, default=[None], help="délai maximal des requêtes (--kind load)")
+    parser.add_argument("--runs", type=int, default=8, help="essais par combinaison (graines seed à seed + runs - 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processus (1 : dans le processus courant)")
+    parser.add_argument("--csv", help="fichier CSV des essais, écrit au fil de l'eau")
+    parser.add_argument("--summary", help="fichier CSV des moyennes et intervalles de confiance")
+    args = parser.parse_args(argv)
+
+    if args.kind == "benchmark":
+        grid = {"version": args.versions, "nodes": args.nodes, "vnodes": args.vnodes, "keys": args.keys,
+                "ops": args.ops, "read_ratio": args.read_ratio, "zipf": args.zipf,
+                "cache_size": args.cache_size, "replication": args.replication, "churn": args.churn}
+        fixed = {"track_memory": False, "bootstrap": args.bootstrap, "storage": args.storage,
+                 "snapshots": args.snapshots}
+        fields = benchmark.FIELDS
+    else:
+        grid = {"nodes": args.nodes, "keys": args.keys, "rate": args.load, "duration": args.duration,
+                "read_ratio": args.read_ratio, "service_time": args.service_time,
+                "concurrency": args.concurrency, "timeout": args.timeout}
+        fixed = {}
+        fields = benchmark.LOAD_FIELDS
+    _, keys, metrics = KINDS[args.kind]
+
+    output = None
+    writer = None
+    if args.csv:
+        output = open(args.csv, "w", newline="", encoding="utf-8")
+        writer = csv.DictWriter(output, fieldnames=fields)
+        writer.writeheader()
+    rows = []
+    try:
+        for row in run_sweep(args.kind, grid, args.runs, args.seed, args.workers, fixed):
+            rows.append(row)
+            if writer is not None:
+                writer.writerow(row)
+                output.flush()
+            print(f"[{len(rows)}] " + " | ".join(f"{key}={row[key]}" for key in keys + ["seed"]), file=sys.stderr)
+    finally:
+        if output is not None:
+            output.close()
+
+    summary = summarize(rows, keys, metrics)
+    columns = summary_fields(keys, metrics)
+    print(" | ".join(columns))
+    for line in summary:
+        print(" | ".join(f"{line[column]}" for column in columns))
+    if args.summary:
+        benchmark.write_csv(summary, args.summary, columns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,705 @@
+# -------------------------------
+# Transport réseau réel : nœuds asyncio sur 127.0.0.1
+# -------------------------------
+#
+# Exemple :
+#   python -m dht net --nodes 8 --keys 1000 --ops 20000 --window 64 --read-ratio 0.9
+#
+# Chaque nœud est un processus qui sert les opérations de dht.v2 (arrivée, stockage, lecture,
+# départ, envoi de message) sur une connexion TCP locale. Les messages (v2.Message : émetteur,
+# destinataire, contenu) circulent dans des trames binaires préfixées par leur longueur ; le
+# contenu est codé par un format à étiquettes (None, booléens, entiers, flottants, chaînes,
+# octets, listes), sans pickle. Chaque nœud garde une connexion persistante par voisin
+# (ConnectionPool) et y fait passer plusieurs requêtes à la fois : chaque trame porte un numéro
+# de requête et les réponses reviennent dans un ordre quelconque (pipelining). Une requête qui
+# échoue chez un nœud reçoit une trame ERROR (levée chez l'appelant en RemoteError), et une
+# requête sans réponse après REQUEST_TIMEOUT secondes est abandonnée (asyncio.TimeoutError).
+#
+# Le placement est celui de dht.v2, lu dans le même annuaire (RingDirectory.owner et
+# RingDirectory.replicas) : le responsable d'une clé est le nœud le plus proche de sa position
+# (égalité : le prédécesseur), ses répliques sont ses voisins alternativement à gauche et à droite.
+# Le reste diffère de la simulation : NodeServer n'exécute pas v2.Node. Chaque processus connaît
+# toute la composition de l'anneau, diffusée à chaque arrivée et à chaque départ (pas de
+# stabilisation ni de réparation périodiques), et une requête saute au doigt le plus proche de la
+# position, quitte à la dépasser. Les débits mesurés valent pour ce protocole, pas pour celui
+# simulé par dht.v2 ; seules les règles de placement sont communes.
+#
+# Le générateur de charge lance N processus, les fait entrer dans l'anneau, précharge les clés
+# puis garde au plus window requêtes en vol (réparties sur des nœuds d'entrée tirés au hasard)
+# et rapporte le débit (opérations par seconde) et les quantiles de la latence.
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import struct
+import time
+
+from .directory import RingDirectory
+from .keyspace import ID_BITS, REPLICATION_FACTOR, circular_distance, hash_key, virtual_node_id
+from .storage import DataStore, PRIMARY, LEFT_REPLICA, RIGHT_REPLICA
+from .v2 import Data, Message
+
+# -------------------------------
+# Format des trames
+# -------------------------------
+
+# Trame : longueur de la suite, type, numéro de requête, émetteur, destinataire, puis le contenu codé
+FRAME = struct.Struct(">IBQQQ")
+LENGTH = struct.Struct(">I")
+HEADER = struct.Struct(">BQQQ")
+
+# Types de trames
+RESPONSE = 0
+JOIN = 1        # Demande d'entrée : renvoie la composition de l'anneau
+ADD = 2         # Annonce d'un nouveau nœud
+DEPART = 3      # Annonce d'un départ
+STORE = 4
+RETRIEVE = 5
+SEND = 6
+REPLICATE = 7   # Lot d'entrées [clé, valeur, rôle] à ranger
+LEAVE = 8       # Demande de départ adressée à un nœud
+ERROR = 9       # Réponse d'une requête qui a échoué : le contenu décrit l'erreur
+
+ROLES = (PRIMARY, LEFT_REPLICA, RIGHT_REPLICA)
+
+# Étiquettes du codage du contenu
+NONE, FALSE, TRUE, INT, FLOAT, STR, BYTES, LIST = range(8)
+SIZE = struct.Struct(">I")
+DOUBLE = struct.Struct(">d")
+
+# Au-delà de ce volume en attente d'émission, l'écrivain attend que la socket se vide
+WRITE_BUFFER_LIMIT = 256 * 1024
+# Délai (secondes) au-delà duquel une requête sans réponse est abandonnée
+REQUEST_TIMEOUT = 10.0
+
+
+class RemoteError(Exception):
+    """ Erreur levée chez le nœud qui a traité la requête, renvoyée dans une trame ERROR. """
+
+
+def pack_value(value, out):
+    """ Ajoute à out (bytearray) le codage de value. """
+    if value is None:
+        out.append(NONE)
+    elif value is True or value is False:
+        out.append(TRUE if value else FALSE)
+    elif isinstance(value, int):
+        raw = value.to_bytes((value.bit_length() + 8) // 8, "big", signed=True)
+        out.append(INT)
+        out.append(len(raw))
+        out += raw
+    elif isinstance(value, float):
+        out.append(FLOAT)
+        out += DOUBLE.pack(value)
+    elif isinstance(value, str):
+        raw = value.encode("utf-8")
+        out.append(STR)
+        out += SIZE.pack(len(raw))
+        out += raw
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        out.append(BYTES)
+        out += SIZE.pack(len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(LIST)
+        out += SIZE.pack(len(value))
+        for item in value:
+            pack_value(item, out)
+    else:
+        raise TypeError(f"Type non transportable : {type(value).__name__}")
+
+
+def unpack_value(buffer, offset=0):
+    """ Décode la valeur qui commence à offset ; renvoie (valeur, position suivante). """
+    tag = buffer[offset]
+    offset += 1
+    if tag == NONE:
+        return None, offset
+    if tag == FALSE or tag == TRUE:
+        return tag == TRUE, offset
+    if tag == INT:
+        length = buffer[offset]
+        return int.from_bytes(buffer[offset + 1:offset + 1 + length], "big", signed=True), offset + 1 + length
+    if tag == FLOAT:
+        return DOUBLE.unpack_from(buffer, offset)[0], offset + DOUBLE.size
+    if tag in (STR, BYTES):
+        length = SIZE.unpack_from(buffer, offset)[0]
+        raw = bytes(buffer[offset + SIZE.size:offset + SIZE.size + length])
+        return (raw.decode("utf-8") if tag == STR else raw), offset + SIZE.size + length
+    if tag == LIST:
+        count = SIZE.unpack_from(buffer, offset)[0]
+        offset += SIZE.size
+        items = []
+        for _ in range(count):
+            item, offset = unpack_value(buffer, offset)
+            items.append(item)
+        return items, offset
+    raise ValueError(f"Étiquette inconnue : {tag}")
+
+
+def encode_frame(kind, request_id, message):
+    """ Trame complète (préfixe de longueur compris) d'un v2.Message. """
+    out = bytearray(FRAME.size)
+    pack_value(message.content, out)
+    FRAME.pack_into(out, 0, len(out) - LENGTH.size, kind, request_id, message.sender, message.receiver)
+    return out
+
+
+def decode_frame(body):
+    """ Décode le corps d'une trame (sans le préfixe de longueur) : (type, numéro de requête, Message). """
+    kind, request_id, sender, receiver = HEADER.unpack_from(body, 0)
+    content, _ = unpack_value(body, HEADER.size)
+    return kind, request_id, Message(sender=sender, receiver=receiver, content=content)
+
+
+async def read_frame(reader):
+    length = LENGTH.unpack(await reader.readexactly(LENGTH.size))[0]
+    return decode_frame(await reader.readexactly(length))
+
+
+# -------------------------------
+# Connexions persistantes
+# -------------------------------
+
+class FrameWriter:
+    """ Regroupe les trames écrites pendant un tour de la boucle d'événements en un seul envoi.
+
+    Avec plusieurs requêtes en vol, cela évite un appel système (et, sur la même machine, un
+    réveil du destinataire) par trame.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.buffer = bytearray()
+
+    def send(self, frame):
+        if not self.buffer:
+            asyncio.get_running_loop().call_soon(self.flush)
+        self.buffer += frame
+
+    def flush(self):
+        if self.buffer and not self.writer.is_closing():
+            self.writer.write(self.buffer)
+        self.buffer = bytearray()
+
+    async def drain(self):
+        """ Attend que la socket se vide si trop de données attendent leur émission. """
+        if self.writer.transport.get_write_buffer_size() + len(self.buffer) > WRITE_BUFFER_LIMIT:
+            self.flush()
+            await self.writer.drain()
+
+
+class Connection:
+    """ Connexion persistante vers un nœud : plusieurs requêtes en vol, réponses associées par numéro. """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.frames = FrameWriter(writer)
+        self.pending = {}  # {numéro de requête: future}
+        self.next_id = 1
+        self.receiver = asyncio.ensure_future(self.receive())
+
+    async def request(self, kind, message, timeout=REQUEST_TIMEOUT):
+        """ Envoie une requête et attend le contenu de sa réponse, au plus timeout secondes (None : sans limite).
+
+        Lève RemoteError si le nœud n'a pas pu la traiter, asyncio.TimeoutError passé le délai.
+        """
+        request_id = self.next_id
+        self.next_id += 1
+        future = self.pending[request_id] = asyncio.get_running_loop().create_future()
+        try:
+            self.frames.send(encode_frame(kind, request_id, message))
+            await self.frames.drain()
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            # Réponse reçue, délai écoulé ou requête impossible à coder : le numéro est libéré
+            self.pending.pop(request_id, None)
+
+    async def receive(self):
+        try:
+            while True:
+                kind, request_id, message = await read_frame(self.reader)
+                future = self.pending.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if kind == ERROR:
+                    future.set_exception(RemoteError(message.content))
+                else:
+                    future.set_result(message.content)
+        except (asyncio.IncompleteReadError, ConnectionError) as error:
+            failure = ConnectionError(f"Connexion perdue : {error}")
+        except asyncio.CancelledError:
+            failure = ConnectionError("Connexion fermée")
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(failure)
+        self.pending.clear()
+
+    def close(self):
+        self.receiver.cancel()
+        self.writer.close()
+
+
+class ConnectionPool:
+    """ Une connexion persistante par port de destination, ouverte à la première requête. """
+
+    def __init__(self, host="127.0.0.1"):
+        self.host = host
+        self.connections = {}
+        self.opening = {}
+
+    async def connection(self, port):
+        connection = self.connections.get(port)
+        if connection is not None and not connection.receiver.done():
+            return connection
+        # Plusieurs tâches peuvent demander la même connexion : une seule l'ouvre
+        opening = self.opening.get(port)
+        if opening is None:
+            opening = self.opening[port] = asyncio.ensure_future(asyncio.open_connection(self.host, port))
+        try:
+            reader, writer = await opening
+        finally:
+            self.opening.pop(port, None)
+        connection = self.connections.get(port)
+        if connection is None or connection.receiver.done():
+            connection = self.connections[port] = Connection(reader, writer)
+        elif connection.writer is not writer:
+            writer.close()
+        return connection
+
+    async def request(self, port, kind, message, timeout=REQUEST_TIMEOUT):
+        return await (await self.connection(port)).request(kind, message, timeout)
+
+    def discard(self, port):
+        connection = self.connections.pop(port, None)
+        if connection is not None:
+            connection.close()
+
+    def close(self):
+        for connection in self.connections.values():
+            connection.close()
+        self.connections.clear()
+
+
+# -------------------------------
+# Composition de l'anneau
+# -------------------------------
+
+def copy_directory(directory):
+    copy = RingDirectory()
+    copy.ids = list(directory.ids)
+    copy.nodes = dict(directory.nodes)
+    return copy
+
+
+# -------------------------------
+# Nœud servi par un processus
+# -------------------------------
+
+class NodeServer:
+    """ Nœud de l'anneau servi en TCP : reçoit les trames, les traite ou les fait suivre au doigt suivant.
+
+    L'annuaire (RingDirectory) associe chaque identifiant au couple (identifiant, port) du
+    nœud ; les doigts, recalculés à chaque changement de composition, sont les nœuds qui suivent
+    node_id + 2^i et précèdent node_id - 2^i, comme dans dht.v2.
+    """
+
+    def __init__(self, node_id, port=0, replication_factor=REPLICATION_FACTOR):
+        self.node_id = node_id
+        self.port = port
+        self.replication_factor = replication_factor
+        self.directory = RingDirectory()
+        self.fingers = []
+        self.data_store = DataStore()
+        self.pool = ConnectionPool()
+        self.membership = asyncio.Lock()
+        self.server = None
+        self.stopped = None
+        self.requests = 0
+        self.forwarded = 0
+        self.errors = 0
+
+    @property
+    def peer(self):
+        return (self.node_id, self.port)
+
+    async def start(self):
+        self.stopped = asyncio.get_running_loop().create_future()
+        self.server = await asyncio.start_server(self.serve, "127.0.0.1", self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.directory.add(self.node_id, self.peer)
+        self.refresh_fingers()
+
+    async def join(self, bootstrap_port):
+        """ Entre dans l'anneau par le nœud qui écoute sur bootstrap_port, puis s'annonce à tous les membres. """
+        members = await self.pool.request(bootstrap_port, JOIN, self.message(0, [self.node_id, self.port]))
+        async with self.membership:
+            for node_id, port in members:
+                if node_id not in self.directory:
+                    self.directory.add(node_id, (node_id, port))
+            self.refresh_fingers()
+        await asyncio.gather(*(self.pool.request(port, ADD, self.message(node_id, [self.node_id, self.port]))
+                               for node_id, port in members if node_id != self.node_id))
+
+    async def stop(self):
+        # Les connexions entrantes restent ouvertes : elles se ferment avec le processus
+        self.server.close()
+        self.pool.close()
+        if not self.stopped.done():
+            self.stopped.set_result(None)
+
+    def message(self, receiver, content):
+        return Message(sender=self.node_id, receiver=receiver, content=content)
+
+    def refresh_fingers(self):
+        peers = set()
+        for i in range(ID_BITS):
+            peers.add(self.directory.successor(self.node_id + 2 ** i))
+            peers.add(self.directory.floor(self.node_id - 2 ** i))
+        peers.discard(self.peer)
+        self.fingers = list(peers)
+
+    def next_hop(self, position):
+        """ Doigt le plus proche de la position ; le responsable lui-même s'il n'y a pas mieux. """
+        own = circular_distance(self.node_id, position)
+        best = min(self.fingers, key=lambda peer: circular_distance(peer[0], position), default=None)
+        if best is None or circular_distance(best[0], position) >= own:
+            return self.directory.owner(position)
+        return best
+
+    # -------------------------------
+    # Réception des trames
+    # -------------------------------
+
+    async def serve(self, reader, writer):
+        """ Lit les trames d'une connexion ; chaque requête est traitée dans sa propre tâche. """
+        tasks = set()
+        frames = FrameWriter(writer)
+        try:
+            while True:
+                kind, request_id, message = await read_frame(reader)
+                task = asyncio.ensure_future(self.answer(frames, kind, request_id, message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # Connexion fermée par le pair, ou processus qui s'arrête
+            pass
+        finally:
+            writer.close()
+
+    async def answer(self, frames, kind, request_id, message):
+        self.requests += 1
+        try:
+            content = await self.handle(kind, message)
+            frame = encode_frame(RESPONSE, request_id, self.message(message.sender, content))
+        except Exception as error:
+            # L'appelant attend une réponse : l'erreur lui est renvoyée plutôt que de le laisser attendre
+            self.errors += 1
+            frame = encode_frame(ERROR, request_id, self.message(message.sender, f"{type(error).__name__}: {error}"))
+        if frames.writer.is_closing():
+            return
+        frames.send(frame)
+        if kind == LEAVE:
+            frames.flush()
+            await self.stop()
+        else:
+            await frames.drain()
+
+    async def handle(self, kind, message):
+        if kind == JOIN:
+            return [[node_id, port] for node_id, port in self.directory.nodes.values()]
+        if kind == ADD:
+            node_id, port = message.content
+            await self.change_membership(added=(node_id, port))
+            return True
+        if kind == DEPART:
+            await self.change_membership(departed=message.content)
+            return True
+        if kind == REPLICATE:
+            for key, value, role in message.content:
+                self.keep(Data(key, value), ROLES[role])
+            return True
+        if kind == LEAVE:
+            await self.leave()
+            return True
+        if kind in (STORE, RETRIEVE):
+            return await self.route(kind, message, hash_key(message.content[0]))
+        if kind == SEND:
+            return await self.route(kind, message, message.receiver)
+        raise ValueError(f"Type de trame inconnu : {kind}")
+
+    async def route(self, kind, message, position):
+        """ Traite la requête si ce nœud est le responsable de la position, sinon la fait suivre.
+
+        Les réponses de STORE, RETRIEVE et SEND sont des listes [trouvé, valeur, responsable, sauts].
+        """
+        target = self.next_hop(position)
+        if target != self.peer:
+            self.forwarded += 1
+            try:
+                found, value, owner, hops = await self.pool.request(target[1], kind, message)
+            except (ConnectionError, asyncio.TimeoutError):
+                # Le nœud suivant a disparu sans annoncer son départ, ou ne répond plus : la requête échoue
+                self.pool.discard(target[1])
+                return [False, None, None, 1]
+            return [found, value, owner, hops + 1]
+        if kind == STORE:
+            key, value = message.content
+            await self.store(Data(key, value))
+            return [True, None, self.node_id, 0]
+        if kind == RETRIEVE:
+            data = self.data_store.get(message.content[0])
+            return [data is not None, None if data is None else data.content, self.node_id, 0]
+        # SEND : le message n'est remis que si son destinataire est ce nœud
+        return [message.receiver == self.node_id, None, self.node_id, 0]
+
+    # -------------------------------
+    # Données
+    # -------------------------------
+
+    def keep(self, data, role):
+        """ Range la donnée avec le rôle donné, en remplaçant un éventuel rôle précédent. """
+        if self.data_store.role(data.key) not in (None, role):
+            self.data_store.delete(data.key)
+        self.data_store.put(data, role)
+
+    async def store(self, data):
+        """ Stocke la donnée en primaire et attend que chaque réplique l'ait rangée. """
+        replicas = self.directory.replicas(hash_key(data.key), self.replication_factor)
+        self.keep(data, PRIMARY)
+        await asyncio.gather(*(self.pool.request(peer[1], REPLICATE,
+                                                 self.message(peer[0], [[data.key, data.content, ROLES.index(role)]]))
+                               for peer, role in replicas[1:]))
+
+    async def change_membership(self, added=None, departed=None):
+        """ Met à jour l'annuaire et les doigts, puis redistribue les entrées dont les détenteurs ont changé.
+
+        Seul le responsable de la clé (avant ou après le changement) envoie les copies aux
+        nouveaux détenteurs ; un nœud qui n'est plus détenteur supprime sa copie.
+        """
+        async with self.membership:
+            old = copy_directory(self.directory)
+            if added is not None and added[0] not in self.directory:
+                self.directory.add(added[0], tuple(added))
+            if departed is not None and departed in self.directory:
+                self.pool.discard(self.directory.nodes[departed][1])
+                self.directory.remove(departed)
+            self.refresh_fingers()
+            await self.push_changes(old, self.directory)
+
+    async def push_changes(self, old, new, leaving=False):
+        batches = {}
+        for data in list(self.data_store):
+            position = hash_key(data.key)
+            before = dict(old.replicas(position, self.replication_factor))
+            after = dict(new.replicas(position, self.replication_factor))
+            if self.peer in after:
+                self.keep(data, after[self.peer])
+            else:
+                self.data_store.delete(data.key)
+            if leaving or old.owner(position) == self.peer or new.owner(position) == self.peer:
+                for peer, role in after.items():
+                    if peer != self.peer and before.get(peer) != role:
+                        batches.setdefault(peer, []).append([data.key, data.content, ROLES.index(role)])
+        await asyncio.gather(*(self.pool.request(peer[1], REPLICATE, self.message(peer[0], entries))
+                               for peer, entries in batches.items()))
+
+    async def leave(self):
+        """ Confie les entrées de ce nœud à leurs nouveaux détenteurs, puis annonce le départ à tous les membres. """
+        async with self.membership:
+            old = copy_directory(self.directory)
+            self.directory.remove(self.node_id)
+            if not len(self.directory):
+                return
+            await self.push_changes(old, self.directory, leaving=True)
+            members = list(self.directory.nodes.values())
+        await asyncio.gather(*(self.pool.request(port, DEPART, self.message(node_id, self.node_id))
+                               for node_id, port in members))
+
+
+def run_node(node_id, bootstrap_port, replication_factor, ready):
+    """ Point d'entrée d'un processus de nœud : écoute, entre dans l'anneau, signale son port dans ready. """
+    async def main():
+        node = NodeServer(node_id, 0, replication_factor)
+        await node.start()
+        if bootstrap_port is not None:
+            await node.join(bootstrap_port)
+        ready.put(node.port)
+        await node.stopped
+
+    asyncio.run(main())
+
+
+# -------------------------------
+# Client et générateur de charge
+# -------------------------------
+
+class Client:
+    """ Client de l'anneau : chaque requête part d'un nœud d'entrée tiré au hasard parmi ports. """
+
+    def __init__(self, ports, timeout=REQUEST_TIMEOUT):
+        self.ports = list(ports)
+        self.timeout = timeout
+        self.pool = ConnectionPool()
+
+    async def call(self, kind, receiver, content, port=None):
+        port = random.choice(self.ports) if port is None else port
+        return await self.pool.request(port, kind, Message(sender=0, receiver=receiver, content=content), self.timeout)
+
+    async def put(self, key, value):
+        """ Stocke value sous key ; renvoie [True, None, responsable, sauts]. """
+        return await self.call(STORE, 0, [key, value])
+
+    async def get(self, key):
+        """ Lit key ; renvoie [trouvée, valeur, responsable, sauts]. """
+        return await self.call(RETRIEVE, 0, [key])
+
+    async def send(self, receiver, content):
+        """ Achemine content jusqu'au nœud receiver ; renvoie [remis, None, dernier nœud, sauts]. """
+        return await self.call(SEND, receiver, content)
+
+    async def leave(self, port):
+        """ Demande au nœud qui écoute sur port de quitter l'anneau. """
+        self.ports.remove(port)
+        result = await self.call(LEAVE, 0, None, port)
+        self.pool.discard(port)
+        return result
+
+    def close(self):
+        self.pool.close()
+
+
+def start_nodes(count, replication_factor=REPLICATION_FACTOR, seed=0):
+    """ Lance count processus de nœuds, entrés dans l'anneau l'un après l'autre ; renvoie (processus, ports). """
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    processes = []
+    ports = []
+    for index in range(count):
+        node_id = virtual_node_id(f"node-{seed}-{index}", 0)
+        process = context.Process(target=run_node, args=(node_id, ports[0] if ports else None, replication_factor,
+                                                         ready), daemon=True)
+        process.start()
+        processes.append(process)
+        ports.append(ready.get(timeout=30))
+    return processes, ports
+
+
+def stop_nodes(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+async def generate_load(ports, keys, ops, read_ratio, window, seed=0, timeout=REQUEST_TIMEOUT):
+    """ Précharge keys clés puis exécute ops opérations avec au plus window requêtes en vol.
+
+    Renvoie les latences (secondes), les sauts des requêtes, la durée de la phase mesurée, le
+    nombre de lectures qui n'ont pas trouvé leur clé et celui des requêtes échouées (erreur
+    renvoyée, connexion perdue ou délai écoulé), qui libèrent leur place dans la fenêtre.
+    """
+    rng = random.Random(seed)
+    client = Client(ports, timeout)
+    key_set = [f"key-{seed}-{i}" for i in range(keys)]
+    slots = asyncio.Semaphore(window)
+    errors = 0
+
+    async def preload(key):
+        nonlocal errors
+        async with slots:
+            try:
+                await client.put(key, f"Value for {key}")
+            except (RemoteError, ConnectionError, asyncio.TimeoutError):
+                errors += 1
+
+    await asyncio.gather(*(preload(key) for key in key_set))
+
+    latencies = []
+    hops = []
+    misses = 0
+
+    async def operation(key, is_read):
+        nonlocal misses, errors
+        async with slots:
+            start = time.perf_counter()
+            try:
+                if is_read:
+                    found, _, _, count = await client.get(key)
+                    misses += not found
+                else:
+                    _, _, _, count = await client.put(key, f"Value for {key} @{start}")
+            except (RemoteError, ConnectionError, asyncio.TimeoutError):
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+            hops.append(count)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(operation(rng.choice(key_set), rng.random() < read_ratio) for _ in range(ops)))
+    wall = time.perf_counter() - start
+    client.close()
+    return latencies, hops, wall, misses, errors
+
+
+NET_FIELDS = ["nodes", "keys", "ops", "read_ratio", "window", "replication", "seed", "wall_s", "ops_per_s",
+              "mean_hops", "misses", "errors", "mean_latency_ms", "p50_latency_ms", "p90_latency_ms", "p99_latency_ms"]
+
+
+def run_net(nodes, keys, ops, read_ratio=0.9, window=64, replication=REPLICATION_FACTOR, seed=0):
+    """ Lance nodes processus de nœuds, leur soumet la charge de generate_load et renvoie une ligne de résultats. """
+    processes, ports = start_nodes(nodes, replication, seed)
+    try:
+        latencies, hops, wall, misses, errors = asyncio.run(generate_load(ports, keys, ops, read_ratio, window, seed))
+    finally:
+        stop_nodes(processes)
+    return {
+        "nodes": nodes,
+        "keys": keys,
+        "ops": ops,
+        "read_ratio": read_ratio,
+        "window": window,
+        "replication": replication,
+        "seed": seed,
+        "wall_s": round(wall, 3),
+        "ops_per_s": round(ops / wall) if wall else 0,
+        "mean_hops": round(sum(hops) / len(hops), 3) if hops else 0.0,
+        "misses": misses,
+        "errors": errors,
+        "mean_latency_ms": round(1000 * sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_latency_ms": round(1000 * percentile(latencies, 50), 3),
+        "p90_latency_ms": round(1000 * percentile(latencies, 90), 3),
+        "p99_latency_ms": round(1000 * percentile(latencies, 99), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dht net",
+                                     description="Charge d'un anneau de processus réels sur 127.0.0.1 (TCP).")
+    parser.add_argument("--nodes", nargs="+", type=int, default=[8], help="nombre de processus de nœuds")
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--ops", type=int, default=10000)
+    parser.add_argument("--read-ratio", type=float, default=0.9)
+    parser.add_argument("--window", nargs="+", type=int, default=[64], help="requêtes en vol au plus")
+    parser.add_argument("--replication", type=int, default=REPLICATION_FACTOR)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(" | ".join(NET_FIELDS))
+    for nodes in args.nodes:
+        for window in args.window:
+            row = run_net(nodes, args.keys, args.ops, args.read_ratio, window, args.replication, args.seed)
+            print(" | ".join(f"{row[field]}" for field in NET_FIELDS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,853 @@
+import simpy
+import random
+from .storage import DataStore, PRIMARY, LEFT_REPLICA, RIGHT_REPLICA
+from .cache import LookupCache
+from .directory import RingDirectory
+from .eventlog import logger, INFO
+from .metrics import metrics
+from . import merkle
+from .keyspace import ID_BITS, ID_SPACE, NEIGHBOUR_LIST_SIZE, REPLICATION_FACTOR, hash_key, in_interval, \
+    in_open_interval, midpoint, replica_span, slice_end, sort_from
+
+class Message:
+    __slots__ = ("sender", "receiver", "content")
+
+    def __init__(self, sender, receiver, content):
+        self.sender = sender
+        self.receiver = receiver
+        self.content = content
+
+class Donnees:
+    __slots__ = ("key", "value")
+
+    def __init__(self, key, value):
+        self.key = key
+        self.value = value
+
+    def __repr__(self):
+        return f"Données({self.key}: {self.value})"
+
+class Node:
+    existing_ids = set()
+    # Annuaire trié des nœuds : point d'insertion et doigts des nouveaux nœuds en O(log N)
+    directory = RingDirectory()
+    # Compteurs globaux de trafic : sauts de routage et copies de données vers les répliques
+    hop_count = 0
+    transfer_count = 0
+    # Nombre de successeurs et de prédécesseurs connus de chaque nœud
+    neighbour_list_size = NEIGHBOUR_LIST_SIZE
+    # Nombre de copies de chaque donnée : le responsable et ses voisins, alternativement à gauche et à droite
+    replication_factor = REPLICATION_FACTOR
+    # Coût des migrations lors des arrivées et des départs : clés déplacées et lots envoyés
+    migrated_keys = 0
+    migration_messages = 0
+    # Trafic de l'anti-entropie : hachés et empreintes comparés, messages et entrées recopiées
+    repair_hashes = 0
+    repair_messages = 0
+    repair_keys = 0
+    # Cache des recherches sur les nœuds du chemin (taille 0 : désactivé), durée de vie en temps simulé
+    cache_size = 0
+    cache_ttl = None
+    cache_hits = 0
+    cache_misses = 0
+    # Répartition des lectures entre les détenteurs d'une clé selon leur charge et leur distance
+    # (False : le détenteur le plus proche du responsable sert la lecture) ; coût d'un pas vers un détenteur
+    read_balancing = True
+    read_distance_cost = 1
+    # Fabrique du stockage de chaque nœud, appelée avec son identifiant (logstore.log_storage) ;
+    # None : stockage en mémoire (storage.DataStore)
+    storage = None
+    # Roue temporelle (scheduler.TimerWheel) qui déclenche la maintenance périodique des nœuds ;
+    # None : aucune maintenance, les nœuds n'ont alors aucun processus en attente
+    wheel = None
+    maintenance_interval = 10
+
+    def __init__(self, env, identifier, host=None):
+        if identifier in Node.existing_ids:
+            raise ValueError(f"Nœud avec l'identifiant {identifier} existe déjà!")
+        Node.existing_ids.add(identifier)
+        Node.directory.add(identifier, self)
+
+        self.env = env
+        self.identifier = identifier
+        # Nœud physique auquel appartient ce nœud virtuel
+        self.host = identifier if host is None else host
+        self.left = self
+        self.right = self
+        self.data_store = DataStore() if Node.storage is None else Node.storage(identifier)
+        # Table des doigts : fingers[i] est le successeur de (identifier + 2^i)
+        self.fingers = [self] * ID_BITS
+        # Doigts arrière : back_fingers[i] est le nœud qui précède ou occupe (identifier - 2^i)
+        self.back_fingers = [self] * ID_BITS
+        self.successors = []
+        self.predecessors = []
+        self.cache = LookupCache(Node.cache_size, Node.cache_ttl) if Node.cache_size else None
+        # Nœuds qui gardent en cache une donnée obtenue auprès de ce nœud : {clé: {nœuds}}
+        self.cache_watchers = {}
+        # Lectures servies par ce nœud en tant que détenteur
+        self.reads_served = 0
+        self.next_finger = 0
+        # Arbres de Merkle de la dernière synchronisation : {détenteur: (tampon, arbre)}
+        self.merkle_trees = {}
+        self.maintenance = None
+        if Node.wheel is not None:
+            # Décalage aléatoire pour étaler la maintenance des nœuds sur l'intervalle
+            self.maintenance = Node.wheel.every(Node.maintenance_interval, self.maintain,
+                                                random.uniform(0, Node.maintenance_interval))
+
+    def __repr__(self):
+        return f"Node({self.identifier})"
+
+    def maintain(self):
+        # Tâche périodique déclenchée par la roue temporelle
+        self.stabilize()
+        self.fix_fingers()
+        self.check_replicas()
+
+    def stabilize(self):
+        # Vérifie que le successeur nous reconnaît comme prédécesseur et rafraîchit les listes de voisins
+        candidate = self.right.left
+        if in_open_interval(candidate.identifier, self.identifier, self.right.identifier):
+            self.right = candidate
+        if in_open_interval(self.identifier, self.right.left.identifier, self.right.identifier):
+            self.right.left = self
+        self.refresh_neighbours()
+
+    def fix_fingers(self):
+        # Recalcule un doigt (et le doigt arrière de même rang) à chaque passage, à tour de rôle
+        i = self.next_finger
+        self.fingers[i], _ = self.find_successor(self.finger_start(i))
+        self.back_fingers[i], _ = self.find_predecessor((self.back_finger_start(i) + 1) % ID_SPACE)
+        self.next_finger = (i + 1) % ID_BITS
+
+    def check_replicas(self):
+        # Anti-entropie : les données dont ce nœud est responsable sont comparées à celles de
+        # chaque réplique par arbres de Merkle, et seules les tranches qui diffèrent sont échangées
+        for replica, role in self.replica_nodes()[1:]:
+            self.synchronize(replica, role)
+
+    def synchronize(self, replica, role):
+        # Répare la réplique (et ce nœud, s'il a perdu des clés qu'elle détient encore) ;
+        # renvoie le nombre d'entrées recopiées. Le trafic est compté dans Node.repair_*.
+        # Les arbres sont gardés d'un passage à l'autre (merkle.synchronize).
+        start = self.left.identifier
+        width = (self.right.identifier - start) % ID_SPACE or ID_SPACE
+        repaired, leaves, hashes, messages = merkle.synchronize(self, replica, role, start, width, "value")
+        Node.repair_hashes += hashes
+        Node.repair_messages += messages
+        if not leaves:
+            return 0
+        Node.repair_keys += repaired
+        if metrics.enabled:
+            metrics.count(self.identifier, "repaired_keys", repaired)
+        logger.debug("repair", "[{now}] {node} répare {count} entrées avec {replica} ({leaves} feuilles divergentes).",
+                     now=self.env.now, node=self.identifier, count=repaired, replica=replica.identifier,
+                     leaves=len(leaves))
+        return repaired
+
+    def send_join_message(self, recipient):
+        message = Message(self, recipient, "nouveau nœud")
+        logger.info("join_send", "[{now}] {node} envoie le message '{content}' à {recipient}",
+                    now=self.env.now, node=self.identifier, content=message.content, recipient=recipient.identifier)
+        recipient.received_join_message(message)
+
+    def received_join_message(self, message):
+        logger.info("join_receive", "[{now}] {node} a reçu le message '{content}' de {sender}",
+                    now=self.env.now, node=self.identifier, content=message.content, sender=message.sender.identifier)
+        if message.content == "nouveau nœud":
+            self.insert_node(message.sender)
+
+    def insert_node(self, new_node):
+        logger.info("insert", "[{now}] Le nœud {node} reçoit le message 'nouveau nœud' et va l'insérer.",
+                    now=self.env.now, node=self.identifier)
+        if self.right == self:
+            self.left = new_node
+            self.right = new_node
+            new_node.left = self
+            new_node.right = self
+        else:
+            position = self.find_position(new_node)
+            new_node.left = position
+            new_node.right = position.right
+            position.right.left = new_node
+            position.right = new_node
+        new_node.init_fingers()
+        new_node.update_others()
+        new_node.refresh_neighbourhood()
+        # Les voisins cèdent une partie de leurs clés : leurs réponses en cache ne sont plus suivies
+        new_node.left.invalidate_all_cached()
+        new_node.right.invalidate_all_cached()
+        new_node.rebalance()
+        self.display_ring()
+
+    def finger_start(self, i):
+        return (self.identifier + 2 ** i) % ID_SPACE
+
+    def back_finger_start(self, i):
+        return (self.identifier - 2 ** i) % ID_SPACE
+
+    def init_fingers(self):
+        # Construit les tables des doigts du nouveau nœud (voisin immédiat ou dichotomie dans l'annuaire)
+        # 2^i <= écart avec le voisin tant que i < écart.bit_length()
+        near_right = min(ID_BITS, ((self.right.identifier - self.identifier) % ID_SPACE).bit_length())
+        near_left = min(ID_BITS, ((self.identifier - self.left.identifier) % ID_SPACE).bit_length())
+        self.fingers = [self.right] * near_right + \
+            [Node.directory.successor(self.identifier + 2 ** i) for i in range(near_right, ID_BITS)]
+        self.back_fingers = [self.left] * near_left + \
+            [Node.directory.floor(self.identifier - 2 ** i) for i in range(near_left, ID_BITS)]
+
+    def update_others(self):
+        # Met à jour les doigts des nœuds qui doivent désormais pointer vers ce nœud
+        gap_right = (self.right.identifier - self.identifier) % ID_SPACE
+        gap_left = (self.identifier - self.left.identifier) % ID_SPACE
+        for i in range(ID_BITS):
+            step = 2 ** i
+            current = self.left if step <= gap_left else Node.directory.predecessor(self.identifier - step + 1)
+            while current is not self:
+                start = (current.identifier + step) % ID_SPACE
+                finger = current.fingers[i]
+                if (self.identifier - start) % ID_SPACE >= (finger.identifier - start) % ID_SPACE:
+                    break
+                current.fingers[i] = self
+                current = current.left
+            # Symétriquement, les nœuds situés juste après identifier + 2^i
+            current = self.right if step <= gap_right else Node.directory.successor(self.identifier + step)
+            while current is not self:
+                start = (current.identifier - step) % ID_SPACE
+                finger = current.back_fingers[i]
+                if (start - self.identifier) % ID_SPACE >= (start - finger.identifier) % ID_SPACE:
+                    break
+                current.back_fingers[i] = self
+                current = current.right
+
+    def remove_from_fingers(self):
+        # Remplace ce nœud par son successeur (ou son prédécesseur pour les doigts arrière)
+        # dans les doigts qui pointent vers lui
+        gap_right = (self.right.identifier - self.identifier) % ID_SPACE
+        gap_left = (self.identifier - self.left.identifier) % ID_SPACE
+        for i in range(ID_BITS):
+            step = 2 ** i
+            current = self.left if step <= gap_left else Node.directory.predecessor(self.identifier - step + 1)
+            while current.fingers[i] is self:
+                current.fingers[i] = self.right
+                current = current.left
+            current = self.right if step <= gap_right else Node.directory.successor(self.identifier + step)
+            while current.back_fingers[i] is self:
+                current.back_fingers[i] = self.left
+                current = current.right
+
+    def refresh_neighbours(self):
+        # Reconstruit les listes de successeurs et de prédécesseurs à partir des pointeurs
+        self.successors = []
+        current = self.right
+        while current is not self and len(self.successors) < Node.neighbour_list_size:
+            self.successors.append(current)
+            current = current.right
+        self.predecessors = []
+        current = self.left
+        while current is not self and len(self.predecessors) < Node.neighbour_list_size:
+            self.predecessors.append(current)
+            current = current.left
+
+    def refresh_neighbourhood(self):
+        # Seuls les neighbour_list_size voisins de chaque côté voient leurs listes changer
+        # lorsqu'un nœud arrive ou part à côté de ce nœud
+        affected = {self}
+        left, right = self, self
+        for _ in range(Node.neighbour_list_size + 1):
+            left, right = left.left, right.right
+            affected.update((left, right))
+        for node in affected:
+            node.refresh_neighbours()
+
+    def closer_node(self, position):
+        # Nœud connu le plus avancé vers la position par l'arc le plus court, sans la dépasser :
+        # doigts et successeurs vers la droite, doigts arrière et prédécesseurs vers la gauche.
+        # Renvoie None si aucun nœud connu ne se trouve entre ce nœud et la position.
+        forward = (position - self.identifier) % ID_SPACE
+        backward = (self.identifier - position) % ID_SPACE
+        if forward <= backward:
+            tables, sign, limit = (self.fingers, self.successors), 1, forward
+        else:
+            tables, sign, limit = (self.back_fingers, self.predecessors), -1, backward
+        best = None
+        best_progress = 0
+        for table in tables:
+            # Les tables sont ordonnées par distance croissante : le premier candidat valide
+            # en partant de la fin est le meilleur de sa table
+            for node in reversed(table):
+                progress = sign * (node.identifier - self.identifier) % ID_SPACE
+                if 0 < progress <= limit:
+                    if progress > best_progress:
+                        best, best_progress = node, progress
+                    break
+        return best
+
+    def next_hop(self, position):
+        # Prochain saut vers le nœud responsable de la position ; si aucun nœud connu ne la
+        # précède sur l'arc le plus court, elle tombe entre ce nœud et son voisin de ce côté
+        next_node = self.closer_node(position)
+        if next_node is not None:
+            return next_node
+        if (position - self.identifier) % ID_SPACE <= (self.identifier - position) % ID_SPACE:
+            return self.right
+        return self.left
+
+    def closest_preceding_finger(self, target, inclusive=False):
+        # Plus grand doigt qui ne dépasse pas la cible
+        for finger in reversed(self.fingers):
+            if in_open_interval(finger.identifier, self.identifier, target) or \
+                    (inclusive and finger.identifier == target and finger is not self):
+                return finger
+        return self
+
+    def find_predecessor(self, key):
+        # Renvoie le nœud n tel que key ∈ ]n, n.right] ainsi que le nombre de sauts
+        current = self
+        hops = 0
+        while not in_interval(key, current.identifier, current.right.identifier):
+            next_node = current.closest_preceding_finger(key)
+            if next_node is current:
+                next_node = current.right
+            current = next_node
+            hops += 1
+            Node.hop_count += 1
+        return current, hops
+
+    def find_successor(self, key):
+        predecessor, hops = self.find_predecessor(key)
+        return predecessor.right, hops
+
+    def find_position(self, new_node):
+        # Le nouveau nœud s'insère juste après le dernier identifiant qui lui est inférieur
+        return Node.directory.predecessor(new_node.identifier)
+
+    def remove(self):
+        if self.maintenance is not None:
+            self.maintenance.cancel()
+        if self.left == self and self.right == self:
+            logger.info("remove", "[{now}] Dernier nœud {node} supprimé, l'anneau est vide.",
+                        now=self.env.now, node=self.identifier)
+            Node.existing_ids.remove(self.identifier)
+            Node.directory.remove(self.identifier)
+            self.data_store.close()
+            return None
+
+        # Les réponses obtenues auprès de ce nœud changent de détenteur
+        self.invalidate_all_cached()
+
+        # Mettre à jour les doigts et les pointeurs des voisins
+        self.remove_from_fingers()
+        self.left.right = self.right
+        self.right.left = self.left
+        self.left.refresh_neighbourhood()
+        logger.info("remove", "[{now}] Nœud {node} supprimé, {left} et {right} sont maintenant connectés.",
+                    now=self.env.now, node=self.identifier, left=self.left.identifier, right=self.right.identifier)
+
+        Node.existing_ids.remove(self.identifier)
+        Node.directory.remove(self.identifier)
+        # Les clés dont les détenteurs changent partent de ce nœud ou de leurs copies restantes
+        self.left.rebalance(self)
+        self.data_store.close()
+        return self.right
+
+    def replica_nodes(self):
+        # Détenteurs des données dont ce nœud est responsable, avec leur rôle : le nœud lui-même
+        # puis ses voisins du plus proche au plus éloigné, alternativement à gauche et à droite
+        left_count, right_count = replica_span(Node.replication_factor)
+        holders = [(self, PRIMARY)]
+        seen = {self}
+        left, right = self, self
+        for distance in range(1, max(left_count, right_count) + 1):
+            if distance <= left_count:
+                left = left.left
+                if left not in seen:
+                    holders.append((left, LEFT_REPLICA))
+                    seen.add(left)
+            if distance <= right_count:
+                right = right.right
+                if right not in seen:
+                    holders.append((right, RIGHT_REPLICA))
+                    seen.add(right)
+        return holders
+
+    def ring_window(self, reach):
+        # Nœuds situés à au plus reach pas de ce nœud, de chaque côté
+        window = {self}
+        left, right = self, self
+        for _ in range(reach):
+            left, right = left.left, right.right
+            window.update((left, right))
+        return window
+
+    def rebalance(self, departed=None):
+        # Après l'arrivée de ce nœud, ou le départ de departed dont ce nœud était le voisin gauche,
+        # seuls les responsables proches voient changer les détenteurs de leurs clés. Chaque clé
+        # concernée est recopiée chez ses nouveaux détenteurs et retirée des anciens ; les copies
+        # sont groupées en un lot par couple (source, destination). Renvoie le nombre de clés copiées.
+        reach = Node.replication_factor + 1
+        owners = self.ring_window(reach)
+        sources = list(self.ring_window(2 * reach))
+        if departed is not None:
+            sources.append(departed)
+        holders = {}
+        for node in sources:
+            for data in node.data_store:
+                holders.setdefault(data.key, []).append(node)
+
+        batches = {}
+        for key, nodes in holders.items():
+            owner = Node.directory.owner(hash_key(key))
+            if owner not in owners:
+                continue
+            # L'ancien responsable envoie la donnée s'il la détient encore, sinon une de ses répliques
+            source = next((node for node in nodes if node.data_store.role(key) == PRIMARY), nodes[0])
+            data = source.data_store.get(key)
+            targets = dict(owner.replica_nodes())
+            for node in nodes:
+                if node not in targets and node is not departed:
+                    node.release(key)
+            for node, role in targets.items():
+                current = node.data_store.role(key)
+                if current is None:
+                    batches.setdefault((source, node), []).append((data, role))
+                elif current != role:
+                    node.data_store.delete(key)
+                    node.data_store.put(data, role)
+
+        moved = 0
+        for (source, node), entries in batches.items():
+            node.receive_batch(source, entries)
+            moved += len(entries)
+        return moved
+
+    def release(self, key):
+        # Ce nœud ne détient plus la clé : les caches qui la tenaient de lui l'oublient
+        self.data_store.delete(key)
+        for node in self.cache_watchers.pop(key, ()):
+            if node.cache is not None:
+                node.cache.invalidate(key)
+
+    def receive_batch(self, source, entries):
+        # Reçoit en un seul message un lot de couples (donnée, rôle) migrés depuis source
+        for data, role in entries:
+            self.data_store.put(data, role)
+        Node.migrated_keys += len(entries)
+        Node.migration_messages += 1
+        logger.debug("migrate", "[{now}] {node} reçoit {count} données de {source}.",
+                     now=self.env.now, node=self.identifier, count=len(entries), source=source.identifier)
+
+    def is_central_node(self, data):
+        # Le nœud est responsable de la donnée (ses deux voisins en ont une réplique)
+        return self.data_store.role(data.key) == PRIMARY
+
+    def is_left_node(self, data):
+        # Le nœud porte la réplique la plus à gauche de la donnée
+        return self.data_store.role(data.key) == LEFT_REPLICA
+
+    def is_right_node(self, data):
+        # Le nœud porte la réplique la plus à droite de la donnée
+        return self.data_store.role(data.key) == RIGHT_REPLICA
+
+    def display_ring(self):
+        # Le parcours complet de l'anneau n'est fait que si le journal l'affichera
+        if not logger.enabled(INFO):
+            return
+        current = self
+        min_node = self
+        while True:
+            if current.identifier < min_node.identifier:
+                min_node = current
+            current = current.right
+            if current == self:
+                break
+
+        current = min_node
+        nodes = []
+        while True:
+            nodes.append(f"[{current.identifier}]")
+            current = current.right
+            if current == min_node:
+                break
+        logger.info("ring", "\n{ring}\n", ring="--->".join(nodes))
+
+    def send(self, target_id, content):
+        message = Message(self, target_id, content)
+        logger.info("send", "[{now}] {node} envoie '{content}' à {target}",
+                    now=self.env.now, node=self.identifier, content=content, target=target_id)
+        self.forward(message)
+
+    def forward(self, message):
+        # Routage dans les deux sens par l'arc le plus court, renvoie le nombre de sauts
+        current = self
+        hops = 0
+        while True:
+            next_node = current.closer_node(message.receiver)
+            if next_node is None or next_node is self:
+                break
+            if metrics.enabled:
+                metrics.count(current.identifier, "forwarded")
+            current = next_node
+            hops += 1
+            Node.hop_count += 1
+            if current.identifier == message.receiver:
+                current.deliver(message)
+                if metrics.enabled:
+                    metrics.observe("message_hops", hops)
+                return hops
+            logger.debug("forward", "[{now}] {node} forward le message '{content}'",
+                         now=self.env.now, node=current.identifier, content=message.content)
+        logger.warning("not_found", "[{now}] Message pour {receiver} introuvable dans l'anneau!",
+                       now=self.env.now, receiver=message.receiver)
+        if metrics.enabled:
+            metrics.observe("message_hops", hops)
+        return hops
+
+    def deliver(self, message):
+        logger.info("deliver", "[{now}] {node} a reçu le message: '{content}' de {sender}",
+                    now=self.env.now, node=self.identifier, content=message.content, sender=message.sender.identifier)
+
+    def store_data(self, key, value):
+        # Vérifiez si la donnée existe déjà pour éviter la duplication
+        if self.has_data(key):
+            logger.info("store_skip", "[{now}] {node} a déjà la donnée pour la clé {key}.",
+                        now=self.env.now, node=self.identifier, key=key)
+            return
+
+        data = Donnees(key, value)
+        responsible_node, hops = self.lookup(hash_key(key))
+        if metrics.enabled:
+            metrics.count(responsible_node.identifier, "stores")
+            metrics.observe("store_hops", hops)
+        responsible_node.data_store.put(data, PRIMARY)
+        responsible_node.invalidate_cached(key)
+        logger.info("store", "[{now}] {node} stocke {data}.",
+                    now=self.env.now, node=responsible_node.identifier, data=data)
+
+        # Stocker sur les voisins (Node.replication_factor copies au total) ; une copie existante
+        # est remplacée, car les répliques servent aussi les lectures
+        for replica, role in responsible_node.replica_nodes()[1:]:
+            replica.data_store.put(data, role)
+            Node.transfer_count += 1
+            logger.debug("store_replica", "[{now}] {node} stocke également {data}.",
+                         now=self.env.now, node=replica.identifier, data=data)
+
+    def find_responsible_node(self, key):
+        responsible_node, _ = self.lookup(hash_key(key))
+        return responsible_node
+
+    def lookup(self, position):
+        # Route vers le nœud le plus proche de la position (distance circulaire) en prenant
+        # à chaque saut l'arc le plus court
+        current = self
+        hops = 0
+        while not current.is_responsible_for(position):
+            if metrics.enabled:
+                metrics.count(current.identifier, "forwarded")
+            current = current.next_hop(position)
+            hops += 1
+            Node.hop_count += 1
+        return current, hops
+
+    def is_responsible_for(self, position):
+        # Vérifie si ce nœud est le plus proche de la position (égalité : le prédécesseur l'emporte)
+        if self.right == self:
+            return True
+        if position == self.identifier or in_interval(position, self.identifier, self.right.identifier):
+            return position != self.right.identifier and \
+                (position - self.identifier) % ID_SPACE <= (self.right.identifier - position) % ID_SPACE
+        if in_interval(position, self.left.identifier, self.identifier):
+            return (self.identifier - position) % ID_SPACE < (position - self.left.identifier) % ID_SPACE
+        return False
+
+    def group_by_responsible(self, keys):
+        # Parcourt l'anneau une seule fois pour un lot de clés triées par position à partir de ce
+        # nœud : renvoie chaque responsable avec sa tranche contiguë de clés et les sauts cumulés
+        offsets, ordered = sort_from(self.identifier, keys)
+        groups = []
+        current = self
+        hops = 0
+        index = 0
+        while index < len(ordered):
+            current, extra_hops = current.lookup((self.identifier + offsets[index]) % ID_SPACE)
+            hops += extra_hops
+            end = slice_end(offsets, index, self.identifier, current.identifier, current.right.identifier)
+            groups.append((current, ordered[index:end], hops))
+            index = end
+        return groups
+
+    def put_many(self, items):
+        # Stocke un lot de couples (clé, valeur) en une seule tournée de l'anneau ; chaque détenteur
+        # range sa tranche d'un bloc
+        values = dict(items)
+        results = {}
+        for responsible_node, keys, hops in self.group_by_responsible(values):
+            stored = [key for key in keys if not self.has_data(key)]
+            if len(stored) < len(keys):
+                for key in set(keys).difference(stored):
+                    logger.debug("store_skip", "[{now}] {node} a déjà la donnée pour la clé {key}.",
+                                 now=self.env.now, node=self.identifier, key=key)
+            if not stored:
+                continue
+            entries = {key: Donnees(key, values[key]) for key in stored}
+            holders = responsible_node.replica_nodes()
+            for holder, role in holders:
+                holder.data_store.put_all(entries, role)
+            Node.transfer_count += len(entries) * (len(holders) - 1)
+            responsible_node.invalidate_cached_keys(stored)
+            results.update(dict.fromkeys(stored, (responsible_node, hops)))
+            logger.info("store_batch", "[{now}] {node} stocke {count} données (clés {first} à {last}), "
+                        "répliquées sur {replicas}.",
+                        now=self.env.now, node=responsible_node.identifier, count=len(stored),
+                        first=stored[0], last=stored[-1], replicas=[replica.identifier for replica, _ in holders[1:]])
+        return results
+
+    def get_many(self, keys):
+        # Récupère un lot de clés en une seule tournée : renvoie {clé: (trouvée, valeur, sauts)}
+        results = {}
+        for responsible_node, group, hops in self.group_by_responsible(keys):
+            found = 0
+            holders = [holder for holder, _ in responsible_node.replica_nodes()]
+            for key in group:
+                results[key] = (False, None, hops)
+                for current in holders:
+                    data = current.data_store.get(key)
+                    if data is not None:
+                        results[key] = (True, data.value, hops)
+                        found += 1
+                        break
+            logger.info("get_batch", "[{now}] {node} a trouvé {found}/{count} données demandées ({hops} sauts).",
+                        now=self.env.now, node=responsible_node.identifier, found=found, count=len(group), hops=hops)
+        return results
+
+    def range_query(self, start, end, limit=None):
+        # Lit les données dont la position est dans l'intervalle circulaire [start, end] : une seule
+        # recherche jusqu'au responsable de start, puis un saut par voisin droit dont l'arc recoupe
+        # l'intervalle. Chaque nœud renvoie sa tranche dans l'ordre de l'anneau, sans les clés déjà
+        # reçues ; on s'arrête après limit données. Renvoie ([(clé, valeur)], sauts).
+        current, hops = self.lookup(start)
+        owner = current
+        results = []
+        seen = set()
+        span = (end - start) % ID_SPACE
+        wrapped = False  # Revenu au responsable de start : la fin de l'intervalle est dans son arc
+        while True:
+            last = end
+            if not wrapped and current.right != current:
+                arc_end = midpoint(current.identifier, current.right.identifier)
+                if (arc_end - start) % ID_SPACE < span:
+                    last = arc_end
+            batch = [(data.key, data.value) for data in current.data_store.range(start, last)
+                     if data.key not in seen]
+            if limit is not None:
+                batch = batch[:limit - len(results)]
+            if batch:
+                seen.update(key for key, _ in batch)
+                results.extend(batch)
+                Node.transfer_count += 1
+            if last == end or (limit is not None and len(results) >= limit):
+                break
+            current = current.right
+            wrapped = current == owner
+            hops += 1
+            Node.hop_count += 1
+        logger.info("range", "[{now}] {node} a lu {count} données entre {start} et {end} ({hops} sauts).",
+                    now=self.env.now, node=self.identifier, count=len(results), start=start, end=end, hops=hops)
+        if metrics.enabled:
+            metrics.count(owner.identifier, "range_queries")
+            metrics.observe("range_hops", hops)
+        return results, hops
+
+    def request_data(self, key):
+        logger.info("request", "[{now}] {node} demande la donnée pour la clé {key}.",
+                    now=self.env.now, node=self.identifier, key=key)
+        self.forward_data_request(key)
+
+    def forward_data_request(self, key):
+        # Route la demande jusqu'au nœud responsable, puis consulte ses répliques ; avec le cache
+        # activé, chaque nœud du chemin peut répondre et la réponse est gardée au retour
+        position = hash_key(key)
+        path = []
+        current = self
+        hops = 0
+        while not current.is_responsible_for(position):
+            if current.cache is not None:
+                cached = current.cache.get(key, self.env.now)
+                if cached is not None:
+                    value, holder = cached
+                    Node.cache_hits += 1
+                    logger.info("cache_hit", "[{now}] {node} a la donnée pour la clé {key} en cache: {value}.",
+                                now=self.env.now, node=current.identifier, key=key, value=value)
+                    self.cache_along(path, key, value, holder)
+                    if metrics.enabled:
+                        metrics.count(current.identifier, "served_from_cache")
+                        metrics.observe("read_hops", hops)
+                    return hops
+            if metrics.enabled:
+                metrics.count(current.identifier, "forwarded")
+            path.append(current)
+            current = current.next_hop(position)
+            hops += 1
+            Node.hop_count += 1
+        if self.cache is not None:
+            Node.cache_misses += 1
+        if metrics.enabled:
+            metrics.observe("read_hops", hops)
+        holder, distance = current.read_holder(key)
+        if holder is not None:
+            hops += distance
+            Node.hop_count += distance
+            holder.reads_served += 1
+            value = holder.deliver_data(key)
+            self.cache_along(path, key, value, holder)
+            if metrics.enabled:
+                metrics.count(holder.identifier, "served")
+            return hops
+        logger.warning("not_found", "[{now}] Donnée pour la clé {key} introuvable dans l'anneau! ({hops} sauts)",
+                       now=self.env.now, key=key, hops=hops)
+        return hops
+
+    def read_holder(self, key):
+        # Choisit le détenteur de la clé qui sert une lecture arrivée sur ce nœud, parmi ce nœud et ses
+        # voisins à moins de Node.replication_factor pas : chacun coûte le nombre de lectures qu'il a
+        # déjà servies plus Node.read_distance_cost par pas depuis ce nœud, et le moins coûteux
+        # l'emporte (égalité : le plus proche). Renvoie (détenteur, pas), ou (None, 0).
+        candidates = []
+        seen = set()
+        left, right = self, self
+        for distance in range(Node.replication_factor):
+            if distance:
+                left, right = left.left, right.right
+            for node in (left, right):
+                if node not in seen and node.has_data(key):
+                    candidates.append((node, distance))
+                seen.add(node)
+        if not candidates:
+            return None, 0
+        if not Node.read_balancing:
+            return candidates[0]
+        return min(candidates, key=lambda candidate: (candidate[0].reads_served + Node.read_distance_cost * candidate[1],
+                                                      candidate[1]))
+
+    def cache_along(self, path, key, value, holder):
+        # Les nœuds du chemin de retour gardent la réponse et s'inscrivent auprès du détenteur
+        for node in path:
+            if node.cache is None:
+                continue
+            evicted = node.cache.put(key, value, holder, self.env.now)
+            holder.cache_watchers.setdefault(key, set()).add(node)
+            if evicted is not None:
+                evicted_key, evicted_holder = evicted
+                evicted_holder.cache_watchers.get(evicted_key, set()).discard(node)
+
+    def invalidate_cached(self, key):
+        # La donnée a changé : les caches qui la tiennent de ce nœud ou de ses répliques l'oublient
+        self.invalidate_cached_keys((key,))
+
+    def invalidate_cached_keys(self, keys):
+        # Même chose pour un lot de clés, en un seul calcul des détenteurs
+        for holder, _ in self.replica_nodes():
+            if not holder.cache_watchers:
+                continue
+            for key in keys:
+                for node in holder.cache_watchers.pop(key, ()):
+                    if node.cache is not None:
+                        node.cache.invalidate(key)
+
+    def invalidate_all_cached(self):
+        # Les données de ce nœud changent de détenteur : toutes les réponses suivies sont oubliées
+        for key, watchers in self.cache_watchers.items():
+            for node in watchers:
+                if node.cache is not None:
+                    node.cache.invalidate(key)
+        self.cache_watchers = {}
+
+    def has_data(self, key):
+        return key in self.data_store
+
+    def deliver_data(self, key):
+        data = self.data_store.get(key)
+        if data is not None:
+            logger.info("found", "[{now}] {node} a trouvé la donnée pour la clé {key}: {value}.",
+                        now=self.env.now, node=self.identifier, key=key, value=data.value)
+            return data.value
+        logger.warning("not_found", "[{now}] {node} n'a pas trouvé la donnée pour la clé {key}.",
+                       now=self.env.now, node=self.identifier, key=key)
+
+    def draw_ring(self):
+        # matplotlib et numpy ne sont chargés qu'au premier dessin
+        import matplotlib.pyplot as plt
+        import numpy as np
+
+        # Récupérer tous les nœuds dans l'anneau
+        nodes = []
+        current = self
+        while True:
+            nodes.append(current)
+            current = current.right
+            if current == self:
+                break
+
+        # Calculer les positions des nœuds sur un cercle
+        num_nodes = len(nodes)
+        angles = np.linspace(0, 2 * np.pi, num_nodes, endpoint=False)
+        angles = np.concatenate((angles, [angles[0]]))  # Fermer le cercle
+        radius = 1
+
+        # Positions des nœuds
+        x = radius * np.cos(angles)
+        y = radius * np.sin(angles)
+
+        # Créer le graphique
+        plt.figure(figsize=(6, 6))
+        plt.plot(x, y, 'o-', markersize=10)  # Nœuds
+        plt.xlim(-1.5, 1.5)
+        plt.ylim(-1.5, 1.5)
+        plt.gca().set_aspect('equal', adjustable='box')
+
+        # Modifier l'apparence de la figure (fond blanc sans lignes noires)
+        plt.gca().set_facecolor('white')
+        plt.grid(False)  # Désactiver la grille
+        plt.axis('off')
+
+        # Annoter les nœuds avec leur identifiant et leurs données
+        for i, node in enumerate(nodes):
+            # Récupérer les données du nœud
+            data_info = ", ".join([f"{data.key}: {data.value}" for data in node.data_store])
+            # Si le nœud a des données, les afficher
+            if data_info:
+                label = f"{node.host}\n({data_info})"
+            else:
+                label = f"{node.host}\n(Aucun Donnée)"
+            
+            plt.annotate(label, (x[i], y[i]), textcoords="offset points", xytext=(0,10), ha='center')
+
+        plt.title("Anneau des Nœuds avec données")
+        plt.show()
+
+# Amorçage direct d'un anneau stable, sans rejouer les ajouts un par un :
+# pointeurs, doigts, listes de voisins et données initiales répliquées sur Node.replication_factor nœuds,
+# en O(N log N + K log N). L'anneau courant est remplacé (Node.existing_ids et
+# Node.directory sont vidés) ; renvoie l'environnement prêt et les nœuds triés.
+def bootstrap(node_ids, hosts=None, items=None, env=None):
+    env = simpy.Environment() if env is None else env
+    hosts = node_ids if hosts is None else hosts
+    Node.existing_ids.clear()
+    Node.directory.clear()
+    ring = [Node(env, identifier, host) for identifier, host in sorted(zip(node_ids, hosts))]
+
+    count = len(ring)
+    size = min(Node.neighbour_list_size, count - 1)
+    for index, node in enumerate(ring):
+        node.left = ring[index - 1]
+        node.right = ring[(index + 1) % count]
+    for index, node in enumerate(ring):
+        node.successors = [ring[(index + k) % count] for k in range(1, size + 1)]
+        node.predecessors = [ring[index - k] for k in range(1, size + 1)]
+        node.init_fingers()
+
+    for key, value in dict(items or {}).items():
+        data = Donnees(key, value)
+        for holder, role in Node.directory.owner(hash_key(key)).replica_nodes():
+            holder.data_store.put(data, role)
+    return env, ring
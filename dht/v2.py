@@ -0,0 +1,1166 @@
+import simpy
+import random
+from .storage import DataStore, PRIMARY, LEFT_REPLICA, RIGHT_REPLICA
+from .cache import LookupCache
+from .directory import RingDirectory
+from .eventlog import logger
+from .metrics import metrics
+from . import merkle
+from .chunks import CHUNK_SIZE, ChunkKey, Manifest, split, assemble
+from .keyspace import ID_BITS, ID_SPACE, NEIGHBOUR_LIST_SIZE, REPLICATION_FACTOR, hash_key, in_interval, \
+    in_open_interval, circular_distance, midpoint, replica_span, slice_end, sort_from
+
+# -------------------------------
+# Classes de base
+# -------------------------------
+
+class Data:
+    __slots__ = ("key", "content")
+
+    def __init__(self, key, content):
+        self.key = key
+        self.content = content
+
+class Message:
+    __slots__ = ("sender", "receiver", "content")
+
+    def __init__(self, sender, receiver, content):
+        self.sender = sender
+        self.receiver = receiver
+        self.content = content
+
+class Reply:
+    """ Résultat d'une requête : valeur obtenue, nœud qui l'a servie et nombre de sauts.
+
+    latency est la durée simulée de la requête ; timed_out indique que le délai imparti a
+    expiré avant la réponse (value, owner et hops valent alors None).
+    """
+
+    __slots__ = ("value", "owner", "hops", "latency", "timed_out")
+
+    def __init__(self, value, owner, hops, latency=0.0, timed_out=False):
+        self.value = value
+        self.owner = owner
+        self.hops = hops
+        self.latency = latency
+        self.timed_out = timed_out
+
+    def __repr__(self):
+        if self.timed_out:
+            return f"Reply(délai dépassé après {self.latency})"
+        return f"Reply({self.value!r}, nœud {self.owner}, {self.hops} sauts)"
+
+# -------------------------------
+# Classe Node
+# -------------------------------
+
+class Node:
+    # Compteurs globaux de trafic : sauts de routage et copies de données vers les répliques
+    hop_count = 0
+    transfer_count = 0
+    # Nombre de successeurs et de prédécesseurs connus de chaque nœud
+    neighbour_list_size = NEIGHBOUR_LIST_SIZE
+    # Nombre de copies de chaque donnée : le responsable et ses voisins, alternativement à gauche et à droite
+    replication_factor = REPLICATION_FACTOR
+    # Coût des migrations lors des arrivées et des départs : clés déplacées et lots envoyés
+    migrated_keys = 0
+    migration_messages = 0
+    # Trafic de l'anti-entropie : hachés et empreintes comparés, messages et entrées recopiées
+    repair_hashes = 0
+    repair_messages = 0
+    repair_keys = 0
+    # Cache des recherches sur les nœuds du chemin (taille 0 : désactivé), durée de vie en temps simulé
+    cache_size = 0
+    cache_ttl = None
+    cache_hits = 0
+    cache_misses = 0
+    # Répartition des lectures entre les détenteurs d'une clé selon leur charge et leur distance
+    # (False : le premier détenteur atteint sert la lecture) ; coût d'un pas vers un autre détenteur
+    read_balancing = True
+    read_distance_cost = 1
+    # Lectures simultanées d'une même clé lancées depuis un nœud : une seule recherche dans l'anneau
+    coalesce_reads = True
+    coalesced_reads = 0
+    # Taille des morceaux des grandes valeurs (put_large / get_large)
+    chunk_size = CHUNK_SIZE
+    # Réseau simulé (network.Network) : None conserve le délai de transfert fixe entre deux nœuds
+    network = None
+    # Fabrique du stockage de chaque nœud, appelée avec son identifiant (logstore.log_storage) ;
+    # None : stockage en mémoire (storage.DataStore)
+    storage = None
+    # Roue temporelle (scheduler.TimerWheel) de la maintenance périodique ; None : pas de maintenance
+    wheel = None
+    maintenance_interval = 10
+
+    def __init__(self, env, node_id, host=None, directory=None):
+        self.env = env
+        self.node_id = node_id
+        self.host = node_id if host is None else host  # Nœud physique de ce nœud virtuel
+        # Annuaire trié partagé par les nœuds de l'anneau ; le premier nœud en crée un
+        self.directory = RingDirectory() if directory is None else directory
+        self.directory.add(node_id, self)
+        self.left = self  # Voisin gauche (initialement lui-même)
+        self.right = self  # Voisin droit (initialement lui-même)
+        self.data_store = DataStore() if Node.storage is None else Node.storage(node_id)
+        # Table des doigts : fingers[i] est le successeur de (node_id + 2^i)
+        self.fingers = [self] * ID_BITS
+        # Doigts arrière : back_fingers[i] est le nœud qui précède ou occupe (node_id - 2^i)
+        self.back_fingers = [self] * ID_BITS
+        self.successors = []  # Les neighbour_list_size premiers nœuds à droite
+        self.predecessors = []  # Les neighbour_list_size premiers nœuds à gauche
+        self.cache = LookupCache(Node.cache_size, Node.cache_ttl) if Node.cache_size else None
+        self.cache_watchers = {}  # Nœuds qui gardent en cache une donnée obtenue ici : {clé: {nœuds}}
+        self.reads_served = 0  # Lectures servies par ce nœud en tant que détenteur
+        self.reads_in_flight = {}  # Lectures lancées depuis ce nœud et encore en cours : {clé: processus}
+        self.next_finger = 0  # Prochain doigt recalculé par fix_fingers
+        self.merkle_trees = {}  # Arbres de Merkle de la dernière synchronisation : {détenteur: (tampon, arbre)}
+        # Aucun processus d'attente par nœud : la maintenance est déclenchée par la roue temporelle
+        self.maintenance = None
+        if Node.wheel is not None:
+            self.maintenance = Node.wheel.every(Node.maintenance_interval, self.maintain,
+                                                random.uniform(0, Node.maintenance_interval))
+
+    def maintain(self):
+        """ Tâche périodique : stabilisation, correction d'un doigt et vérification des répliques. """
+        self.stabilize()
+        self.fix_fingers()
+        self.check_replicas()
+
+    def stabilize(self):
+        """ Vérifie que le successeur reconnaît ce nœud comme prédécesseur et rafraîchit les listes de voisins. """
+        candidate = self.right.left
+        if in_open_interval(candidate.node_id, self.node_id, self.right.node_id):
+            self.right = candidate
+        if in_open_interval(self.node_id, self.right.left.node_id, self.right.node_id):
+            self.right.left = self
+        self.refresh_neighbours()
+
+    def fix_fingers(self):
+        """ Recalcule un doigt (et le doigt arrière de même rang) à chaque passage, à tour de rôle. """
+        i = self.next_finger
+        predecessor, _ = self.find_predecessor(self.finger_start(i))
+        self.fingers[i] = predecessor.right
+        self.back_fingers[i], _ = self.find_predecessor((self.back_finger_start(i) + 1) % ID_SPACE)
+        self.next_finger = (i + 1) % ID_BITS
+
+    def check_replicas(self):
+        """ Anti-entropie avec chaque réplique des données dont ce nœud est responsable. """
+        for replica, role in self.replica_nodes()[1:]:
+            self.synchronize(replica, role)
+
+    def synchronize(self, replica, role):
+        """ Compare par arbres de Merkle les données de ce nœud et de la réplique, et ne répare que les tranches qui diffèrent.
+
+        Les clés absentes ou différentes chez la réplique lui sont renvoyées ; celles que ce nœud
+        a perdues sont reprises de la réplique. Les arbres sont gardés d'un passage à l'autre
+        (merkle.synchronize) : si aucun des deux stockages n'a changé, seules les racines sont
+        comparées. Renvoie le nombre d'entrées recopiées ; les hachés, les messages et les
+        entrées échangés sont comptés dans Node.repair_*.
+        """
+        start = self.left.node_id
+        width = (self.right.node_id - start) % ID_SPACE or ID_SPACE
+        repaired, leaves, hashes, messages = merkle.synchronize(self, replica, role, start, width, "content")
+        Node.repair_hashes += hashes
+        Node.repair_messages += messages
+        if not leaves:
+            return 0
+        Node.repair_keys += repaired
+        if metrics.enabled:
+            metrics.count(self.node_id, "repaired_keys", repaired)
+        logger.debug("repair", "{now:.2f} 🔁 Nœud {node} répare {count} entrées avec {replica} ({leaves} feuilles divergentes)",
+                     now=self.env.now, node=self.node_id, count=repaired, replica=replica.node_id, leaves=len(leaves))
+        return repaired
+
+    def store_data(self, data):
+        """ Stocke ou transfère la donnée jusqu'au bon nœud et renvoie une Reply. """
+        position = hash_key(data.key)
+        current_node = self
+        hops = 0
+        while True:
+            logger.debug("store_request", "{now:.2f} 📦 Nœud {node} reçoit la demande de stockage de la clé {key}",
+                         now=self.env.now, node=current_node.node_id, key=data.key)
+            if current_node.is_responsible_for(position):
+                break
+            next_node = current_node.next_hop(position)
+            logger.debug("store_forward", "{now:.2f} ➡️ Nœud {node} transfère la clé {key} à {next}",
+                         now=self.env.now, node=current_node.node_id, key=data.key, next=next_node.node_id)
+            if metrics.enabled:
+                metrics.count(current_node.node_id, "forwarded")
+            yield from self.transmit(current_node, next_node, data, len(str(data.content)))
+            current_node = next_node
+            hops += 1
+            Node.hop_count += 1
+
+        current_node.data_store.put(data, PRIMARY)
+        for replica, role in current_node.replica_nodes()[1:]:
+            replica.data_store.put(data, role)
+            Node.transfer_count += 1
+        current_node.invalidate_cached(data.key)
+        logger.info("store", "{now:.2f} ✅ Nœud {node} stocke la clé {key} : {content} ({hops} sauts)",
+                    now=self.env.now, node=current_node.node_id, key=data.key, content=data.content, hops=hops)
+        for replica, _ in current_node.replica_nodes()[1:]:
+            logger.debug("store_replica", "{now:.2f} ✅ Nœud {node} stocke la clé {key} : {content}",
+                         now=self.env.now, node=replica.node_id, key=data.key, content=data.content)
+        return self.observed("store_hops", "stores", Reply(data.content, current_node.node_id, hops))
+    
+    def retrieve_data(self, key):
+        """ Récupère ou transfère la demande de récupération de donnée jusqu'au bon nœud.
+
+        Avec le cache activé, un nœud du chemin qui connaît encore la réponse la renvoie
+        directement, et les nœuds traversés la gardent au retour. Renvoie une Reply dont la
+        valeur est None si la donnée est introuvable.
+        """
+        position = hash_key(key)
+        current_node = self
+        path = []
+        hops = 0
+        while True:
+            logger.debug("lookup", "{now:.2f} 🔍 Nœud {node} cherche la donnée avec la clé {key}",
+                         now=self.env.now, node=current_node.node_id, key=key)
+
+            # Si le nœud actuel détient la donnée, la lecture est servie par l'un de ses détenteurs
+            if key in current_node.data_store:
+                return (yield from self.serve_read(current_node, key, path, hops))
+
+            # Puis dans son cache
+            if current_node.cache is not None:
+                cached = current_node.cache.get(key, self.env.now)
+                if cached is not None:
+                    content, holder = cached
+                    Node.cache_hits += 1
+                    logger.info("cache_hit", "{now:.2f} ⚡ Nœud {node} a la donnée avec la clé {key} en cache : {content} ({hops} sauts)",
+                                now=self.env.now, node=current_node.node_id, key=key, content=content, hops=hops)
+                    self.cache_along(path, key, content, holder)
+                    if metrics.enabled:
+                        metrics.count(current_node.node_id, "served_from_cache")
+                        metrics.observe("read_hops", hops)
+                    return Reply(content, holder.node_id, hops)
+
+            # Le nœud responsable consulte ses répliques avant d'abandonner
+            if current_node.is_responsible_for(position):
+                return (yield from self.serve_read(current_node, key, path, hops))
+
+            # Si la donnée n'est pas ici, la transmettre au prochain nœud de la table des doigts
+            next_node = current_node.next_hop(position)
+            logger.debug("lookup_forward", "{now:.2f} ➡️ Nœud {node} transmet la demande de récupération à {next}",
+                         now=self.env.now, node=current_node.node_id, next=next_node.node_id)
+            if metrics.enabled:
+                metrics.count(current_node.node_id, "forwarded")
+            yield from self.transmit(current_node, next_node, key)
+            path.append(current_node)
+            current_node = next_node
+            hops += 1
+            Node.hop_count += 1
+
+    def serve_read(self, current_node, key, path, hops):
+        """ Fait servir la lecture arrivée sur current_node par le détenteur choisi (read_holder) et renvoie la Reply. """
+        self.count_cache_miss()
+        holder, distance = current_node.read_holder(key)
+        if holder is None:
+            logger.warning("not_found", "{now:.2f} ❌ Donnée avec la clé {key} introuvable ({hops} sauts)",
+                           now=self.env.now, key=key, hops=hops)
+            return self.observed("read_hops", "not_found", Reply(None, current_node.node_id, hops))
+        if holder is not current_node:
+            logger.debug("read_redirect", "{now:.2f} ↪️ Nœud {node} confie la lecture de la clé {key} à {holder}",
+                         now=self.env.now, node=current_node.node_id, key=key, holder=holder.node_id)
+            yield from self.transmit(current_node, holder, key)
+            hops += distance
+            Node.hop_count += distance
+        data = holder.data_store.get(key)
+        holder.reads_served += 1
+        logger.info("found", "{now:.2f} ✅ Nœud {node} a trouvé la donnée avec la clé {key}: {content} ({hops} sauts)",
+                    now=self.env.now, node=holder.node_id, key=key, content=data.content, hops=hops)
+        self.cache_along(path, key, data.content, holder)
+        return self.observed("read_hops", "served", Reply(data.content, holder.node_id, hops))
+
+    def holders(self, key):
+        """ Détenteurs de la clé parmi ce nœud et ses voisins à moins de Node.replication_factor pas.
+
+        Renvoie des couples (nœud, pas depuis ce nœud), du plus proche au plus éloigné.
+        """
+        candidates = []
+        seen = set()
+        left, right = self, self
+        for distance in range(Node.replication_factor):
+            if distance:
+                left, right = left.left, right.right
+            for node in (left, right):
+                if node not in seen and key in node.data_store:
+                    candidates.append((node, distance))
+                seen.add(node)
+        return candidates
+
+    def read_holder(self, key):
+        """ Choisit le détenteur de la clé qui servira une lecture arrivée sur ce nœud.
+
+        Chaque détenteur (holders) coûte sa charge (read_load) plus Node.read_distance_cost par
+        pas depuis ce nœud ; le moins coûteux l'emporte, le plus proche en cas d'égalité. Sans
+        Node.read_balancing, le plus proche l'emporte toujours. Renvoie (détenteur, pas), ou
+        (None, 0) si aucun voisin ne détient la clé.
+        """
+        candidates = self.holders(key)
+        if not candidates:
+            return None, 0
+        if not Node.read_balancing:
+            return candidates[0]
+        return min(candidates, key=lambda candidate: (self.read_load(candidate[0]) + Node.read_distance_cost * candidate[1],
+                                                      candidate[1]))
+
+    def read_load(self, node):
+        """ Charge d'un détenteur : messages en attente ou en service avec le réseau simulé, sinon lectures déjà servies. """
+        if Node.network is not None:
+            return Node.network.load(node)
+        return node.reads_served
+
+    # -------------------------------
+    # Grandes valeurs
+    # -------------------------------
+
+    def store_large(self, key, content):
+        """ Stocke une valeur (octets) découpée en morceaux si elle dépasse Node.chunk_size.
+
+        Le manifeste est routé jusqu'au responsable comme une donnée ordinaire ; les morceaux
+        sont ensuite envoyés en parallèle, chacun à un détenteur différent à tour de rôle, qui le
+        recopie aux autres détenteurs. Les morceaux d'une version précédente sont supprimés.
+        Renvoie la Reply du manifeste.
+        """
+        if not Node.chunk_size or len(content) <= Node.chunk_size:
+            reply = yield from self.store_data(Data(key, content))
+            holders = self.directory.nodes[reply.owner].replica_nodes()
+            current = set()
+        else:
+            manifest, chunks = split(key, content, Node.chunk_size)
+            reply = yield from self.store_data(Data(key, manifest))
+            holders = self.directory.nodes[reply.owner].replica_nodes()
+            uploads = [self.env.process(self.upload_chunk(Data(chunk_key, chunk), holders, index))
+                       for index, (chunk_key, chunk) in enumerate(chunks)]
+            yield self.env.all_of(uploads)
+            current = set(manifest.chunk_keys(key))
+            logger.info("store_large", "{now:.2f} 🧩 Nœud {node} stocke la clé {key} en {count} morceaux ({size} octets)",
+                        now=self.env.now, node=reply.owner, key=key, count=len(manifest.digests), size=manifest.size)
+        position = hash_key(key)
+        for holder, _ in holders:
+            for stored in holder.data_store.order.range(position, position):
+                if isinstance(stored, ChunkKey) and stored.anchor == key and stored not in current:
+                    holder.data_store.delete(stored)
+        return reply
+
+    def upload_chunk(self, data, holders, index):
+        """ Envoie un morceau à holders[index] (à tour de rôle), qui le recopie aux autres détenteurs. """
+        first, role = holders[index % len(holders)]
+        size = len(data.content)
+        yield from self.transmit(self, first, data.key, size)
+        first.data_store.put(data, role)
+        Node.transfer_count += 1
+        copies = [self.env.process(self.copy_chunk(first, holder, data, holder_role))
+                  for holder, holder_role in holders if holder is not first]
+        yield self.env.all_of(copies)
+
+    def copy_chunk(self, source, holder, data, role):
+        yield from self.transmit(source, holder, data.key, len(data.content))
+        holder.data_store.put(data, role)
+        Node.transfer_count += 1
+
+    def fetch_large(self, key):
+        """ Lit une valeur, en rassemblant ses morceaux si elle a été découpée.
+
+        Après la lecture du manifeste, les morceaux sont demandés en parallèle aux détenteurs
+        de la clé, à tour de rôle : chaque détenteur n'émet que sa part, si bien que le temps de
+        transfert dépend de la bande passante cumulée des liens et non de celle d'un seul.
+        Renvoie une Reply dont la valeur est le contenu reconstitué.
+        """
+        reply = yield from self.retrieve_data(key)
+        manifest = reply.value
+        if not isinstance(manifest, Manifest):
+            # Valeur entière : elle revient en un seul message depuis son détenteur
+            if isinstance(manifest, (bytes, bytearray)) and reply.owner != self.node_id:
+                yield from self.transmit(self.directory.nodes[reply.owner], self, key, len(manifest))
+            return reply
+        sources = [node for node, _ in self.directory.nodes[reply.owner].holders(key)]
+        chunk_keys = manifest.chunk_keys(key)
+        chunks = {}
+        stripes = {}
+        for index, chunk_key in enumerate(chunk_keys):
+            stripes.setdefault(sources[index % len(sources)], []).append(chunk_key)
+        fetches = [self.env.process(self.fetch_chunks(source, stripe, sources, chunks))
+                   for source, stripe in stripes.items()]
+        yield self.env.all_of(fetches)
+        if len(chunks) < len(chunk_keys):
+            logger.warning("not_found", "{now:.2f} ❌ Morceaux manquants pour la clé {key} ({count}/{total})",
+                           now=self.env.now, key=key, count=len(chunks), total=len(chunk_keys))
+            return Reply(None, reply.owner, reply.hops + 1)
+        content = assemble(manifest, chunks)
+        logger.info("fetch_large", "{now:.2f} 🧩 Nœud {node} a rassemblé la clé {key} depuis {sources} détenteurs ({size} octets)",
+                    now=self.env.now, node=self.node_id, key=key, sources=len(stripes), size=len(content))
+        return Reply(content, reply.owner, reply.hops + 1)
+
+    def fetch_chunks(self, source, chunk_keys, sources, chunks):
+        """ Demande une part des morceaux à source, qui les émet à la suite ; ceux qu'il n'a pas sont demandés aux autres détenteurs. """
+        yield from self.transmit(self, source, chunk_keys, 0)
+        sends = []
+        for chunk_key in chunk_keys:
+            if chunk_key in source.data_store:
+                sends.append(self.env.process(self.send_chunk(source, chunk_key, chunks)))
+                continue
+            holder = next((node for node in sources if chunk_key in node.data_store), None)
+            if holder is not None:
+                sends.append(self.env.process(self.send_chunk(holder, chunk_key, chunks, request=True)))
+        yield self.env.all_of(sends)
+
+    def send_chunk(self, holder, chunk_key, chunks, request=False):
+        if request:
+            yield from self.transmit(self, holder, chunk_key, 0)
+        chunk = holder.data_store.get(chunk_key).content
+        yield from self.transmit(holder, self, chunk_key, len(chunk))
+        Node.transfer_count += 1
+        chunks[chunk_key.digest] = chunk
+
+    def put_large(self, key, content, timeout=None):
+        """ Lance store_large et renvoie aussitôt un événement SimPy résolu par sa Reply. """
+        return self.request(self.store_large(key, content), timeout)
+
+    def get_large(self, key, timeout=None):
+        """ Lance fetch_large et renvoie aussitôt un événement SimPy résolu par sa Reply. """
+        return self.request(self.fetch_large(key), timeout)
+
+    # -------------------------------
+    # Requêtes asynchrones
+    # -------------------------------
+
+    def get(self, key, timeout=None):
+        """ Lance la lecture de la clé et renvoie aussitôt un événement SimPy résolu par sa Reply.
+
+        Avec Node.coalesce_reads, une lecture de la même clé déjà en cours depuis ce nœud est
+        partagée : les demandes simultanées ne font qu'une recherche dans l'anneau.
+        """
+        if not Node.coalesce_reads:
+            return self.request(self.retrieve_data(key), timeout)
+        read = self.reads_in_flight.get(key)
+        if read is None:
+            read = self.reads_in_flight[key] = self.env.process(self.shared_read(key))
+        else:
+            Node.coalesced_reads += 1
+            if metrics.enabled:
+                metrics.count(self.node_id, "coalesced")
+        return self.env.process(self.await_reply(read, timeout))
+
+    def shared_read(self, key):
+        """ Lecture partagée par les demandes simultanées de la clé (voir get). """
+        try:
+            return (yield from self.retrieve_data(key))
+        finally:
+            del self.reads_in_flight[key]
+
+    def put(self, data, timeout=None):
+        """ Lance le stockage de la donnée et renvoie aussitôt un événement SimPy résolu par sa Reply. """
+        return self.request(self.store_data(data), timeout)
+
+    def send(self, receiver, content, timeout=None):
+        """ Envoie content au nœud d'identifiant receiver ; l'événement renvoyé est résolu par sa Reply. """
+        message = Message(sender=self.node_id, receiver=receiver, content=content)
+        return self.request(self.transfer_message(self, message), timeout)
+
+    def get_range(self, start, end, limit=None, stream=None, timeout=None):
+        """ Lance la lecture de la plage [start, end] (range_query) ; l'événement renvoyé est résolu par sa Reply. """
+        return self.request(self.range_query(start, end, limit, stream), timeout)
+
+    def request(self, operation, timeout=None):
+        """ Exécute le générateur operation à côté des autres requêtes en vol.
+
+        L'événement renvoyé est résolu par la Reply de l'opération, complétée de sa latence ;
+        si timeout expire avant, il est résolu par une Reply timed_out et la réponse tardive
+        est ignorée.
+        """
+        return self.env.process(self.await_reply(self.env.process(operation), timeout))
+
+    def await_reply(self, process, timeout):
+        """ Attend la réponse de process, au plus timeout unités de temps. """
+        start = self.env.now
+        if timeout is None:
+            reply = yield process
+        else:
+            yield process | self.env.timeout(timeout)
+            if not process.triggered:
+                logger.debug("timeout", "{now:.2f} ⏱️ Nœud {node} abandonne une requête après {timeout}",
+                             now=self.env.now, node=self.node_id, timeout=timeout)
+                if metrics.enabled:
+                    metrics.count(self.node_id, "timeouts")
+                return Reply(None, None, None, self.env.now - start, timed_out=True)
+            reply = process.value
+        # Chaque demandeur reçoit sa propre Reply : une lecture partagée sert plusieurs demandes
+        reply = Reply(reply.value, reply.owner, reply.hops, self.env.now - start)
+        if metrics.enabled:
+            metrics.observe("latency", reply.latency)
+        return reply
+
+    def get_all(self, keys, window=None, timeout=None):
+        """ Lit les clés en parallèle, avec au plus window requêtes en vol (None : sans limite).
+
+        L'événement renvoyé est résolu par {clé: Reply}.
+        """
+        return self.env.process(self.pipeline(keys, window, timeout))
+
+    def pipeline(self, keys, window, timeout):
+        slots = simpy.Resource(self.env, capacity=window) if window else None
+
+        def fetch(key):
+            if slots is None:
+                return (yield self.get(key, timeout))
+            with slots.request() as slot:
+                yield slot
+                return (yield self.get(key, timeout))
+
+        requests = {key: self.env.process(fetch(key)) for key in keys}
+        yield self.env.all_of(requests.values())
+        return {key: request.value for key, request in requests.items()}
+
+    def transmit(self, sender, receiver, message, size=0):
+        """ Fait passer un message de sender à receiver (à utiliser avec yield from).
+
+        Sans réseau simulé, le transfert prend un délai aléatoire fixe ; avec Node.network, le
+        message subit la latence du lien puis la file d'attente et le service du destinataire.
+        """
+        if Node.network is None:
+            yield self.env.timeout(random.uniform(1, 2))  # Simule le délai de transfert
+        else:
+            yield from Node.network.transmit(sender, receiver, message, size)
+
+    def observed(self, histogram, counter, reply):
+        """ Relève les sauts de la réponse et le nœud qui l'a servie si les métriques sont actives, puis la renvoie. """
+        if metrics.enabled:
+            metrics.observe(histogram, reply.hops)
+            if reply.owner is not None:
+                metrics.count(reply.owner, counter)
+        return reply
+
+    def count_cache_miss(self):
+        """ Compte une recherche qui a dû aller jusqu'à un détenteur de la donnée. """
+        if self.cache is not None:
+            Node.cache_misses += 1
+
+    def cache_along(self, path, key, content, holder):
+        """ Les nœuds du chemin de retour gardent la réponse et s'inscrivent auprès du détenteur. """
+        for node in path:
+            if node.cache is None:
+                continue
+            evicted = node.cache.put(key, content, holder, self.env.now)
+            holder.cache_watchers.setdefault(key, set()).add(node)
+            if evicted is not None:
+                evicted_key, evicted_holder = evicted
+                evicted_holder.cache_watchers.get(evicted_key, set()).discard(node)
+
+    def invalidate_cached(self, key):
+        """ La donnée a changé : les caches qui la tiennent de ce nœud ou de ses répliques l'oublient. """
+        self.invalidate_cached_keys((key,))
+
+    def invalidate_cached_keys(self, keys):
+        """ invalidate_cached pour un lot de clés, en un seul calcul des détenteurs. """
+        for holder, _ in self.replica_nodes():
+            if not holder.cache_watchers:
+                continue
+            for key in keys:
+                for node in holder.cache_watchers.pop(key, ()):
+                    if node.cache is not None:
+                        node.cache.invalidate(key)
+
+    def invalidate_all_cached(self):
+        """ Les données de ce nœud changent de détenteur : toutes les réponses suivies sont oubliées. """
+        for key, watchers in self.cache_watchers.items():
+            for node in watchers:
+                if node.cache is not None:
+                    node.cache.invalidate(key)
+        self.cache_watchers = {}
+
+    def put_many(self, datas):
+        """ Stocke un lot de données en une seule tournée de l'anneau, chaque responsable recevant sa tranche de clés. """
+        batch = {data.key: data for data in datas}
+        offsets, keys = sort_from(self.node_id, batch)
+        results = {}
+        current_node = self
+        hops = 0
+        # Taille des données restant à livrer, diminuée de chaque tranche stockée : le lot
+        # transmis à chaque saut n'est ni recopié ni mesuré de nouveau
+        sizes = {key: len(str(data.content)) for key, data in batch.items()}
+        remaining = sum(sizes.values())
+        index = 0
+        while index < len(keys):
+            # Avancer jusqu'au responsable de la prochaine clé du lot
+            position = (self.node_id + offsets[index]) % ID_SPACE
+            while not current_node.is_responsible_for(position):
+                next_node = current_node.next_hop(position)
+                logger.debug("store_batch_forward", "{now:.2f} ➡️ Nœud {node} transfère le lot à {next}",
+                             now=self.env.now, node=current_node.node_id, next=next_node.node_id)
+                yield from self.transmit(current_node, next_node, keys, remaining)
+                current_node = next_node
+                hops += 1
+                Node.hop_count += 1
+
+            # Le responsable garde sa tranche contiguë et la réplique chez ses voisins en une visite
+            end = slice_end(offsets, index, self.node_id, current_node.node_id, current_node.right.node_id)
+            stored = keys[index:end]
+            index = end
+            entries = {key: batch[key] for key in stored}
+            remaining -= sum(map(sizes.__getitem__, stored))
+            holders = current_node.replica_nodes()
+            for holder, role in holders:
+                holder.data_store.put_all(entries, role)
+            Node.transfer_count += len(entries) * (len(holders) - 1)
+            current_node.invalidate_cached_keys(stored)
+            results.update(dict.fromkeys(stored, (current_node, hops)))
+            logger.info("store_batch", "{now:.2f} ✅ Nœud {node} stocke {count} clés {keys} "
+                        "(répliques sur {replicas}, {hops} sauts)",
+                        now=self.env.now, node=current_node.node_id, count=len(stored), keys=stored,
+                        replicas=[replica.node_id for replica, _ in holders[1:]], hops=hops)
+        return results
+
+    def get_many(self, keys):
+        """ Récupère un lot de clés en une seule tournée et renvoie {clé: (trouvée, contenu, sauts)}. """
+        offsets, keys = sort_from(self.node_id, dict.fromkeys(keys))
+        results = {}
+        current_node = self
+        hops = 0
+        index = 0
+        while index < len(keys):
+            position = (self.node_id + offsets[index]) % ID_SPACE
+            while not current_node.is_responsible_for(position):
+                next_node = current_node.next_hop(position)
+                logger.debug("get_batch_forward", "{now:.2f} ➡️ Nœud {node} transmet le lot de requêtes à {next}",
+                             now=self.env.now, node=current_node.node_id, next=next_node.node_id)
+                yield from self.transmit(current_node, next_node, keys)
+                current_node = next_node
+                hops += 1
+                Node.hop_count += 1
+
+            found = 0
+            end = slice_end(offsets, index, self.node_id, current_node.node_id, current_node.right.node_id)
+            stores = [holder.data_store for holder, _ in current_node.replica_nodes()]
+            for key in keys[index:end]:
+                results[key] = (False, None, hops)
+                for store in stores:
+                    data = store.get(key)
+                    if data is not None:
+                        results[key] = (True, data.content, hops)
+                        found += 1
+                        break
+            logger.info("get_batch", "{now:.2f} 🔍 Nœud {node} a trouvé {found}/{count} clés du lot ({hops} sauts)",
+                        now=self.env.now, node=current_node.node_id, found=found, count=end - index, hops=hops)
+            index = end
+        return results
+
+    def range_query(self, start, end, limit=None, stream=None):
+        """ Lit toutes les données dont la position est dans l'intervalle circulaire [start, end].
+
+        La requête est routée une seule fois jusqu'au responsable de start, puis parcourt les
+        voisins droits tant que leur arc recoupe l'intervalle : chaque nœud renvoie au demandeur
+        la tranche de son stockage, dans l'ordre de l'anneau, sans les clés déjà reçues d'un
+        détenteur précédent. Le parcours s'arrête dès que limit données ont été reçues. Si stream
+        (un simpy.Store) est fourni, les couples (clé, contenu) y sont déposés au fil des tranches.
+        Renvoie une Reply dont la valeur est la liste des couples (clé, contenu).
+        """
+        current_node = self
+        hops = 0
+        while not current_node.is_responsible_for(start):
+            next_node = current_node.next_hop(start)
+            if metrics.enabled:
+                metrics.count(current_node.node_id, "forwarded")
+            yield from self.transmit(current_node, next_node, (start, end))
+            current_node = next_node
+            hops += 1
+            Node.hop_count += 1
+
+        owner = current_node
+        results = []
+        seen = set()
+        span = (end - start) % ID_SPACE
+        wrapped = False  # Revenu au responsable de start : la fin de l'intervalle est dans son arc
+        while True:
+            # La tranche du nœud s'arrête à la fin de son arc ou à la fin de l'intervalle
+            last = end
+            if not wrapped and current_node.right != current_node:
+                arc_end = midpoint(current_node.node_id, current_node.right.node_id)
+                if (arc_end - start) % ID_SPACE < span:
+                    last = arc_end
+            # Les morceaux des grandes valeurs restent derrière leur manifeste
+            batch = [(data.key, data.content) for data in current_node.data_store.range(start, last)
+                     if data.key not in seen and not isinstance(data.key, ChunkKey)]
+            if limit is not None:
+                batch = batch[:limit - len(results)]
+            if batch:
+                seen.update(key for key, _ in batch)
+                results.extend(batch)
+                Node.transfer_count += 1
+                logger.debug("range_batch", "{now:.2f} 📚 Nœud {node} renvoie {count} données de la plage",
+                             now=self.env.now, node=current_node.node_id, count=len(batch))
+                if stream is not None:
+                    for item in batch:
+                        yield stream.put(item)
+            if last == end or (limit is not None and len(results) >= limit):
+                break
+            yield from self.transmit(current_node, current_node.right, (start, end))
+            current_node = current_node.right
+            wrapped = current_node == owner
+            hops += 1
+            Node.hop_count += 1
+
+        logger.info("range", "{now:.2f} 📚 Nœud {node} a lu {count} données entre {start} et {end} ({hops} sauts)",
+                    now=self.env.now, node=self.node_id, count=len(results), start=start, end=end, hops=hops)
+        return self.observed("range_hops", "range_queries", Reply(results, owner.node_id, hops))
+
+    def is_responsible_for(self, position):
+        """ Détermine si ce nœud est responsable de la position (clé hachée) en prenant en compte la distance circulaire absolue. """
+        if self.right == self:
+            return True
+        dist_self = circular_distance(position, self.node_id)
+        if position == self.node_id or in_interval(position, self.node_id, self.right.node_id):
+            # La position est entre ce nœud et son voisin droit : on départage par la distance
+            return dist_self <= circular_distance(position, self.right.node_id) and position != self.right.node_id
+        if in_interval(position, self.left.node_id, self.node_id):
+            # La position est entre le voisin gauche et ce nœud : en cas d'égalité, le voisin gauche l'emporte
+            return dist_self < circular_distance(position, self.left.node_id)
+        return False
+
+    def finger_start(self, i):
+        return (self.node_id + 2 ** i) % ID_SPACE
+
+    def find_predecessor(self, key):
+        """ Renvoie le nœud n tel que key ∈ ]n, n.right] ainsi que le nombre de sauts. """
+        current_node = self
+        hops = 0
+        while not in_interval(key, current_node.node_id, current_node.right.node_id):
+            next_node = current_node.closest_preceding_finger(key)
+            if next_node is current_node:
+                next_node = current_node.right
+            current_node = next_node
+            hops += 1
+            Node.hop_count += 1
+        return current_node, hops
+
+    def closest_preceding_finger(self, target, inclusive=False):
+        """ Plus grand doigt qui ne dépasse pas la cible. """
+        for finger in reversed(self.fingers):
+            if finger is not self and in_interval(finger.node_id, self.node_id, target) and \
+                    (inclusive or finger.node_id != target):
+                return finger
+        return self
+
+    def back_finger_start(self, i):
+        return (self.node_id - 2 ** i) % ID_SPACE
+
+    def closer_node(self, position):
+        """ Nœud connu le plus avancé vers la position par l'arc le plus court, sans la dépasser.
+
+        Vers la droite, on considère les doigts et les successeurs ; vers la gauche, les doigts
+        arrière et les prédécesseurs. Renvoie None si aucun nœud connu ne se trouve entre ce
+        nœud et la position.
+        """
+        forward = (position - self.node_id) % ID_SPACE
+        backward = (self.node_id - position) % ID_SPACE
+        if forward <= backward:
+            tables, sign, limit = (self.fingers, self.successors), 1, forward
+        else:
+            tables, sign, limit = (self.back_fingers, self.predecessors), -1, backward
+        best = None
+        best_progress = 0
+        for table in tables:
+            # Tables ordonnées par distance croissante : le premier candidat valide depuis la fin est le meilleur
+            for node in reversed(table):
+                progress = sign * (node.node_id - self.node_id) % ID_SPACE
+                if 0 < progress <= limit:
+                    if progress > best_progress:
+                        best, best_progress = node, progress
+                    break
+        return best
+
+    def next_hop(self, position):
+        """ Prochain nœud vers le responsable de la position, par l'arc le plus court. """
+        next_node = self.closer_node(position)
+        if next_node is not None:
+            return next_node
+        # Aucun nœud connu avant la position : elle tombe entre ce nœud et son voisin de ce côté
+        if (position - self.node_id) % ID_SPACE <= (self.node_id - position) % ID_SPACE:
+            return self.right
+        return self.left
+
+    def lookup(self, position):
+        """ Renvoie le nœud responsable de la position et le nombre de sauts pour l'atteindre. """
+        current_node = self
+        hops = 0
+        while not current_node.is_responsible_for(position):
+            current_node = current_node.next_hop(position)
+            hops += 1
+            Node.hop_count += 1
+        return current_node, hops
+
+    def init_fingers(self):
+        """ Construit les tables des doigts du nouveau nœud (voisin immédiat ou dichotomie dans l'annuaire). """
+        # 2^i <= écart avec le voisin tant que i < écart.bit_length()
+        near_right = min(ID_BITS, ((self.right.node_id - self.node_id) % ID_SPACE).bit_length())
+        near_left = min(ID_BITS, ((self.node_id - self.left.node_id) % ID_SPACE).bit_length())
+        self.fingers = [self.right] * near_right + \
+            [self.directory.successor(self.node_id + 2 ** i) for i in range(near_right, ID_BITS)]
+        self.back_fingers = [self.left] * near_left + \
+            [self.directory.floor(self.node_id - 2 ** i) for i in range(near_left, ID_BITS)]
+
+    def update_others(self):
+        """ Met à jour les doigts des nœuds qui doivent désormais pointer vers ce nœud. """
+        gap_right = (self.right.node_id - self.node_id) % ID_SPACE
+        gap_left = (self.node_id - self.left.node_id) % ID_SPACE
+        for i in range(ID_BITS):
+            step = 2 ** i
+            current_node = self.left if step <= gap_left else self.directory.predecessor(self.node_id - step + 1)
+            while current_node is not self:
+                start = (current_node.node_id + step) % ID_SPACE
+                finger = current_node.fingers[i]
+                if (self.node_id - start) % ID_SPACE >= (finger.node_id - start) % ID_SPACE:
+                    break
+                current_node.fingers[i] = self
+                current_node = current_node.left
+            # Symétriquement, les nœuds situés juste après node_id + 2^i
+            current_node = self.right if step <= gap_right else self.directory.successor(self.node_id + step)
+            while current_node is not self:
+                start = (current_node.node_id - step) % ID_SPACE
+                finger = current_node.back_fingers[i]
+                if (start - self.node_id) % ID_SPACE >= (start - finger.node_id) % ID_SPACE:
+                    break
+                current_node.back_fingers[i] = self
+                current_node = current_node.right
+
+    def remove_from_fingers(self):
+        """ Remplace ce nœud par son successeur (son prédécesseur pour les doigts arrière) dans les doigts qui pointent vers lui. """
+        gap_right = (self.right.node_id - self.node_id) % ID_SPACE
+        gap_left = (self.node_id - self.left.node_id) % ID_SPACE
+        for i in range(ID_BITS):
+            step = 2 ** i
+            current_node = self.left if step <= gap_left else self.directory.predecessor(self.node_id - step + 1)
+            while current_node.fingers[i] is self:
+                current_node.fingers[i] = self.right
+                current_node = current_node.left
+            current_node = self.right if step <= gap_right else self.directory.successor(self.node_id + step)
+            while current_node.back_fingers[i] is self:
+                current_node.back_fingers[i] = self.left
+                current_node = current_node.right
+
+    def refresh_neighbours(self):
+        """ Reconstruit les listes de successeurs et de prédécesseurs à partir des pointeurs. """
+        self.successors = []
+        current_node = self.right
+        while current_node is not self and len(self.successors) < Node.neighbour_list_size:
+            self.successors.append(current_node)
+            current_node = current_node.right
+        self.predecessors = []
+        current_node = self.left
+        while current_node is not self and len(self.predecessors) < Node.neighbour_list_size:
+            self.predecessors.append(current_node)
+            current_node = current_node.left
+
+    def refresh_neighbourhood(self):
+        """ Met à jour les listes des nœuds voisins après une arrivée ou un départ à côté de ce nœud. """
+        affected = {self}
+        left, right = self, self
+        for _ in range(Node.neighbour_list_size + 1):
+            left, right = left.left, right.right
+            affected.update((left, right))
+        for node in affected:
+            node.refresh_neighbours()
+
+    def replica_nodes(self):
+        """ Détenteurs des données dont ce nœud est responsable, avec leur rôle.
+
+        Le nœud lui-même vient en premier, puis ses voisins du plus proche au plus éloigné,
+        alternativement à gauche et à droite, jusqu'à Node.replication_factor nœuds distincts.
+        """
+        left_count, right_count = replica_span(Node.replication_factor)
+        holders = [(self, PRIMARY)]
+        seen = {self}
+        left, right = self, self
+        for distance in range(1, max(left_count, right_count) + 1):
+            if distance <= left_count:
+                left = left.left
+                if left not in seen:
+                    holders.append((left, LEFT_REPLICA))
+                    seen.add(left)
+            if distance <= right_count:
+                right = right.right
+                if right not in seen:
+                    holders.append((right, RIGHT_REPLICA))
+                    seen.add(right)
+        return holders
+
+    def ring_window(self, reach):
+        """ Nœuds situés à au plus reach pas de ce nœud, de chaque côté. """
+        window = {self}
+        left, right = self, self
+        for _ in range(reach):
+            left, right = left.left, right.right
+            window.update((left, right))
+        return window
+
+    def rebalance(self, departed=None):
+        """ Déplace les clés dont les détenteurs changent après l'arrivée de ce nœud ou le départ de departed.
+
+        Seuls les responsables proches du changement (ce nœud, ou le voisin gauche de departed)
+        voient changer leur ensemble de répliques : chacune de leurs clés est recopiée chez ses
+        nouveaux détenteurs, en un lot par couple (source, destination), puis retirée des anciens.
+        Renvoie le nombre de clés copiées.
+        """
+        reach = Node.replication_factor + 1
+        owners = self.ring_window(reach)
+        sources = list(self.ring_window(2 * reach))
+        if departed is not None:
+            sources.append(departed)
+        holders = {}
+        for node in sources:
+            for data in node.data_store:
+                holders.setdefault(data.key, []).append(node)
+
+        batches = {}
+        for key, nodes in holders.items():
+            owner = self.directory.owner(hash_key(key))
+            if owner not in owners:
+                continue
+            # L'ancien responsable envoie la donnée s'il la détient encore, sinon une de ses répliques
+            source = next((node for node in nodes if node.data_store.role(key) == PRIMARY), nodes[0])
+            data = source.data_store.get(key)
+            targets = dict(owner.replica_nodes())
+            for node in nodes:
+                if node not in targets and node is not departed:
+                    node.release(key)
+            for node, role in targets.items():
+                current = node.data_store.role(key)
+                if current is None:
+                    batches.setdefault((source, node), []).append((data, role))
+                elif current != role:
+                    node.data_store.delete(key)
+                    node.data_store.put(data, role)
+
+        moved = 0
+        for (source, node), entries in batches.items():
+            node.receive_batch(source, entries)
+            moved += len(entries)
+        return moved
+
+    def release(self, key):
+        """ Ce nœud ne détient plus la clé : les caches qui la tenaient de lui l'oublient. """
+        self.data_store.delete(key)
+        for node in self.cache_watchers.pop(key, ()):
+            if node.cache is not None:
+                node.cache.invalidate(key)
+
+    def receive_batch(self, source, entries):
+        """ Reçoit en un seul message un lot de couples (donnée, rôle) migrés depuis source. """
+        for data, role in entries:
+            self.data_store.put(data, role)
+        Node.migrated_keys += len(entries)
+        Node.migration_messages += 1
+        logger.debug("migrate", "{now:.2f} 📦 Nœud {node} reçoit {count} clés de {source}",
+                     now=self.env.now, node=self.node_id, count=len(entries), source=source.node_id)
+
+    def receive_message(self, message):
+        """ Traite la réception d'un message et le transmet si nécessaire. """
+        logger.debug("receive", "{now:.2f} 📩 Nœud {node} reçoit le message de {sender} : {content}",
+                     now=self.env.now, node=self.node_id, sender=message.sender, content=message.content)
+
+        # Si le message est destiné à ce nœud, on l'affiche, sinon on le transmet.
+        if self.node_id == message.receiver:
+            logger.info("deliver", "{now:.2f} ✅ Nœud {node} a reçu le message.",
+                        now=self.env.now, node=self.node_id)
+        else:
+            # Le message n'est pas pour ce nœud, donc le transmettre.
+            next_node = self.closer_node(message.receiver)
+            if next_node is None:
+                logger.warning("not_found", "{now:.2f} ❌ Destinataire {receiver} introuvable dans l'anneau",
+                               now=self.env.now, receiver=message.receiver)
+                return
+            logger.debug("forward", "{now:.2f} ➡️ Nœud {node} transmet le message à {next}",
+                         now=self.env.now, node=self.node_id, next=next_node.node_id)
+            yield from self.transmit(self, next_node, message, len(str(message.content)))
+            yield from next_node.receive_message(message)  # Transfert du message au prochain nœud
+
+    def send_message(self, sender, receiver, content):
+        """ Envoie un message à un autre nœud du réseau, et chaque nœud le transmet. """
+        logger.info("send", "{now:.2f} ➡️ Nœud {node} veut envoyer un message à {receiver} : {content}",
+                    now=self.env.now, node=sender.node_id, receiver=receiver.node_id, content=content)
+        message = Message(sender=sender.node_id, receiver=receiver.node_id, content=content)
+        # Commencer à transférer le message à partir du nœud sender
+        return self.env.process(self.transfer_message(sender, message))
+
+    def transfer_message(self, sender, message):
+        """ Transfert le message à travers les nœuds de l'anneau et renvoie une Reply. """
+        current_node = sender
+        hops = 0
+        while current_node.node_id != message.receiver:
+            next_node = current_node.closer_node(message.receiver)
+            if next_node is None:
+                logger.warning("not_found", "{now:.2f} ❌ Destinataire {receiver} introuvable dans l'anneau",
+                               now=self.env.now, receiver=message.receiver)
+                return self.observed("message_hops", "undelivered", Reply(None, None, hops))
+            logger.debug("forward", "{now:.2f} ➡️ Nœud {node} transmet le message à {next}",
+                         now=self.env.now, node=current_node.node_id, next=next_node.node_id)
+            if metrics.enabled:
+                metrics.count(current_node.node_id, "forwarded")
+            yield from self.transmit(current_node, next_node, message, len(str(message.content)))
+            current_node = next_node  # Transfert au nœud connu le plus proche du destinataire, d'un côté ou de l'autre
+            hops += 1
+            Node.hop_count += 1
+        # Lorsque le message atteint le destinataire, le récepteur prend en charge.
+        yield from current_node.receive_message(message)
+        # Ajouter un message final lorsque le récepteur reçoit le message
+        logger.info("deliver", "{now:.2f} ✅ Nœud {node} a reçu le message de {sender} : {content} ({hops} sauts)",
+                    now=self.env.now, node=current_node.node_id, sender=message.sender, content=message.content, hops=hops)
+        return self.observed("message_hops", "delivered", Reply(message.content, current_node.node_id, hops))
+
+    def receive_join_request(self, message, host=None):
+        """ Traite la demande d'ajout d'un nœud : son prédécesseur est trouvé par dichotomie dans l'annuaire. """
+        logger.debug("join_receive", "{now:.2f} 📩 Nœud {node} reçoit une demande d'ajout de {sender}",
+                     now=self.env.now, node=self.node_id, sender=message.sender)
+
+        if message.sender in self.directory:
+            logger.warning("join_duplicate", "{now:.2f} ❌ Nœud {node} déjà présent dans l'anneau, demande ignorée",
+                           now=self.env.now, node=message.sender)
+            return None
+        predecessor = self.directory.predecessor(message.sender)
+        if predecessor is not self:
+            logger.debug("join_forward", "{now:.2f} ➡️ Nœud {node} transmet la requête à {next}",
+                         now=self.env.now, node=self.node_id, next=predecessor.node_id)
+        return predecessor.insert_new_node(message.sender, host)
+
+    def insert_new_node(self, new_node_id, host=None):
+        """ Insère le nouveau nœud dans l'anneau, juste après ce nœud, et le renvoie. """
+        new_node = Node(self.env, new_node_id, host, self.directory)
+        new_node.left = self
+        new_node.right = self.right
+        self.right.left = new_node
+        self.right = new_node
+        new_node.init_fingers()
+        new_node.update_others()
+        new_node.refresh_neighbourhood()
+        # Les voisins cèdent une partie de leurs clés : leurs réponses en cache ne sont plus suivies
+        self.invalidate_all_cached()
+        new_node.right.invalidate_all_cached()
+        new_node.rebalance()
+        logger.info("insert", "{now:.2f} ✅ Nœud {node} inséré entre {left} et {right}",
+                    now=self.env.now, node=new_node.node_id, left=self.node_id, right=new_node.right.node_id)
+        return new_node
+
+    def remove_node(self, node_to_remove):
+        """ Permet de retirer un nœud de l'anneau. """
+        yield self.env.timeout(random.uniform(1, 2))  # Délai aléatoire pour simuler l'attente de traitement
+
+        logger.info("remove_request", "{now:.2f} ❌ Nœud {node} retire le nœud {target}",
+                    now=self.env.now, node=self.node_id, target=node_to_remove.node_id)
+
+        # Si le nœud à retirer est celui-ci, on le supprime en ajustant les voisins
+        if self == node_to_remove:
+            if self.maintenance is not None:
+                self.maintenance.cancel()
+            self.invalidate_all_cached()  # Les réponses obtenues ici changent de détenteur
+            self.remove_from_fingers()
+            self.directory.remove(self.node_id)
+            self.left.right = self.right
+            self.right.left = self.left
+            self.left.refresh_neighbourhood()
+            # Les clés dont les détenteurs changent partent de ce nœud ou de leurs copies restantes
+            self.left.rebalance(self)
+            self.data_store.close()
+            logger.info("remove", "{now:.2f} ✅ Nœud {node} supprimé de l'anneau.",
+                        now=self.env.now, node=self.node_id)
+        else:
+            # Si ce n'est pas le nœud actuel, on transmet la demande par l'arc le plus court
+            next_node = self.closer_node(node_to_remove.node_id)
+            if next_node is None:
+                logger.warning("not_found", "{now:.2f} ❌ Nœud {target} introuvable dans l'anneau",
+                               now=self.env.now, target=node_to_remove.node_id)
+                return
+            logger.debug("remove_forward", "{now:.2f} ➡️ Nœud {node} transmet la demande de suppression à {next}",
+                         now=self.env.now, node=self.node_id, next=next_node.node_id)
+            yield from next_node.remove_node(node_to_remove)  # Appel récursif avec `yield from`
+
+    def display_ring(self):
+        """ Affiche l'anneau DHT avec les données stockées sous chaque nœud """
+        # matplotlib et numpy ne sont chargés qu'au premier affichage
+        import matplotlib.pyplot as plt
+        import numpy as np
+
+        nodes = []
+        current = self
+        while True:
+            nodes.append(current)
+            current = current.right
+            if current == self:
+                break
+
+        n = len(nodes)
+        angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+        radius = 1
+
+        fig, ax = plt.subplots(figsize=(8, 8))
+        ax.set_aspect('equal')
+        ax.set_xlim(-1.5, 1.5)
+        ax.set_ylim(-1.5, 1.5)
+        ax.set_axis_off()
+
+        for i, node in enumerate(nodes):
+            x = radius * np.cos(angles[i])
+            y = radius * np.sin(angles[i])
+            
+            # Dessiner le noeud
+            ax.plot(x, y, 'o', markersize=15, color="lightblue", markeredgecolor='black')
+
+            # Afficher l'ID du nœud
+            ax.text(x, y, f"{node.host}", fontsize=12, ha='center', va='center', fontweight='bold')
+
+            # Afficher les données stockées sous chaque nœud
+            if node.data_store:
+                data_text = "\n".join([str(data.key) for data in node.data_store])
+
+                # Ajuster la position pour éviter le chevauchement
+                offset_x, offset_y = 0.1 * np.cos(angles[i]), 0.1 * np.sin(angles[i])
+                
+                # Ajouter un rectangle blanc derrière le texte
+                ax.text(
+                    x + offset_x, y + offset_y - 0.2, data_text,
+                    fontsize=10, ha='center', va='top', color='black',
+                    bbox=dict(facecolor='white', edgecolor='black', boxstyle='round,pad=0.3')
+                )
+
+        # Dessiner l'anneau
+        circle = plt.Circle((0, 0), radius, color='b', fill=False, linewidth=2)
+        ax.add_artist(circle)
+        
+        plt.title("Structure de l'anneau DHT avec données", fontsize=14, fontweight='bold')
+        plt.show()
+
+# -------------------------------
+# Amorçage d'un anneau stable
+# -------------------------------
+
+def bootstrap(node_ids, hosts=None, items=None, env=None):
+    """ Construit directement un anneau stable à partir d'identifiants, sans rejouer les demandes d'ajout.
+
+    Les pointeurs, les doigts, les listes de voisins et les données initiales (couples clé,
+    contenu) répliquées sur Node.replication_factor nœuds sont posés en O(N log N + K log N). Renvoie
+    l'environnement, prêt pour la phase mesurée, et les nœuds triés par identifiant.
+    """
+    env = simpy.Environment() if env is None else env
+    hosts = node_ids if hosts is None else hosts
+    ring = []
+    directory = None
+    for node_id, host in sorted(zip(node_ids, hosts)):
+        ring.append(Node(env, node_id, host, directory))
+        directory = ring[0].directory
+
+    count = len(ring)
+    size = min(Node.neighbour_list_size, count - 1)
+    for index, node in enumerate(ring):
+        node.left = ring[index - 1]
+        node.right = ring[(index + 1) % count]
+    for index, node in enumerate(ring):
+        node.successors = [ring[(index + k) % count] for k in range(1, size + 1)]
+        node.predecessors = [ring[index - k] for k in range(1, size + 1)]
+        node.init_fingers()
+
+    for key, content in dict(items or {}).items():
+        data = Data(key, content)
+        for holder, role in directory.owner(hash_key(key)).replica_nodes():
+            holder.data_store.put(data, role)
+    return env, ring
@@ -0,0 +1,21 @@
+import random
+
+import pytest
+
+from dht import v1, v2
+from dht.eventlog import logger, OFF
+
+
+@pytest.fixture(autouse=True)
+def isolated():
+    """ Chaque test part d'un journal muet, d'une graine fixe et retrouve ensuite les réglages de classe des nœuds. """
+    saved = {node_class: dict(vars(node_class)) for node_class in (v1.Node, v2.Node)}
+    level = logger.level
+    logger.configure(level=OFF)
+    random.seed(0)
+    yield
+    logger.configure(level=level)
+    for node_class, attributes in saved.items():
+        for name, value in attributes.items():
+            if not name.startswith("__"):
+                setattr(node_class, name, value)
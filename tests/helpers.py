@@ -0,0 +1,23 @@
+import random
+
+
+def node_ids(count, seed=0):
+    rng = random.Random(seed)
+    return sorted({rng.getrandbits(64) for _ in range(count)})
+
+
+def run(env, generator):
+    """ Exécute un processus v2 jusqu'à sa fin et renvoie sa valeur. """
+    process = env.process(generator)
+    env.run(until=process)
+    return process.value
+
+
+def contents(ring):
+    """ {identifiant du nœud: {clé: (rôle, valeur)}} de tout l'anneau (v1 ou v2). """
+    result = {}
+    for node in ring:
+        store = node.data_store
+        result[getattr(node, "node_id", getattr(node, "identifier", None))] = {
+            data.key: (store.role(data.key), getattr(data, "content", getattr(data, "value", None))) for data in store}
+    return result
@@ -0,0 +1,59 @@
+import pytest
+
+from dht import benchmark, v1, v2
+
+from helpers import contents, node_ids, run
+
+KEYS = [f"key-{i}" for i in range(2000)]
+
+
+def test_v1_put_many_matches_single_stores():
+    _, single = v1.bootstrap(node_ids(100))
+    for key in KEYS:
+        single[0].store_data(key, key.upper())
+    expected = contents(single)
+
+    _, ring = v1.bootstrap(node_ids(100))
+    results = ring[0].put_many([(key, key.upper()) for key in KEYS])
+    assert contents(ring) == expected
+    assert set(results) == set(KEYS)
+    for key, (owner, _) in results.items():
+        assert owner is ring[0].find_responsible_node(key)
+
+
+def test_v1_get_many_matches_single_reads():
+    _, ring = v1.bootstrap(node_ids(100), items={key: key.upper() for key in KEYS})
+    results = ring[7].get_many(KEYS + ["absente"])
+    for key in KEYS:
+        found, value, _ = results[key]
+        assert found and value == ring[7].find_responsible_node(key).deliver_data(key)
+    assert results["absente"][:2] == (False, None)
+
+
+def test_v2_put_many_matches_single_stores():
+    env, single = v2.bootstrap(node_ids(100))
+    owners = {key: run(env, single[0].store_data(v2.Data(key, key.upper()))).owner for key in KEYS}
+    expected = contents(single)
+
+    env, ring = v2.bootstrap(node_ids(100))
+    results = run(env, ring[0].put_many([v2.Data(key, key.upper()) for key in KEYS]))
+    assert contents(ring) == expected
+    assert {key: owner.node_id for key, (owner, _) in results.items()} == owners
+
+
+def test_v2_get_many_matches_single_reads():
+    env, ring = v2.bootstrap(node_ids(100), items={key: key.upper() for key in KEYS})
+    results = run(env, ring[7].get_many(KEYS + ["absente"]))
+    for key in KEYS:
+        reply = run(env, ring[7].retrieve_data(key))
+        assert results[key][:2] == (True, reply.value)
+    assert results["absente"][:2] == (False, None)
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_batch_beats_single_calls(version):
+    row = benchmark.run_batch(version, 200, 5000)
+    assert row["hop_speedup"] >= 10
+    if version == "v2":
+        assert row["sim_speedup"] >= 10
+    # Le gain en temps réel dépend de la charge de la machine : il est mesuré par bench --batch, pas vérifié ici
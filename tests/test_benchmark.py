@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from dht import benchmark, logstore
+
+
+def test_storage_run_cleans_up_after_an_error(tmp_path, monkeypatch):
+    def fail(env, client, key):
+        raise RuntimeError("panne simulée")
+
+    module, build_ring, write, _, join, leave = benchmark.IMPLEMENTATIONS["v2"]
+    monkeypatch.setitem(benchmark.IMPLEMENTATIONS, "v2", (module, build_ring, write, fail, join, leave))
+    with pytest.raises(RuntimeError):
+        benchmark.run_benchmark("v2", 10, 50, 20, 0.5, track_memory=False, bootstrap=True, storage=str(tmp_path))
+    assert os.listdir(tmp_path) == []
+    assert not logstore.open_files.handles
+    assert benchmark.dht_v2.Node.storage is None
+
+
+def test_benchmark_restores_node_settings():
+    node = benchmark.dht_v2.Node
+    before = (node.replication_factor, node.cache_size, node.read_balancing, node.storage)
+    benchmark.run_benchmark("v2", 10, 50, 20, 0.5, track_memory=False, cache_size=16, replication=1,
+                            read_balancing=False)
+    assert (node.replication_factor, node.cache_size, node.read_balancing, node.storage) == before
+
+
+def test_load_restores_node_settings():
+    node = benchmark.dht_v2.Node
+    before = (node.read_balancing, node.coalesce_reads, node.network)
+    benchmark.run_load(10, 50, rate=2, duration=5, coalesce=False, read_balancing=False)
+    assert (node.read_balancing, node.coalesce_reads, node.network) == before
+
+
+def test_large_restores_node_settings():
+    node = benchmark.dht_v2.Node
+    before = (node.chunk_size, node.replication_factor, node.network)
+    benchmark.run_large(8, 4096, 1024, objects=2, replication=5)
+    assert (node.chunk_size, node.replication_factor, node.network) == before
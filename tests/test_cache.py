@@ -0,0 +1,95 @@
+import pytest
+
+from dht import v1, v2
+from dht.keyspace import hash_key
+
+from helpers import node_ids, run
+
+ITEMS = {f"key-{i}": f"value-{i}" for i in range(200)}
+KEYS = ["key-1", "key-2", "key-3"]
+
+
+def cached_values(ring, key):
+    """ Valeurs de la clé encore servies par les caches de l'anneau. """
+    values = []
+    for node in ring:
+        cached = node.cache.get(key, node.env.now)
+        if cached is not None:
+            values.append(cached[0])
+    return values
+
+
+def read_everywhere_v1(ring, key):
+    for node in ring:
+        node.request_data(key)
+
+
+def read_everywhere_v2(env, ring, key):
+    return {run(env, node.retrieve_data(key)).value for node in ring}
+
+
+@pytest.fixture
+def caching():
+    v1.Node.cache_size = v2.Node.cache_size = 64
+
+
+def test_v1_overwrite_leaves_no_stale_cache(caching):
+    _, ring = v1.bootstrap(node_ids(80), items=ITEMS)
+    read_everywhere_v1(ring, "key-1")
+    assert set(cached_values(ring, "key-1")) == {"value-1"}
+
+    writer = next(node for node in ring if not node.has_data("key-1"))
+    writer.store_data("key-1", "nouvelle")
+    assert cached_values(ring, "key-1") == []
+    hits = v1.Node.cache_hits
+    read_everywhere_v1(ring, "key-1")
+    assert v1.Node.cache_hits > hits
+    assert set(cached_values(ring, "key-1")) == {"nouvelle"}
+
+
+def test_v1_put_many_leaves_no_stale_cache(caching):
+    _, ring = v1.bootstrap(node_ids(80), items=ITEMS)
+    for key in KEYS:
+        read_everywhere_v1(ring, key)
+    writer = next(node for node in ring if not any(node.has_data(key) for key in KEYS))
+    writer.put_many([(key, key.upper()) for key in KEYS])
+    for key in KEYS:
+        assert cached_values(ring, key) == []
+        read_everywhere_v1(ring, key)
+        assert set(cached_values(ring, key)) == {key.upper()}
+
+
+def test_v2_overwrite_leaves_no_stale_cache(caching):
+    env, ring = v2.bootstrap(node_ids(80), items=ITEMS)
+    assert read_everywhere_v2(env, ring, "key-1") == {"value-1"}
+    assert set(cached_values(ring, "key-1")) == {"value-1"}
+
+    run(env, ring[0].store_data(v2.Data("key-1", "nouvelle")))
+    assert cached_values(ring, "key-1") == []
+    hits = v2.Node.cache_hits
+    assert read_everywhere_v2(env, ring, "key-1") == {"nouvelle"}
+    assert v2.Node.cache_hits > hits
+
+
+def test_v2_put_many_leaves_no_stale_cache(caching):
+    env, ring = v2.bootstrap(node_ids(80), items=ITEMS)
+    for key in KEYS:
+        read_everywhere_v2(env, ring, key)
+    run(env, ring[0].put_many([v2.Data(key, key.upper()) for key in KEYS]))
+    for key in KEYS:
+        assert cached_values(ring, key) == []
+        assert read_everywhere_v2(env, ring, key) == {key.upper()}
+
+
+def test_v2_ownership_change_leaves_no_stale_cache(caching):
+    env, ring = v2.bootstrap(node_ids(80), items=ITEMS)
+    read_everywhere_v2(env, ring, "key-1")
+    owner, _ = ring[0].lookup(hash_key("key-1"))
+    run(env, ring[0].remove_node(owner))
+    ring.remove(owner)
+    # Les réponses tenues du nœud parti ne sont plus servies
+    for node in ring:
+        cached = node.cache.get("key-1", env.now)
+        assert cached is None or cached[1] is not owner
+    run(env, ring[0].store_data(v2.Data("key-1", "nouvelle")))
+    assert read_everywhere_v2(env, ring, "key-1") == {"nouvelle"}
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from dht import v2
+from dht.chunks import ChunkKey, Manifest
+
+from helpers import node_ids
+
+CHUNK_SIZE = 1024
+
+
+def wait(env, event):
+    env.run(until=event)
+    return event.value
+
+
+def content(size, seed=0):
+    return random.Random(seed).randbytes(size)
+
+
+def chunk_keys(ring, key):
+    """ {détenteur: morceaux de la clé qu'il stocke}. """
+    return {node: {stored for stored in node.data_store.order.range(0, 2**64 - 1)
+                   if isinstance(stored, ChunkKey) and stored.anchor == key}
+            for node in ring}
+
+
+@pytest.fixture
+def ring():
+    v2.Node.chunk_size = CHUNK_SIZE
+    return v2.bootstrap(node_ids(30))
+
+
+@pytest.mark.parametrize("size", [0, 100, CHUNK_SIZE, 3 * CHUNK_SIZE, 10 * CHUNK_SIZE + 7])
+def test_put_large_get_large_round_trip(ring, size):
+    env, nodes = ring
+    value = content(size)
+    wait(env, nodes[0].put_large("objet", value))
+    reply = wait(env, nodes[17].get_large("objet"))
+    assert reply.value == value
+
+    owner = nodes[0].directory.nodes[reply.owner]
+    stored = owner.data_store.get("objet").content
+    holders = [node for node, _ in owner.replica_nodes()]
+    held = chunk_keys(nodes, "objet")
+    if size <= CHUNK_SIZE:
+        assert stored == value
+        assert not any(held.values())
+    else:
+        # Chaque morceau est recopié chez tous les détenteurs de la clé, et nulle part ailleurs
+        assert isinstance(stored, Manifest)
+        expected = set(stored.chunk_keys("objet"))
+        assert len(expected) == -(-size // CHUNK_SIZE)
+        assert {node: keys for node, keys in held.items() if keys} == dict.fromkeys(holders, expected)
+
+
+def test_whole_values_without_chunking(ring):
+    env, nodes = ring
+    v2.Node.chunk_size = 0
+    value = content(5 * CHUNK_SIZE)
+    wait(env, nodes[0].put_large("objet", value))
+    assert wait(env, nodes[3].get_large("objet")).value == value
+    assert not any(chunk_keys(nodes, "objet").values())
+
+
+def test_overwrite_drops_previous_chunks(ring):
+    env, nodes = ring
+    wait(env, nodes[0].put_large("objet", content(4 * CHUNK_SIZE, seed=1)))
+    value = content(6 * CHUNK_SIZE, seed=2)
+    wait(env, nodes[5].put_large("objet", value))
+    assert wait(env, nodes[9].get_large("objet")).value == value
+    manifest = wait(env, nodes[9].get("objet")).value
+    current = set(manifest.chunk_keys("objet"))
+    assert all(keys <= current for keys in chunk_keys(nodes, "objet").values())
+
+    # Une valeur assez petite pour rester entière remplace aussi les morceaux
+    wait(env, nodes[5].put_large("objet", b"petite"))
+    assert wait(env, nodes[9].get_large("objet")).value == b"petite"
+    assert not any(chunk_keys(nodes, "objet").values())
+
+
+def test_missing_chunk_is_fetched_from_another_holder(ring):
+    env, nodes = ring
+    value = content(8 * CHUNK_SIZE)
+    reply = wait(env, nodes[0].put_large("objet", value))
+    owner = nodes[0].directory.nodes[reply.owner]
+    lost = next(iter(chunk_keys(nodes, "objet")[owner]))
+    owner.data_store.delete(lost)
+    assert wait(env, nodes[11].get_large("objet")).value == value
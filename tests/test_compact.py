@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+
+from dht.compact import CompactRing
+from dht.directory import RingDirectory
+from dht.keyspace import ID_SPACE, hash_key
+
+from helpers import node_ids
+
+
+def directory_of(ids):
+    directory = RingDirectory()
+    for node_id in ids:
+        directory.add(node_id, node_id)
+    return directory
+
+
+def positions_around(ids, rng):
+    """ Positions aléatoires, extrémités de l'espace, identifiants exacts et points à mi-chemin (égalités). """
+    ordered = sorted(ids)
+    positions = [0, 1, ID_SPACE - 1]
+    positions += [node_id + delta for node_id in ordered for delta in (-1, 0, 1) if 0 <= node_id + delta < ID_SPACE]
+    for left, right in zip(ordered, ordered[1:] + ordered[:1]):
+        gap = (right - left) % ID_SPACE
+        positions += [(left + gap // 2 + delta) % ID_SPACE for delta in (-1, 0, 1)]
+    positions += [rng.randrange(ID_SPACE) for _ in range(2000)]
+    return positions
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 50])
+def test_owners_agree_with_directory(count):
+    rng = random.Random(count)
+    ids = node_ids(count, seed=count)
+    # Écarts pairs : le point à mi-chemin est à égale distance des deux voisins
+    ids = [node_id - node_id % 2 for node_id in ids]
+    ring = CompactRing(ids, replication_factor=3)
+    directory = directory_of(ids)
+    positions = positions_around(ids, rng)
+    owners = ring.owners(np.array(positions, dtype=np.uint64))
+    assert [int(ring.ids[index]) for index in owners] == [directory.owner(position) for position in positions]
+    replicas = ring.replicas(owners)
+    for position, row in zip(positions[:200], replicas):
+        expected = [node_id for node_id, _ in directory.replicas(position, min(3, count))]
+        assert [int(ring.ids[index]) for index in row] == expected
+
+
+def test_owners_follow_joins_and_leaves():
+    rng = random.Random(9)
+    ids = node_ids(40)
+    ring = CompactRing(ids)
+    keys = [f"key-{i}" for i in range(500)]
+    ring.store(keys)
+    joined = node_ids(10, seed=5)
+    ring.add(joined)
+    ring.remove(ids[::3])
+    directory = directory_of(sorted(set(ids) - set(ids[::3])) + joined)
+    assert [int(node_id) for node_id in ring.ids] == directory.ids
+    assert [int(ring.ids[index]) for index in ring.key_owners()] == [directory.owner(hash_key(key)) for key in keys]
+    key = rng.choice(keys)
+    assert ring.find_responsible_node(key).identifier == directory.owner(hash_key(key))
+    assert ring.key_counts().sum() == len(keys)
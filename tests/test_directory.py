@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from dht import v1, v2
+from dht.directory import RingDirectory
+from dht.keyspace import ID_SPACE
+
+from helpers import node_ids
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+@pytest.mark.parametrize("replication", [1, 2, 3, 5, 8])
+def test_replicas_match_replica_nodes(version, replication):
+    module = {"v1": v1, "v2": v2}[version]
+    module.Node.replication_factor = replication
+    _, ring = module.bootstrap(node_ids(6 if replication == 8 else 40))
+    directory = v1.Node.directory if version == "v1" else ring[0].directory
+    rng = random.Random(4)
+    for _ in range(200):
+        position = rng.randrange(ID_SPACE)
+        assert directory.replicas(position, replication) == directory.owner(position).replica_nodes()
+
+
+def brute_force(ids, position):
+    """ successor, predecessor, floor et owner de la position, par parcours de tous les identifiants. """
+    position %= ID_SPACE
+    successor = min(ids, key=lambda node_id: (node_id - position) % ID_SPACE)
+    predecessor = min(ids, key=lambda node_id: (position - node_id - 1) % ID_SPACE)
+    floor = min(ids, key=lambda node_id: (position - node_id) % ID_SPACE)
+    before = (position - predecessor) % ID_SPACE
+    owner = successor if successor == position or (successor - position) % ID_SPACE < before else predecessor
+    return successor, predecessor, floor, owner
+
+
+def test_lookups_wrap_around_the_ring():
+    ids = node_ids(25)
+    directory = RingDirectory()
+    for node_id in reversed(ids):
+        directory.add(node_id, node_id)
+    with pytest.raises(ValueError):
+        directory.add(ids[3], ids[3])
+    rng = random.Random(6)
+    # Extrémités de l'espace, identifiants exacts et leurs voisins immédiats, positions au-delà de l'espace
+    positions = [0, 1, ID_SPACE - 1, ID_SPACE, ids[0] - 1, ids[-1] + 1, 2 * ID_SPACE + ids[4]]
+    positions += [node_id + delta for node_id in ids for delta in (-1, 0, 1)]
+    positions += [rng.randrange(ID_SPACE) for _ in range(500)]
+    for position in positions:
+        expected = brute_force(ids, position)
+        assert (directory.successor(position), directory.predecessor(position), directory.floor(position),
+                directory.owner(position)) == expected, position
+    assert list(directory) == ids
+
+    directory.remove(ids[0])
+    assert directory.successor(ids[-1] + 1) == ids[1]
+    assert directory.floor(ids[0]) == ids[-1]
+    assert ids[0] not in directory and len(directory) == len(ids) - 1
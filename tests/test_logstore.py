@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from dht import logstore
+from dht.logstore import LogStore
+from dht.storage import DataStore, PRIMARY, LEFT_REPLICA, RIGHT_REPLICA
+from dht.v2 import Data
+
+ROLES = (PRIMARY, LEFT_REPLICA, RIGHT_REPLICA)
+
+
+@pytest.fixture
+def open_files():
+    limit = logstore.open_files.limit
+    yield logstore.open_files
+    logstore.open_files.limit = limit
+
+
+def fill(store, mirror, steps, seed=0):
+    """ Mêmes écritures et suppressions dans le journal et dans un DataStore de référence. """
+    for step in range(steps):
+        key = f"key-{(step * 7919 + seed) % 150}"
+        if step % 5 == 4:
+            store.delete(key)
+            mirror.delete(key)
+        else:
+            data = Data(key, "x" * (step % 40) + str(step))
+            role = ROLES[step % 3]
+            store.put(data, role)
+            mirror.put(data, role)
+
+
+def entries(store):
+    return {key: (store.role(key), store.get(key).content) for key in store.order.range(0, 2 ** 64 - 1)}
+
+
+def test_reopen_after_compaction_keeps_live_entries(tmp_path):
+    compactions = LogStore.compactions
+    store = LogStore(str(tmp_path), segment_size=2048)
+    mirror = DataStore()
+    fill(store, mirror, 3000)
+    assert LogStore.compactions > compactions
+    assert entries(store) == entries(mirror)
+    store.close()
+
+    reopened = LogStore(str(tmp_path), segment_size=2048)
+    assert entries(reopened) == entries(mirror)
+    fill(reopened, mirror, 500, seed=3)
+    reopened.close()
+    assert entries(LogStore(str(tmp_path), segment_size=2048)) == entries(mirror)
+
+
+def test_reopen_without_snapshot_replays_the_log(tmp_path):
+    store = LogStore(str(tmp_path), segment_size=2048)
+    mirror = DataStore()
+    fill(store, mirror, 1000)
+    store.close()
+    os.remove(tmp_path / logstore.SNAPSHOT)
+    assert entries(LogStore(str(tmp_path), segment_size=2048)) == entries(mirror)
+
+
+def test_open_handles_stay_bounded(tmp_path, open_files):
+    open_files.limit = 4
+    stores = [LogStore(str(tmp_path / str(index)), segment_size=1024) for index in range(10)]
+    mirrors = [DataStore() for _ in stores]
+    for index, (store, mirror) in enumerate(zip(stores, mirrors)):
+        fill(store, mirror, 300, seed=index)
+    for store, mirror in zip(stores, mirrors):
+        assert entries(store) == entries(mirror)
+        assert sum((other.writer is not None) + len(other.maps) for other in stores) <= 4
+    for store in stores:
+        store.close()
+    assert not open_files.handles
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from dht import merkle, v1, v2
+from dht.keyspace import hash_key
+from dht.storage import PRIMARY
+
+from helpers import contents, node_ids
+
+MODULES = {"v1": v1, "v2": v2}
+ITEMS = {f"key-{i}": f"value-{i}" for i in range(3000)}
+
+
+def damage(module, ring, count):
+    """ Abîme count clés distinctes : réplique perdue, réplique périmée ou primaire perdue, à tour de rôle. """
+    directory = v1.Node.directory if module is v1 else ring[0].directory
+    data_class = v1.Donnees if module is v1 else v2.Data
+    for index, key in enumerate(random.Random(3).sample(sorted(ITEMS), count)):
+        holders = directory.owner(hash_key(key)).replica_nodes()
+        owner, _ = holders[0]
+        replica, role = holders[1 + index % (len(holders) - 1)]
+        if index % 3 == 0:
+            replica.data_store.delete(key)
+        elif index % 3 == 1:
+            replica.data_store.put(data_class(key, "périmée"), role)
+        else:
+            owner.data_store.delete(key)
+            assert owner.data_store.role(key) is None
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_repair_converges_in_one_round(version):
+    module = MODULES[version]
+    _, ring = module.bootstrap(node_ids(50), items=ITEMS)
+    expected = contents(ring)
+    damage(module, ring, 90)
+    assert contents(ring) != expected
+
+    before = module.Node.repair_keys
+    for node in ring:
+        node.check_replicas()
+    assert module.Node.repair_keys - before == 90
+    assert contents(ring) == expected
+
+    # Une fois les répliques réparées, seules les racines des arbres sont échangées
+    before = (module.Node.repair_keys, module.Node.repair_hashes, module.Node.repair_messages)
+    for node in ring:
+        node.check_replicas()
+    checks = sum(len(node.replica_nodes()) - 1 for node in ring)
+    assert (module.Node.repair_keys - before[0], module.Node.repair_hashes - before[1],
+            module.Node.repair_messages - before[2]) == (0, checks, checks)
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_repair_exchanges_only_divergent_leaves(version):
+    module = MODULES[version]
+    _, ring = module.bootstrap(node_ids(20), items=ITEMS)
+    owner = max(ring, key=lambda node: len(node.data_store.primary))
+    replica, role = owner.replica_nodes()[1]
+    key = next(iter(owner.data_store.primary))
+    replica.data_store.delete(key)
+
+    before = module.Node.repair_hashes
+    assert owner.synchronize(replica, role) == 1
+    assert replica.data_store.role(key) == role
+    assert owner.data_store.role(key) == PRIMARY
+    # Quelques hachés par niveau de l'arbre et une feuille, loin des clés du nœud
+    assert module.Node.repair_hashes - before < len(owner.data_store.primary) / 4
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_clean_round_reuses_cached_trees(version, monkeypatch):
+    module = MODULES[version]
+    data_class = v1.Donnees if module is v1 else v2.Data
+    _, ring = module.bootstrap(node_ids(30), items=ITEMS)
+    damage(module, ring, 30)
+    for _ in range(2):
+        for node in ring:
+            node.check_replicas()
+
+    # Aucun stockage n'a changé depuis le passage précédent : aucun arbre n'est reconstruit
+    built = []
+    monkeypatch.setattr(merkle.MerkleTree, "build", lambda tree: built.append(tree))
+    monkeypatch.setattr(merkle.MerkleTree, "add", lambda tree, key, value: built.append(tree))
+    for node in ring:
+        node.check_replicas()
+    assert built == []
+    monkeypatch.undo()
+
+    # Une écriture invalide les arbres de ce stockage seulement, et la réparation suivante la voit
+    owner = ring[0]
+    key = next(iter(owner.data_store.primary))
+    replica, role = owner.replica_nodes()[1]
+    replica.data_store.put(data_class(key, "périmée"), role)
+    assert owner.synchronize(replica, role) == 1
+    stored = replica.data_store.get(key)
+    assert getattr(stored, "value", getattr(stored, "content", None)) == ITEMS[key]
+    assert owner.synchronize(replica, role) == 0
+
+
+def test_incremental_tree_matches_rebuilt_tree():
+    rng = random.Random(5)
+    tree = merkle.MerkleTree(start=2**40, width=2**62, depth=6)
+    for index in range(200):
+        tree.add(f"key-{index}", index)
+    tree.node_hash(0, 0)
+    for _ in range(50):
+        index = rng.randrange(400)
+        tree.add(f"key-{index}", rng.random())
+    rebuilt = merkle.MerkleTree(tree.start, tree.width, tree.depth)
+    rebuilt.leaves = {index: dict(entries) for index, entries in tree.leaves.items()}
+    assert tree.diff(rebuilt) == ([], 1, 1)
+    assert all(tree.node_hash(level, index) == rebuilt.node_hash(level, index)
+               for level in range(tree.depth + 1) for index in rebuilt.levels[level])
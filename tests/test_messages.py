@@ -0,0 +1,40 @@
+import pytest
+
+from dht import v2
+from dht.network import Network, LinkModel
+
+from helpers import node_ids, run
+
+
+def test_receive_message_forwards_to_the_receiver():
+    env, ring = v2.bootstrap(node_ids(64))
+    v2.Node.network = network = Network(env, LinkModel(latency=1.0, jitter=0.0))
+    sender, receiver = ring[0], ring[32]
+    path = 0
+    current = sender
+    while current is not receiver:
+        current = current.closer_node(receiver.node_id)
+        path += 1
+    run(env, sender.receive_message(v2.Message(sender.node_id, receiver.node_id, "bonjour")))
+    assert path > 1
+    assert network.messages == path
+    assert env.now == path
+
+
+def test_send_delivers_through_each_hop():
+    env, ring = v2.bootstrap(node_ids(64))
+    reply = ring[3].send(ring[40].node_id, "bonjour")
+    env.run(until=reply)
+    assert reply.value.value == "bonjour"
+    assert reply.value.owner == ring[40].node_id
+
+
+@pytest.mark.parametrize("content", [42, None, 3.5, {"clé": [1, 2]}, b"\x00\x01"])
+def test_send_accepts_any_content(content):
+    env, ring = v2.bootstrap(node_ids(64))
+    v2.Node.network = Network(env, LinkModel(latency=1.0, jitter=0.0, bandwidth=10.0))
+    reply = ring[3].send(ring[40].node_id, content)
+    env.run(until=reply)
+    assert reply.value.value == content
+    assert reply.value.owner == ring[40].node_id
+    run(env, ring[5].receive_message(v2.Message(ring[5].node_id, ring[50].node_id, content)))
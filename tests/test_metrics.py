@@ -0,0 +1,90 @@
+import csv
+import json
+
+import pytest
+
+from dht import v2
+from dht.metrics import Histogram, MetricsRegistry, metrics
+
+from helpers import node_ids, run
+
+
+def test_histogram_buckets_quantiles_and_overflow():
+    histogram = Histogram([1, 2, 4, 8])
+    for value in [0, 1, 1, 2, 3, 3, 3, 5, 20, 100]:
+        histogram.observe(value)
+    assert histogram.counts == [3, 1, 3, 1, 2]
+    assert histogram.buckets() == [(1, 3), (2, 1), (4, 3), (8, 1), (None, 2)]
+    assert (histogram.count, histogram.total, histogram.min, histogram.max) == (10, 138, 0, 100)
+    assert histogram.mean() == 13.8
+    # Un quantile renvoie la borne de sa classe, ou le maximum dans la classe de débordement
+    assert histogram.quantile(0.3) == 1
+    assert histogram.quantile(0.5) == 4
+    assert histogram.quantile(0.99) == 100
+    assert Histogram().quantile(0.5) == 0.0 and Histogram().mean() == 0.0
+    summary = histogram.summary()
+    assert (summary["count"], summary["p50"], summary["p99"], summary["min"], summary["max"]) == (10, 4, 100, 0, 100)
+
+
+def test_registry_counters_gauges_and_imbalance():
+    registry = MetricsRegistry(enabled=True)
+    registry.configure(bounds={"latency": [0.5, 1.0]})
+    for node, amount in [(1, 1), (1, 2), (2, 1), (3, 2)]:
+        registry.count(node, "served", amount)
+    registry.gauge(1, "stored_items", 10)
+    registry.gauge(1, "stored_items", 4)
+    for value in [3, 7, 5]:
+        registry.gauge_max(2, "queue", value)
+    registry.observe("latency", 0.7)
+    registry.observe("read_hops", 3)
+
+    assert registry.counters["served"] == {1: 3, 2: 1, 3: 2}
+    assert registry.gauges == {"stored_items": {1: 4}, "queue": {2: 7}}
+    assert registry.imbalance("served") == pytest.approx(1.5)
+    assert registry.imbalance("absent") == 0.0
+    # Les bornes configurées ne valent que pour leur histogramme
+    assert registry.histograms["latency"].bounds == [0.5, 1.0]
+    assert registry.histograms["read_hops"].bounds[:3] == [0, 1, 2]
+
+    registry.reset()
+    assert (registry.counters, registry.gauges, registry.histograms) == ({}, {}, {})
+    assert registry.enabled
+
+
+def test_registry_exports(tmp_path):
+    registry = MetricsRegistry(enabled=True)
+    registry.count(7, "served", 2)
+    registry.gauge(7, "stored_items", 5)
+    registry.observe("read_hops", 2)
+    registry.observe("read_hops", 2)
+    registry.observe("read_hops", 10 ** 9)
+
+    registry.write(str(tmp_path / "metriques.json"))
+    with open(tmp_path / "metriques.json", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    assert snapshot["nodes"] == {"7": {"served": 2, "stored_items": 5}}
+    assert snapshot["histograms"]["read_hops"]["count"] == 3
+    assert snapshot["histograms"]["read_hops"]["buckets"] == [[2, 2], [None, 1]]
+
+    registry.write(str(tmp_path / "metriques.csv"))
+    with open(tmp_path / "metriques.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows == [["kind", "name", "node", "bucket", "value"],
+                    ["counter", "served", "7", "", "2"],
+                    ["gauge", "stored_items", "7", "", "5"],
+                    ["histogram", "read_hops", "", "2", "2"],
+                    ["histogram", "read_hops", "", "inf", "1"]]
+
+
+def test_instrumented_reads_fill_the_shared_registry():
+    metrics.configure(enabled=True)
+    metrics.reset()
+    try:
+        env, ring = v2.bootstrap(node_ids(20), items={f"key-{i}": i for i in range(50)})
+        for index in range(50):
+            run(env, ring[index % 20].retrieve_data(f"key-{index}"))
+        assert metrics.histograms["read_hops"].count == 50
+        assert sum(metrics.counters["served"].values()) == 50
+    finally:
+        metrics.configure(enabled=False)
+        metrics.reset()
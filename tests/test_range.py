@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from dht import v1, v2
+from dht.keyspace import ID_SPACE, hash_key
+from dht.logstore import LogStore
+from dht.storage import DataStore, KeyOrder, PRIMARY, LEFT_REPLICA
+
+from helpers import node_ids, run
+
+ITEMS = {f"key-{i}": f"value-{i}" for i in range(2000)}
+
+
+def expected_range(start, end):
+    """ Couples (clé, valeur) de ITEMS dans [start, end], dans l'ordre de l'anneau depuis start. """
+    keys = [key for key in ITEMS if (hash_key(key) - start) % ID_SPACE <= (end - start) % ID_SPACE]
+    keys.sort(key=lambda key: (hash_key(key) - start) % ID_SPACE)
+    return [(key, ITEMS[key]) for key in keys]
+
+
+def range_query(version, start, end, limit=None):
+    if version == "v1":
+        _, ring = v1.bootstrap(node_ids(40), items=ITEMS)
+        results, _ = ring[3].range_query(start, end, limit)
+        return results
+    env, ring = v2.bootstrap(node_ids(40), items=ITEMS)
+    return run(env, ring[3].range_query(start, end, limit)).value
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+@pytest.mark.parametrize("start, end", [(2**62, 2**63), (ID_SPACE - 2**61, 2**61), (5 * 2**60, 2**60)])
+def test_range_query_matches_keys_in_interval(version, start, end):
+    # La deuxième et la troisième plage passent par zéro (start > end) ; la dernière fait presque tout l'anneau
+    results = range_query(version, start, end)
+    assert results == expected_range(start, end)
+    assert len({key for key, _ in results}) == len(results)
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+@pytest.mark.parametrize("limit", [1, 7, 150])
+def test_range_query_stops_after_limit(version, limit):
+    start, end = ID_SPACE - 2**62, 2**62
+    assert range_query(version, start, end, limit) == expected_range(start, end)[:limit]
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_range_query_skips_keys_held_by_replicas(version):
+    # Avec 5 détenteurs par clé, chaque nœud parcouru détient aussi des répliques de ses voisins
+    {"v1": v1, "v2": v2}[version].Node.replication_factor = 5
+    start, end = 2**63, 2**63 + 2**62
+    results = range_query(version, start, end)
+    assert results == expected_range(start, end)
+
+
+@pytest.mark.parametrize("kind", ["memoire", "journal"])
+def test_store_range_after_interleaved_writes_and_deletes(tmp_path, kind):
+    store = DataStore() if kind == "memoire" else LogStore(str(tmp_path / "journal"))
+    rng = random.Random(8)
+    present = {}
+    for step in range(600):
+        key = f"key-{rng.randrange(150)}"
+        if rng.random() < 0.4:
+            store.delete(key)
+            present.pop(key, None)
+        else:
+            store.put(v2.Data(key, step), rng.choice([PRIMARY, LEFT_REPLICA]))
+            present[key] = step
+        if step % 50 == 0:
+            # Lecture de plage au milieu des écritures : les ajouts et retraits notés sont intégrés
+            start, end = rng.randrange(ID_SPACE), rng.randrange(ID_SPACE)
+            keys = [key for key in present if (hash_key(key) - start) % ID_SPACE <= (end - start) % ID_SPACE]
+            keys.sort(key=lambda key: (hash_key(key) - start) % ID_SPACE)
+            assert [(data.key, data.content) for data in store.range(start, end)] == [(key, present[key]) for key in keys]
+    assert len(store.order) == len(present)
+    store.close()
+
+
+def test_key_order_readds_removed_key_before_sort():
+    order = KeyOrder(["a", "b", "c"])
+    order.sort()
+    order.discard("b")
+    order.add("b")   # Retirée puis rajoutée avant le tri : elle reste une seule fois
+    order.add("d")
+    order.discard("d")  # Ajoutée puis retirée avant le tri : elle n'apparaît pas
+    assert sorted(order.range(0, ID_SPACE - 1)) == ["a", "b", "c"]
+    assert len(order) == 3
+    # Une plage qui passe par zéro renvoie d'abord la fin de l'anneau
+    positions = sorted((hash_key(key), key) for key in "abc")
+    assert order.range(positions[2][0], positions[0][0]) == [positions[2][1], positions[0][1]]
@@ -0,0 +1,85 @@
+import pytest
+
+from dht import v1, v2
+from dht.keyspace import hash_key
+
+from helpers import node_ids, run
+
+MODULES = {"v1": v1, "v2": v2}
+ITEMS = {f"key-{i}": f"value-{i}" for i in range(200)}
+
+
+def loaded_owner(version):
+    """ Anneau, clé et responsable de la clé, dont la charge dépasse largement celle de ses répliques. """
+    module = MODULES[version]
+    env, ring = module.bootstrap(node_ids(30), items=ITEMS)
+    key = "key-17"
+    directory = v1.Node.directory if module is v1 else ring[0].directory
+    owner = directory.owner(hash_key(key))
+    owner.reads_served = 50
+    return env, ring, key, owner
+
+
+def read(version, env, ring, key, owner):
+    """ Lit la clé depuis son responsable et renvoie le nœud qui a servi la lecture.
+
+    (Partie d'un autre nœud, la lecture peut atteindre une réplique avant le responsable.)
+    """
+    if version == "v1":
+        served = {node: node.reads_served for node in ring}
+        owner.request_data(key)
+        return next(node for node in ring if node.reads_served != served[node])
+    reply = run(env, owner.retrieve_data(key))
+    assert reply.value == ITEMS[key]
+    return next(node for node in ring if node.node_id == reply.owner)
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_loaded_owner_hands_read_to_replica(version):
+    env, ring, key, owner = loaded_owner(version)
+    holder, distance = owner.read_holder(key)
+    assert holder is not owner and distance == 1
+    assert read(version, env, ring, key, owner) is holder
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_without_balancing_nearest_holder_serves(version):
+    MODULES[version].Node.read_balancing = False
+    env, ring, key, owner = loaded_owner(version)
+    assert owner.read_holder(key) == (owner, 0)
+    assert read(version, env, ring, key, owner) is owner
+
+
+def test_concurrent_gets_share_one_lookup(monkeypatch):
+    env, ring = v2.bootstrap(node_ids(30), items=ITEMS)
+    lookups = []
+    retrieve_data = v2.Node.retrieve_data
+
+    def counted(node, key):
+        lookups.append(key)
+        return (yield from retrieve_data(node, key))
+
+    monkeypatch.setattr(v2.Node, "retrieve_data", counted)
+    key = "key-3"
+    owner = ring[0].directory.owner(hash_key(key))
+    reader = ring[(ring.index(owner) + len(ring) // 2) % len(ring)]
+
+    def late_get(delay):
+        yield env.timeout(delay)
+        return (yield reader.get(key))
+
+    coalesced = v2.Node.coalesced_reads
+    first = reader.get(key)
+    second = env.process(late_get(0.001))
+    env.run(until=env.all_of([first, second]))
+    assert lookups == [key]
+    assert v2.Node.coalesced_reads - coalesced == 1
+    assert reader.reads_in_flight == {}
+    # Chaque demandeur a sa propre Reply, avec la latence mesurée depuis sa demande
+    assert first.value is not second.value
+    assert first.value.value == second.value.value == ITEMS[key]
+    assert first.value.latency > second.value.latency > 0
+
+    # Une fois la lecture terminée, une nouvelle demande refait la recherche
+    assert run(env, late_get(0)).value == ITEMS[key]
+    assert lookups == [key, key]
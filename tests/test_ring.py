@@ -0,0 +1,128 @@
+import random
+
+import pytest
+
+from dht import v1, v2
+from dht.keyspace import ID_BITS, ID_SPACE, hash_key
+
+from helpers import node_ids, run
+
+ITEMS = {f"key-{i}": f"value-{i}" for i in range(1000)}
+
+
+def join(env, ring, node_id):
+    if isinstance(ring[0], v1.Node):
+        node = v1.Node(env, node_id)
+        node.send_join_message(random.choice(ring))
+    else:
+        message = v2.Message(sender=node_id, receiver=ring[0].node_id, content="Join Request")
+        node = random.choice(ring).receive_join_request(message)
+    ring.append(node)
+
+
+def leave(env, ring, node):
+    if isinstance(node, v1.Node):
+        node.remove()
+    else:
+        run(env, random.choice(ring).remove_node(node))
+    ring.remove(node)
+
+
+def churn(version, rounds, replication=3):
+    """ Anneau amorcé avec ITEMS, puis rounds départs et arrivées tirés au hasard. """
+    module = {"v1": v1, "v2": v2}[version]
+    module.Node.replication_factor = replication
+    rng = random.Random(1)
+    env, ring = module.bootstrap(node_ids(40), items=ITEMS)
+    for _ in range(rounds):
+        leave(env, ring, rng.choice(ring))
+        join(env, ring, rng.getrandbits(64))
+    directory = v1.Node.directory if version == "v1" else ring[0].directory
+    return ring, directory
+
+
+def ident(node):
+    return node.identifier if isinstance(node, v1.Node) else node.node_id
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_pointers_and_fingers_after_churn(version):
+    ring, directory = churn(version, 30)
+    ordered = list(directory)
+    assert sorted(map(ident, ring)) == [ident(node) for node in ordered]
+    size = len(ordered)
+    for index, node in enumerate(ordered):
+        assert node.right is ordered[(index + 1) % size]
+        assert node.left is ordered[index - 1]
+        for i in range(ID_BITS):
+            assert node.fingers[i] is directory.successor(ident(node) + 2 ** i)
+            assert node.back_fingers[i] is directory.floor(ident(node) - 2 ** i)
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_lookups_reach_owner_after_churn(version):
+    ring, directory = churn(version, 30)
+    rng = random.Random(2)
+    for _ in range(200):
+        position = rng.randrange(ID_SPACE)
+        owner, hops = rng.choice(ring).lookup(position)
+        assert owner is directory.owner(position)
+        assert hops <= 2 * ID_BITS
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+@pytest.mark.parametrize("replication", [1, 3, 4])
+def test_replicas_follow_owners_after_churn(version, replication):
+    ring, directory = churn(version, 20, replication)
+    holders = {}
+    for node in ring:
+        for data in node.data_store:
+            holders.setdefault(data.key, {})[node] = node.data_store.role(data.key)
+    assert set(holders) == set(ITEMS)
+    for key, roles in holders.items():
+        assert roles == dict(directory.owner(hash_key(key)).replica_nodes())
+
+
+def holdings(ring):
+    return {(node, data.key) for node in ring for data in node.data_store}
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+@pytest.mark.parametrize("change", ["join", "leave"])
+def test_migration_counters_and_batches(version, change):
+    module = {"v1": v1, "v2": v2}[version]
+    env, ring = module.bootstrap(node_ids(40), items=ITEMS)
+    before = holdings(ring)
+    counters = (module.Node.migrated_keys, module.Node.migration_messages)
+    if change == "join":
+        join(env, ring, random.Random(3).getrandbits(64))
+    else:
+        leave(env, ring, ring[7])
+    copies = holdings(ring) - before
+    migrated = module.Node.migrated_keys - counters[0]
+    messages = module.Node.migration_messages - counters[1]
+    # Chaque copie nouvelle est comptée une fois, et les copies voyagent par lots
+    assert migrated == len(copies) > 0
+    receivers = {node for node, _ in copies}
+    assert len(receivers) <= messages <= migrated / 5
+    assert messages <= len(receivers) * (2 * module.Node.replication_factor + 1)
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+@pytest.mark.parametrize("replication", [2, 3, 4])
+def test_data_survives_losing_all_but_one_holder(version, replication):
+    ring, directory = churn(version, 10, replication)
+    ordered = list(directory)
+    for first in range(0, len(ordered), 9):
+        # replication_factor - 1 nœuds consécutifs perdent tout leur stockage
+        lost = [ordered[(first + offset) % len(ordered)] for offset in range(replication - 1)]
+        for node in lost:
+            node.data_store.clear()
+        assert {key for _, key in holdings(ring)} == set(ITEMS)
+        # La réparation par arbres de Merkle rend à chaque clé tous ses détenteurs
+        for _ in range(2):
+            for node in ordered:
+                node.check_replicas()
+        for key in ITEMS:
+            for holder, role in directory.owner(hash_key(key)).replica_nodes():
+                assert holder.data_store.role(key) == role
@@ -0,0 +1,50 @@
+import simpy
+
+from dht.scheduler import TimerWheel
+
+
+def wheel(tick=0.5, slots=8):
+    env = simpy.Environment()
+    return env, TimerWheel(env, tick, slots)
+
+
+def test_timers_fire_on_their_tick():
+    env, timers = wheel()
+    fired = []
+    timers.schedule(1.2, lambda: fired.append(("once", env.now)))
+    timers.every(1.0, lambda: fired.append(("every", env.now)), offset=0.5)
+    # Au-delà d'un tour de roue (8 cases de 0,5) : la tâche attend des tours complets
+    timers.schedule(9.0, lambda: fired.append(("late", env.now)))
+    env.run(until=9.1)
+    assert [when for name, when in fired if name == "once"] == [1.5]
+    assert [when for name, when in fired if name == "every"] == [0.5, 1.5, 2.5, 3.5, 4.5, 5.5, 6.5, 7.5, 8.5]
+    assert [when for name, when in fired if name == "late"] == [9.0]
+
+
+def test_cancelled_timers_never_fire():
+    env, timers = wheel()
+    fired = []
+    timers.schedule(2.0, lambda: fired.append("once")).cancel()
+
+    def tick_then_stop():
+        fired.append(env.now)
+        if env.now >= 3:
+            periodic.cancel()
+
+    periodic = timers.every(1.0, tick_then_stop)
+    env.run(until=20)
+    assert fired == [1.0, 2.0, 3.0]
+    assert timers.pending == 0
+
+
+def test_empty_wheel_sleeps_until_scheduled():
+    env, timers = wheel()
+    # Aucune tâche : la roue n'a plus d'événement et la simulation s'arrête d'elle-même
+    env.run()
+    assert env.now == 0 and timers.next_tick is None
+
+    fired = []
+    timers.schedule(2.0, lambda: fired.append(env.now))
+    env.run()
+    assert fired == [2.0] and env.now == 2.0
+    assert timers.pending == 0 and timers.next_tick is None
@@ -0,0 +1,146 @@
+import random
+
+import pytest
+import simpy
+
+from dht import snapshot, v1, v2
+from dht.logstore import LogStore, log_storage
+from dht.scheduler import TimerWheel
+
+from helpers import contents, node_ids, run
+
+MODULES = {"v1": v1, "v2": v2}
+ITEMS = {f"key-{i}": f"value-{i}" for i in range(500)}
+
+
+def links(ring):
+    """ Pointeurs, listes de voisins et doigts de chaque nœud, désignés par identifiant. """
+    _, id_attribute, _, _ = snapshot.IMPLEMENTATIONS[snapshot.implementation_of(ring[0])]
+
+    def ids(nodes):
+        return [getattr(node, id_attribute) for node in nodes]
+
+    return [ids([node, node.left, node.right]) + [ids(node.successors), ids(node.predecessors),
+                                                  ids(node.fingers), ids(node.back_fingers)]
+            for node in ring]
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_load_restores_saved_ring(tmp_path, version):
+    _, ring = MODULES[version].bootstrap(node_ids(50), items=ITEMS)
+    path = tmp_path / "ring.snap"
+    snapshot.save(path, ring)
+
+    env, loaded = snapshot.load(path)
+    assert links(loaded) == links(ring)
+    assert contents(loaded) == contents(ring)
+    for node in loaded:
+        for key in node.data_store.order.range(0, 2**64 - 1):
+            assert key in node.data_store
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_load_rebinds_foreign_wheel(tmp_path, version):
+    module = MODULES[version]
+    _, ring = module.bootstrap(node_ids(20))
+    path = tmp_path / "ring.snap"
+    snapshot.save(path, ring)
+
+    module.Node.wheel = TimerWheel(simpy.Environment(), 0.5, 64)
+    env, loaded = snapshot.load(path)
+    wheel = module.Node.wheel
+    assert wheel.env is env
+    assert (wheel.tick, len(wheel.slots)) == (0.5, 64)
+    assert all(node.maintenance in sum(wheel.slots, []) for node in loaded)
+
+
+def continue_run(module, env, ring, steps=8):
+    """ Suite de la simulation : écritures et pertes de répliques à des dates tirées au hasard. """
+    for step in range(steps):
+        env.run(until=env.now + random.uniform(0.5, 4))
+        node = random.choice(ring)
+        key = f"suite-{step}"
+        if module is v1:
+            node.store_data(key, step)
+        else:
+            run(env, node.store_data(v2.Data(key, step)))
+        victim = random.choice(ring)
+        stored = sorted(data.key for data in victim.data_store)
+        if stored:
+            victim.data_store.delete(random.choice(stored))
+    env.run(until=env.now + 20)
+    return env.now, contents(ring), module.Node.repair_keys, module.Node.hop_count
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_reloaded_run_matches_continued_run(tmp_path, monkeypatch, version):
+    module = MODULES[version]
+    module.Node.maintenance_interval = 3
+    calls = []
+    maintain = module.Node.maintain
+
+    def traced(node):
+        calls.append((node.env.now, getattr(node, "node_id", getattr(node, "identifier", None))))
+        maintain(node)
+
+    monkeypatch.setattr(module.Node, "maintain", traced)
+    env = simpy.Environment()
+    module.Node.wheel = TimerWheel(env, 0.5, 4)
+    _, ring = module.bootstrap(node_ids(30), items=ITEMS, env=env)
+    env.run(until=7.3)
+    path = tmp_path / "ring.snap"
+    snapshot.save(path, ring)
+    saved_calls = len(calls)
+
+    continued = continue_run(module, env, ring)
+    continued_calls = calls[saved_calls:]
+    del calls[saved_calls:]
+
+    env, loaded = snapshot.load(path)
+    assert module.Node.wheel.env is env
+    assert continue_run(module, env, loaded) == continued
+    assert calls[saved_calls:] == continued_calls
+    assert len(continued_calls) > len(ring)
+
+
+def test_load_restores_none_settings(tmp_path):
+    env, ring = v2.bootstrap(node_ids(20))
+    v2.Node.cache_size, v2.Node.cache_ttl = 16, None
+    path = tmp_path / "ring.snap"
+    snapshot.save(path, ring)
+
+    v2.Node.cache_ttl = 5
+    v2.Node.storage = storage = log_storage(str(tmp_path / "stores"))
+    snapshot.load(path)
+    assert v2.Node.cache_ttl is None
+    # Les objets d'exécution ne font pas partie des réglages enregistrés
+    assert v2.Node.storage is storage
+    for store in storage.stores:
+        store.close()
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_load_into_used_log_storage_drops_old_entries(tmp_path, version):
+    module = MODULES[version]
+    ids = node_ids(20)
+    _, ring = module.bootstrap(ids, items=ITEMS)
+    path = tmp_path / "ring.snap"
+    snapshot.save(path, ring)
+
+    # Une exécution précédente a laissé des entrées dans les répertoires des nœuds
+    module.Node.storage = factory = log_storage(str(tmp_path / "stores"))
+    _, stale = module.bootstrap(ids, items={"ancienne": "valeur"})
+    for store in factory.stores:
+        store.close()
+
+    module.Node.storage = factory = log_storage(str(tmp_path / "stores"))
+    _, loaded = snapshot.load(path)
+    assert contents(loaded) == contents(ring)
+    for store in factory.stores:
+        store.close()
+    # Rouverts, les journaux ne contiennent que l'anneau rechargé
+    for node, store in zip(ring, factory.stores):
+        reopened = LogStore(store.path)
+        assert {data.key for data in reopened} == {data.key for data in node.data_store}
+        assert "ancienne" not in reopened
+        reopened.close()
@@ -0,0 +1,46 @@
+import math
+import statistics
+
+import pytest
+
+from dht import sweep
+
+
+def test_t_quantile_table_and_normal_tail():
+    assert sweep.t_quantile(1) == 12.706
+    assert sweep.t_quantile(3) == 3.182
+    assert sweep.t_quantile(30) == 2.042
+    assert sweep.t_quantile(31) == sweep.t_quantile(500) == 1.96
+
+
+def test_summarize_student_interval():
+    rows = [{"nodes": 10, "seed": seed, "hops": hops} for seed, hops in enumerate([1.0, 2.0, 3.0, 4.0])]
+    rows += [{"nodes": None, "seed": 0, "hops": 7.0}]
+    rows += [{"nodes": 5, "seed": seed, "hops": 2.0} for seed in range(3)]
+    summary = sweep.summarize(rows, ["nodes"], ["hops"])
+    # Les combinaisons sans valeur viennent en premier, puis dans l'ordre des valeurs
+    assert [line["nodes"] for line in summary] == [None, 5, 10]
+    assert [line["runs"] for line in summary] == [1, 3, 4]
+    single, constant, spread = summary
+    # Un seul essai, ou des essais identiques : intervalle nul
+    assert (single["hops_mean"], single["hops_ci95"]) == (7.0, 0.0)
+    assert (constant["hops_mean"], constant["hops_ci95"]) == (2.0, 0.0)
+    # Quatre essais : 3 degrés de liberté, t = 3,182
+    assert spread["hops_mean"] == 2.5
+    expected = 3.182 * statistics.stdev([1.0, 2.0, 3.0, 4.0]) / math.sqrt(4)
+    assert spread["hops_ci95"] == pytest.approx(expected, abs=1e-6)
+    assert list(spread) == sweep.summary_fields(["nodes"], ["hops"])
+
+
+def test_run_sweep_repeats_each_combination_on_the_same_seeds(monkeypatch):
+    def fake(seed, nodes, replication, keys):
+        return {"nodes": nodes, "replication": replication, "keys": keys, "seed": seed}
+
+    monkeypatch.setitem(sweep.KINDS, "fake", (fake, ["nodes", "replication"], ["seed"]))
+    grid = {"nodes": [10, 20], "replication": [1, 3]}
+    rows = list(sweep.run_sweep("fake", grid, runs=3, seed=40, workers=1, fixed={"keys": 5}))
+    assert len(rows) == 12
+    for params in sweep.parameter_grid(grid):
+        seeds = [row["seed"] for row in rows if all(row[name] == value for name, value in params.items())]
+        assert seeds == [40, 41, 42]
+    assert {row["keys"] for row in rows} == {5}
@@ -0,0 +1,181 @@
+import asyncio
+
+import pytest
+
+from dht import transport
+from dht.v2 import Message
+
+
+def serve(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 30))
+
+
+async def started(node_id=1):
+    node = transport.NodeServer(node_id)
+    await node.start()
+    return node
+
+
+def test_failed_request_gets_an_error_response():
+    async def scenario():
+        node = await started()
+        pool = transport.ConnectionPool()
+        connection = await pool.connection(node.port)
+        with pytest.raises(transport.RemoteError, match="ValueError"):
+            await connection.request(99, Message(sender=0, receiver=0, content=None))
+        with pytest.raises(transport.RemoteError, match="IndexError"):
+            await connection.request(transport.RETRIEVE, Message(sender=0, receiver=0, content=[]))
+        # La connexion reste utilisable après une erreur
+        assert await connection.request(transport.STORE, Message(0, 0, ["clé", "valeur"])) == [True, None, 1, 0]
+        assert connection.pending == {}
+        assert node.errors == 2
+        pool.close()
+        await node.stop()
+
+    serve(scenario())
+
+
+def test_unencodable_request_is_not_left_pending():
+    async def scenario():
+        node = await started()
+        pool = transport.ConnectionPool()
+        connection = await pool.connection(node.port)
+        with pytest.raises(TypeError):
+            await connection.request(transport.STORE, Message(0, 0, ["clé", object()]))
+        assert connection.pending == {}
+        pool.close()
+        await node.stop()
+
+    serve(scenario())
+
+
+def test_request_without_response_times_out():
+    async def scenario():
+        async def silent(reader, writer):
+            await reader.read()
+            writer.close()
+
+        server = await asyncio.start_server(silent, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        pool = transport.ConnectionPool()
+        connection = await pool.connection(port)
+        with pytest.raises(asyncio.TimeoutError):
+            await connection.request(transport.RETRIEVE, Message(0, 0, ["clé"]), timeout=0.2)
+        assert connection.pending == {}
+        pool.close()
+        server.close()
+
+    serve(scenario())
+
+
+VALUES = [None, True, False, 0, -1, 255, -2**70, 2**64 + 3, 1.5, -0.0, "", "clé é ✓", b"", b"\x00\xff" * 100,
+          [], [None, [True, [b"x", ["profond", 7]]], 3.25], ("tuple", 1)]
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_pack_value_round_trip(value):
+    out = bytearray(b"prefixe")
+    transport.pack_value(value, out)
+    decoded, end = transport.unpack_value(out, len(b"prefixe"))
+    assert end == len(out)
+    assert decoded == (list(value) if isinstance(value, tuple) else value)
+    assert type(decoded) is (list if isinstance(value, tuple) else type(value))
+
+
+def test_pack_value_rejects_other_types():
+    with pytest.raises(TypeError):
+        transport.pack_value({"clé": 1}, bytearray())
+
+
+def test_frames_round_trip_through_a_stream():
+    async def scenario():
+        reader = asyncio.StreamReader()
+        messages = [(request_id % (transport.ERROR + 1), request_id, Message(request_id, 2**64 - 1, value))
+                    for request_id, value in enumerate(VALUES, start=1)]
+        stream = b"".join(transport.encode_frame(kind, request_id, message) for kind, request_id, message in messages)
+        # Les trames arrivent découpées arbitrairement
+        for start in range(0, len(stream), 7):
+            reader.feed_data(stream[start:start + 7])
+        reader.feed_eof()
+        for kind, request_id, message in messages:
+            got_kind, got_id, got = await transport.read_frame(reader)
+            assert (got_kind, got_id, got.sender, got.receiver) == (kind, request_id, message.sender, message.receiver)
+            assert got.content == (list(message.content) if isinstance(message.content, tuple) else message.content)
+
+    serve(scenario())
+
+
+def test_pipelined_responses_out_of_order():
+    async def scenario():
+        async def reverse(reader, writer):
+            # Répond aux trois requêtes reçues dans l'ordre inverse
+            frames = [await transport.read_frame(reader) for _ in range(3)]
+            for _, request_id, message in reversed(frames):
+                writer.write(transport.encode_frame(transport.RESPONSE, request_id,
+                                                    Message(0, message.sender, ["réponse", message.content])))
+                await writer.drain()
+            await reader.read()
+            writer.close()
+
+        server = await asyncio.start_server(reverse, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        pool = transport.ConnectionPool()
+        replies = await asyncio.gather(*(pool.request(port, transport.SEND, Message(index, 0, index))
+                                         for index in range(3)))
+        assert replies == [["réponse", index] for index in range(3)]
+        pool.close()
+        server.close()
+
+    serve(scenario())
+
+
+def test_connection_pool_reuses_connections():
+    async def scenario():
+        accepted = []
+
+        async def echo(reader, writer):
+            accepted.append(writer)
+            try:
+                while True:
+                    _, request_id, message = await transport.read_frame(reader)
+                    writer.write(transport.encode_frame(transport.RESPONSE, request_id, message))
+            except asyncio.IncompleteReadError:
+                writer.close()
+
+        server = await asyncio.start_server(echo, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        pool = transport.ConnectionPool()
+        # Des demandes simultanées n'ouvrent qu'une connexion, réutilisée ensuite
+        connections = await asyncio.gather(*(pool.connection(port) for _ in range(5)))
+        assert all(connection is connections[0] for connection in connections)
+        for index in range(10):
+            assert await pool.request(port, transport.SEND, Message(0, 0, index)) == index
+        assert len(accepted) == 1
+        # Une connexion écartée est rouverte à la demande suivante
+        pool.discard(port)
+        assert await pool.request(port, transport.SEND, Message(0, 0, "encore")) == "encore"
+        assert len(accepted) == 2
+        pool.close()
+        server.close()
+
+    serve(scenario())
+
+
+def test_store_and_retrieve_across_processes():
+    processes, ports = transport.start_nodes(2, replication_factor=2)
+    try:
+        async def scenario():
+            client = transport.Client(ports)
+            for index in range(20):
+                found, _, _, _ = await client.call(transport.STORE, 0, [f"clé-{index}", [index, b"octets"]], ports[index % 2])
+                assert found
+            for index in range(20):
+                found, value, _, _ = await client.call(transport.RETRIEVE, 0, [f"clé-{index}"], ports[(index + 1) % 2])
+                assert found and value == [index, b"octets"]
+            found, value, _, _ = await client.get("absente")
+            assert (found, value) == (False, None)
+            client.close()
+
+        serve(scenario())
+    finally:
+        transport.stop_nodes(processes)